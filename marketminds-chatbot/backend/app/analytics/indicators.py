@@ -0,0 +1,189 @@
+"""
+Technical indicators over daily price history.
+
+Every function takes prices as an array whose last axis is time (oldest
+first): a single series of shape (T,) or a panel of shape (N, T) with one
+row per ticker, and computes all rows at once with NumPy. Windows that
+are not yet full are NaN, so outputs keep the input's shape.
+
+`align_closes` builds such a panel from several PriceHistory objects.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from backend.app.data_sources.price_store import PriceHistory
+
+TRADING_DAYS = 252
+
+
+def align_closes(histories: Sequence[PriceHistory]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Closing prices of several tickers on their common trading days.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: dates (T,) and closes (N, T).
+    """
+    if not histories:
+        return np.empty(0, dtype="datetime64[D]"), np.empty((0, 0))
+
+    dates = histories[0].dates
+    for history in histories[1:]:
+        dates = np.intersect1d(dates, history.dates, assume_unique=True)
+
+    closes = np.vstack([
+        np.asarray(history.close)[np.searchsorted(history.dates, dates)]
+        for history in histories
+    ])
+    return dates, closes
+
+
+def returns(prices: np.ndarray, log: bool = False) -> np.ndarray:
+    """Period-over-period returns; one element shorter along time."""
+    prices = np.asarray(prices, dtype="float64")
+    if log:
+        return np.diff(np.log(prices), axis=-1)
+    return prices[..., 1:] / prices[..., :-1] - 1
+
+
+def total_return(prices: np.ndarray) -> np.ndarray:
+    """Return from the first to the last price."""
+    prices = np.asarray(prices, dtype="float64")
+    return prices[..., -1] / prices[..., 0] - 1
+
+
+def sma(prices: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average (rolling mean via cumulative sums)."""
+    prices = np.asarray(prices, dtype="float64")
+    out = np.full(prices.shape, np.nan)
+    if window <= 0 or prices.shape[-1] < window:
+        return out
+
+    csum = np.cumsum(prices, axis=-1)
+    out[..., window - 1] = csum[..., window - 1]
+    out[..., window:] = csum[..., window:] - csum[..., :-window]
+    out[..., window - 1:] /= window
+    return out
+
+
+def ema(prices: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average, seeded with the first price."""
+    return _ewma(np.asarray(prices, dtype="float64"), 2.0 / (span + 1))
+
+
+def volatility(prices: np.ndarray, annualize: bool = True) -> np.ndarray:
+    """Standard deviation of daily returns over the whole series."""
+    rets = returns(prices)
+    if rets.shape[-1] < 2:
+        return np.full(rets.shape[:-1], np.nan)
+    vol = np.std(rets, axis=-1, ddof=1)
+    return vol * np.sqrt(TRADING_DAYS) if annualize else vol
+
+
+def rolling_volatility(
+    prices: np.ndarray, window: int = 21, annualize: bool = True
+) -> np.ndarray:
+    """
+    Rolling standard deviation of daily returns, aligned with `prices`
+    (the first `window` points are NaN).
+    """
+    rets = returns(prices)
+    mean = sma(rets, window)
+    mean_sq = sma(rets * rets, window)
+    var = np.maximum(mean_sq - mean * mean, 0.0) * window / max(window - 1, 1)
+
+    out = np.full(np.shape(prices), np.nan)
+    out[..., 1:] = np.sqrt(var)
+    return out * np.sqrt(TRADING_DAYS) if annualize else out
+
+
+def rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index with Wilder's smoothing (0-100)."""
+    deltas = np.diff(np.asarray(prices, dtype="float64"), axis=-1)
+    out = np.full(np.shape(prices), np.nan)
+    if deltas.shape[-1] < period:
+        return out
+
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+
+    # Seed with the plain average of the first `period` moves
+    avg_gain = _ewma(gains[..., period - 1:], 1.0 / period,
+                     seed=gains[..., :period].mean(axis=-1))
+    avg_loss = _ewma(losses[..., period - 1:], 1.0 / period,
+                     seed=losses[..., :period].mean(axis=-1))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        values = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+    out[..., period:] = values
+    return out
+
+
+def drawdown(prices: np.ndarray) -> np.ndarray:
+    """Fall from the running peak at each point (<= 0)."""
+    prices = np.asarray(prices, dtype="float64")
+    return prices / np.maximum.accumulate(prices, axis=-1) - 1
+
+
+def max_drawdown(prices: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall over the series (<= 0)."""
+    return drawdown(prices).min(axis=-1)
+
+
+def correlation(prices: np.ndarray) -> np.ndarray:
+    """Correlation matrix (N, N) of daily returns of a panel."""
+    return np.atleast_2d(np.corrcoef(returns(prices)))
+
+
+def summarize(histories: Sequence[PriceHistory], sma_window: int = 20) -> List[dict]:
+    """
+    Headline indicators for each ticker, computed over the common dates.
+
+    Returns:
+        List[dict]: one entry per ticker with last close, total return,
+        annualised volatility, max drawdown, RSI(14) and the SMA.
+    """
+    dates, closes = align_closes(histories)
+    if closes.shape[-1] < 2:
+        return []
+
+    last_rsi = rsi(closes)[:, -1]
+    last_sma = sma(closes, sma_window)[:, -1]
+    total = total_return(closes)
+    vol = volatility(closes)
+    mdd = max_drawdown(closes)
+
+    return [
+        {
+            "ticker": history.ticker,
+            "start": str(dates[0]),
+            "end": str(dates[-1]),
+            "sessions": len(dates),
+            "last_close": float(closes[i, -1]),
+            "total_return": float(total[i]),
+            "volatility": float(vol[i]),
+            "max_drawdown": float(mdd[i]),
+            "rsi": float(last_rsi[i]),
+            "sma": float(last_sma[i]),
+        }
+        for i, history in enumerate(histories)
+    ]
+
+
+def _ewma(values: np.ndarray, alpha: float, seed=None) -> np.ndarray:
+    """
+    Recursive exponential average along the time axis.
+
+    The recursion is sequential in time but vectorised across rows, so
+    a panel of N tickers costs T NumPy operations, not N * T.
+    """
+    out = np.empty_like(values)
+    if not values.shape[-1]:
+        return out
+
+    out[..., 0] = values[..., 0] if seed is None else seed
+    for t in range(1, values.shape[-1]):
+        out[..., t] = alpha * values[..., t] + (1 - alpha) * out[..., t - 1]
+    return out
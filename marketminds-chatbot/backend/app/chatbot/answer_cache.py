@@ -0,0 +1,178 @@
+"""
+Answer cache for MarketMinds Chatbot.
+
+Stores finished LLM answers so repeated questions skip generation:
+- keys combine the normalised question, the route and the ids of the
+  chunks retrieved for it, so an answer is never served once the corpus
+  behind it changes (different chunks -> different key)
+- optionally, a question phrased differently but with the same route
+  and chunks is matched by embedding similarity
+- bounded LRU with a per-entry TTL
+- hit / semantic-hit / miss counters for monitoring
+
+Only answers that went through the LLM are cached; live market data is
+never stored here.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.app.config import config
+from backend.app.rag.embeddings import EmbeddingClient
+
+# (normalised question, route, chunk ids)
+CacheKey = Tuple[str, str, Tuple[int, ...]]
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of answers with optional near-duplicate lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = config.ANSWER_CACHE_SIZE,
+        ttl: float = config.ANSWER_CACHE_TTL,
+        similarity_threshold: Optional[float] = config.ANSWER_CACHE_SIMILARITY,
+        embedding_client: Optional[EmbeddingClient] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            max_entries (int): Answers kept before the least recently
+                used is evicted.
+            ttl (float): Seconds an answer stays valid.
+            similarity_threshold (Optional[float]): Minimum cosine
+                similarity for a near-duplicate hit; None disables it.
+            embedding_client (Optional[EmbeddingClient]): Embeds questions
+                for the similarity lookup (can be set later).
+            clock (Callable[[], float]): Monotonic time source.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.embedding_client = embedding_client
+        self.clock = clock
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        # key -> (stored_at, answer, unit question vector or None)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str, Optional[np.ndarray]]]" = OrderedDict()
+        # (route, chunk ids) -> keys sharing that context
+        self._groups: Dict[Tuple[str, Tuple[int, ...]], set] = {}
+        # key -> question vector embedded by a missed `get`, reused by the
+        # `put` that follows it once the answer is generated
+        self._missed_vectors: "OrderedDict[CacheKey, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(
+        self, question: str, route: str, chunk_ids: Sequence[int] = ()
+    ) -> CacheKey:
+        normalised = _TRAILING_PUNCTUATION.sub("", " ".join(question.lower().split()))
+        return normalised, route, tuple(int(i) for i in chunk_ids)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        """Cached answer for `key`, or for a near-identical question."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._drop(key)
+
+            candidates = [
+                k for k in self._groups.get(key[1:], ())
+                if now - self._entries[k][0] < self.ttl
+            ]
+
+        if candidates:
+            vector = self._embed(key[0])
+            if vector is not None:
+                with self._lock:
+                    match = self._most_similar(vector, candidates)
+                    if match is not None:
+                        self._entries.move_to_end(match)
+                        self.semantic_hits += 1
+                        return self._entries[match][1]
+                    self._missed_vectors[key] = vector
+                    # Misses whose answer never arrives (LLM failures) age out
+                    while len(self._missed_vectors) > self.max_entries:
+                        self._missed_vectors.popitem(last=False)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: CacheKey, answer: str) -> None:
+        with self._lock:
+            vector = self._missed_vectors.pop(key, None)
+        if vector is None:
+            vector = self._embed(key[0])
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self.clock(), answer, vector)
+            self._groups.setdefault(key[1:], set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._missed_vectors.clear()
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        client = self.embedding_client
+        # A 1-dim embedder (the length stub) cannot express similarity
+        if self.similarity_threshold is None or client is None or client.dimension < 2:
+            return None
+
+        vector = np.asarray(client.embed_query(text)[0], dtype="float32")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _most_similar(self, vector: np.ndarray, keys) -> Optional[CacheKey]:
+        keys = [k for k in keys if k in self._entries and self._entries[k][2] is not None]
+        if not keys:
+            return None
+
+        scores = np.stack([self._entries[k][2] for k in keys]) @ vector
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.similarity_threshold else None
+
+    def _drop(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        group = self._groups.get(key[1:])
+        if group is not None:
+            group.discard(key)
+            if not group:
+                del self._groups[key[1:]]
@@ -2,8 +2,8 @@
 Response Builder for MarketMinds
 
 This module orchestrates the full response flow:
-- route the query
-- gather context (API / documents)
+- route the query (one or several intents)
+- gather context (API / documents), concurrently for mixed questions
 - construct the prompt
 - call the LLM
 - return the final answer
@@ -11,14 +11,52 @@ This module orchestrates the full response flow:
 This is the ONLY place where LLMs are invoked.
 """
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
 from backend.app.config import config
+from backend.app.analytics import indicators
+from backend.app.chatbot.answer_cache import AnswerCache, CacheKey
 from backend.app.chatbot.router import QueryRouter, QueryType
-from backend.app.llm.llm_client import LLMClient
+from backend.app.llm.llm_client import LLMClient, LLMFailure
+from backend.app.llm.context_budget import ContextAssembler, estimate_tokens
 from backend.app.llm.prompt_templates import full_prompt
 from backend.app.data_sources.financial_api import MarketDataClient, TickerResolver
+from backend.app.data_sources.price_store import PriceHistory
 from backend.app.rag.ingest import DocumentIngestor
+from backend.app.rag.chunk_metadata import fiscal_years
+from backend.app.rag.generations import IndexGenerations
+from backend.app.rag.ingest_pipeline import IngestionPipeline
 from backend.app.rag.retriever import Retriever
-from backend.app.rag.embeddings import DummyEmbeddingClient
+from backend.app.rag.embeddings import EmbeddingClient, create_embedding_client
+from backend.app.utils import metrics
+from backend.app.utils.metrics import in_context, span
+
+# Routes whose LLM answers may be served from the answer cache; live
+# market, indicator and history questions are time-sensitive.
+_CACHED_ROUTES = {QueryType.DOCUMENT, QueryType.GENERAL}
+
+# stats() keys that only ever grow; the rest are exported as gauges
+_CACHE_COUNTERS = {
+    "hits", "misses", "semantic_hits", "stale_hits", "disk_hits", "coalesced", "errors",
+}
+
+QUESTIONS = metrics.REGISTRY.counter(
+    "marketminds_questions_total",
+    "Questions received, by route (several intents joined with '+').",
+    labels=("route",),
+)
+LLM_TOKENS = metrics.REGISTRY.counter(
+    "marketminds_llm_tokens_total", "Tokens generated by the LLM (estimated when not streamed)."
+)
+LLM_TOKENS_PER_SECOND = metrics.REGISTRY.histogram(
+    "marketminds_llm_tokens_per_second",
+    "LLM generation speed per answer.",
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250, 500),
+)
 
 
 class ResponseBuilder:
@@ -35,79 +73,716 @@ class ResponseBuilder:
         self.market_client = MarketDataClient()
         self.ticker_resolver = TickerResolver()
 
-        # RAG components
-        vector_store_path = config.VECTOR_STORE_DIR / "faiss_store.pkl"
+        # RAG components are loaded by `load_documents`, normally in the
+        # background after startup; until then document questions take a
+        # degraded path without retrieval.
+        self.retriever: Retriever | None = None
+        self.load_error: Exception | None = None
+        # Index generation being served (SHARED_INDEX only)
+        self.generation: str | None = None
+        self._closed = threading.Event()
 
-        self.retriever = Retriever(
-            embedding_client=DummyEmbeddingClient(),
-            vector_store_path=vector_store_path,
+        self.ingestor = DocumentIngestor()
+        self.context_assembler = ContextAssembler()
+
+        # Finished LLM answers; near-duplicate matching is enabled once
+        # the embedding model is loaded with the documents.
+        self.answer_cache = AnswerCache()
+
+        # Dedicated pool for blocking work on the async path, so retrieval
+        # never competes with FastAPI's own threadpool.
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.BLOCKING_WORKERS,
+            thread_name_prefix="marketminds-blocking",
         )
 
-        self.ingestor = DocumentIngestor()
+    @property
+    def is_ready(self) -> bool:
+        """True once the document index is loaded and searchable."""
+        return self.retriever is not None
 
-        # Ingest PDFs once
-        raw_data_dir = config.RAW_DATA_DIR
-        if not vector_store_path.exists():
-            for pdf_file in raw_data_dir.glob("*.pdf"):
-                chunks = self.ingestor.ingest_pdf(pdf_file)
-                self.retriever.add_documents(chunks)
-
-        # Demo fallback docs (safe)
-        demo_docs = [
-            "Apple reported strong revenue growth in 2023 driven by iPhone sales.",
-            "The company increased its investments in artificial intelligence research.",
-            "Apple's annual report highlighted supply chain diversification.",
-        ]
-        self.retriever.add_documents(demo_docs)
+    def load_documents(self) -> None:
+        """
+        Open (or build) the vector store and sync PDFs into it.
+
+        This is the slow part of startup (embedding model load, index
+        mmap, ingestion), so it is kept out of `__init__`. The retriever
+        is only published once fully loaded.
+
+        With SHARED_INDEX, the published index generation is served
+        instead and the store is left to the ingestion job.
+        """
+        if config.SHARED_INDEX:
+            self._follow_generations()
+            return
+
+        try:
+            retriever = Retriever(
+                embedding_client=create_embedding_client(),
+                vector_store_path=config.VECTOR_STORE_PATH,
+            )
+
+            # Sync new/changed PDFs into the store (no-op when up to date)
+            is_new_store = len(retriever.text_chunks) == 0
+            IngestionPipeline(
+                retriever, ticker_resolver=self.ticker_resolver
+            ).run(config.RAW_DATA_DIR)
+
+            # Demo fallback docs (safe)
+            if is_new_store:
+                demo_docs = [
+                    "Apple reported strong revenue growth in 2023 driven by iPhone sales.",
+                    "The company increased its investments in artificial intelligence research.",
+                    "Apple's annual report highlighted supply chain diversification.",
+                ]
+                retriever.add_documents(
+                    demo_docs, [{"source": "demo", "ticker": "AAPL"}] * len(demo_docs)
+                )
+        except Exception as e:
+            self.load_error = e
+            raise
+
+        self.answer_cache.embedding_client = retriever.embedding_client
+        self.retriever = retriever
+
+    def close(self) -> None:
+        """Stop following index generations."""
+        self._closed.set()
 
     # --------------------------------------------------
     # Public API
     # --------------------------------------------------
 
     def build_response(self, question: str) -> str:
-        query_type = self.router.route(question)
+        answer, prompt, cache_key = self._prepare(question)
+        if answer is not None:
+            return answer
+
+        start = time.perf_counter()
+        answer = self.llm_client.generate(prompt=prompt)
+        self._observe_llm(start, estimate_tokens(answer))
+        self._remember(cache_key, answer)
+        return answer
+
+    def build_response_stream(self, question: str) -> Iterator[str]:
+        """
+        Streaming variant of `build_response`.
+
+        Yields answer fragments as soon as the LLM produces them; answers
+        that need no LLM call (live quotes, cached answers) are yielded in
+        one piece.
+        """
+        answer, prompt, cache_key = self._prepare(question)
+        if answer is not None:
+            yield answer
+            return
+
+        parts = []
+        failed = False
+        start = time.perf_counter()
+        for token in self.llm_client.generate_stream(prompt=prompt):
+            if not parts:
+                metrics.record("llm_first_token", time.perf_counter() - start)
+            parts.append(token)
+            failed = failed or isinstance(token, LLMFailure)
+            yield token
+        answer = "".join(parts)
+        self._observe_llm(start, estimate_tokens(answer))
+        if not failed:
+            self._remember(cache_key, answer)
+
+    async def abuild_response(self, question: str) -> str:
+        """
+        Async variant of `build_response`.
+        """
+        answer, prompt, cache_key = await self._aprepare(question)
+        if answer is not None:
+            return answer
+
+        start = time.perf_counter()
+        answer = await self.llm_client.agenerate(prompt=prompt)
+        self._observe_llm(start, estimate_tokens(answer))
+        await self._aremember(cache_key, answer)
+        return answer
+
+    async def abuild_response_stream(self, question: str) -> AsyncIterator[str]:
+        """
+        Async variant of `build_response_stream`.
+        """
+        answer, prompt, cache_key = await self._aprepare(question)
+        if answer is not None:
+            yield answer
+            return
+
+        parts = []
+        failed = False
+        start = time.perf_counter()
+        async for token in self.llm_client.agenerate_stream(prompt=prompt):
+            if not parts:
+                metrics.record("llm_first_token", time.perf_counter() - start)
+            parts.append(token)
+            failed = failed or isinstance(token, LLMFailure)
+            yield token
+        answer = "".join(parts)
+        self._observe_llm(start, estimate_tokens(answer))
+        if not failed:
+            await self._aremember(cache_key, answer)
+
+    def stats(self) -> dict:
+        """Cache counters for monitoring."""
+        stats = {
+            "answer_cache": self.answer_cache.stats(),
+            "quote_cache": self.market_client.cache.stats(),
+        }
+        retriever = self.retriever
+        if retriever is not None and hasattr(retriever.embedding_client, "stats"):
+            stats["embedding_cache"] = retriever.embedding_client.stats()
+        return stats
+
+    def metric_families(self) -> list[metrics.Family]:
+        """
+        Cache counters (from `stats()`) and the blocking-pool queue depth,
+        read at scrape time for `/metrics`.
+        """
+        series: dict[str, list] = {}
+        for cache, counters in self.stats().items():
+            for name, value in counters.items():
+                series.setdefault(name, []).append(({"cache": cache}, value))
+
+        families = []
+        for name, samples in series.items():
+            help = f"Cache {name.replace('_', ' ')}."
+            if name in _CACHE_COUNTERS:
+                families.append((f"marketminds_cache_{name}_total", "counter", help, samples))
+            else:
+                families.append((f"marketminds_cache_{name}", "gauge", help, samples))
+
+        # Work submitted to the blocking pool but not yet started
+        families.append((
+            "marketminds_blocking_queue_depth", "gauge",
+            "Tasks waiting for a blocking-pool thread.",
+            [({}, self._executor._work_queue.qsize())],
+        ))
+        return families
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _prepare(self, question: str) -> tuple[str | None, str | None, CacheKey | None]:
+        """
+        Route the question and gather its context.
+
+        Returns:
+            tuple: (answer, None, None) when the question is answered
+            directly or from the answer cache, otherwise
+            (None, prompt, cache_key) for the LLM; `cache_key` is None
+            when the answer must not be cached.
+        """
+        intents = self._intents(question)
+        if len(intents) > 1:
+            return self._prepare_mixed(question, intents)
+        query_type = intents[0]
 
         # 1. Live market queries
         if query_type == QueryType.LIVE_MARKET:
             market_answer = self._handle_live_market_query(question)
             if market_answer:
-                return market_answer
+                return market_answer, None, None
             # fallback to LLM if ticker not resolved
 
-        # 2. Document / RAG queries
-        if query_type == QueryType.DOCUMENT:
-            context = self._get_rag_context(question)
-            return self.llm_client.generate(
-                prompt=full_prompt(question=question, context=context)
-            )
+        # 2. Indicators and historical prices (local store, no LLM)
+        if query_type == QueryType.INDICATOR:
+            indicator_answer = self._handle_indicator_query(question)
+            if indicator_answer:
+                return indicator_answer, None, None
+
+        if query_type == QueryType.HISTORICAL:
+            history_answer = self._handle_historical_query(question)
+            if history_answer:
+                return history_answer, None, None
+
+        # 3. Document / RAG and general knowledge (LLM)
+        return self._prepare_llm(question, query_type)
 
-        # 3. General knowledge (LLM fallback)
-        return self.llm_client.generate(
-            prompt=full_prompt(question=question)
+    async def _aprepare(
+        self, question: str
+    ) -> tuple[str | None, str | None, CacheKey | None]:
+        """
+        Async variant of `_prepare`.
+        """
+        intents = self._intents(question)
+        if len(intents) > 1:
+            return await self._aprepare_mixed(question, intents)
+        query_type = intents[0]
+
+        # 1. Live market queries
+        if query_type == QueryType.LIVE_MARKET:
+            market_answer = await self._ahandle_live_market_query(question)
+            if market_answer:
+                return market_answer, None, None
+
+        # 2. Indicators and historical prices (local store, no LLM)
+        if query_type == QueryType.INDICATOR:
+            indicator_answer = await self._ahandle_indicator_query(question)
+            if indicator_answer:
+                return indicator_answer, None, None
+
+        if query_type == QueryType.HISTORICAL:
+            history_answer = await self._ahandle_historical_query(question)
+            if history_answer:
+                return history_answer, None, None
+
+        # 3. Document / RAG and general knowledge (LLM); retrieval and
+        # the cache lookup embed text, so they run off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, in_context(self._prepare_llm, question, query_type)
         )
 
-    # --------------------------------------------------
-    # Internal helpers
-    # --------------------------------------------------
+    def _intents(self, question: str) -> list[QueryType]:
+        """Intents confident enough to act on (always at least one)."""
+        with span("route"):
+            intents = self.router.classify(question)
+        confident = [
+            intent.type for intent in intents
+            if intent.confidence >= config.INTENT_MIN_CONFIDENCE
+        ] or [intents[0].type]
+
+        QUESTIONS.inc(route="+".join(query_type.value for query_type in confident))
+        return confident
+
+    def _prepare_mixed(
+        self, question: str, intents: list[QueryType]
+    ) -> tuple[str | None, str | None, CacheKey | None]:
+        """
+        Answer a question with several intents.
+
+        Every source runs at once on the blocking pool, so the wait is
+        that of the slowest source (capped by its deadline), not the sum.
+        """
+        handlers = {
+            QueryType.LIVE_MARKET: self._handle_live_market_query,
+            QueryType.INDICATOR: self._handle_indicator_query,
+            QueryType.HISTORICAL: self._handle_historical_query,
+            QueryType.DOCUMENT: self._document_context,
+        }
+        start = time.monotonic()
+        futures = {
+            query_type: self._executor.submit(in_context(handlers[query_type], question))
+            for query_type in intents
+        }
+
+        results = {}
+        for query_type, future in futures.items():
+            remaining = start + self._deadline(query_type) - time.monotonic()
+            try:
+                results[query_type] = future.result(timeout=max(remaining, 0.0))
+            except Exception:
+                # Late or failed: answer without it (a late source keeps
+                # running in the pool, but is no longer waited for)
+                future.cancel()
+
+        return self._merge(question, intents, results)
+
+    async def _aprepare_mixed(
+        self, question: str, intents: list[QueryType]
+    ) -> tuple[str | None, str | None, CacheKey | None]:
+        """
+        Async variant of `_prepare_mixed`.
+        """
+        loop = asyncio.get_running_loop()
+        handlers: dict[QueryType, Callable[[], Awaitable[str | None]]] = {
+            QueryType.LIVE_MARKET: lambda: self._ahandle_live_market_query(question),
+            QueryType.INDICATOR: lambda: self._ahandle_indicator_query(question),
+            QueryType.HISTORICAL: lambda: self._ahandle_historical_query(question),
+            QueryType.DOCUMENT: lambda: loop.run_in_executor(
+                self._executor, in_context(self._document_context, question)
+            ),
+        }
+
+        async def bounded(query_type: QueryType) -> str | None:
+            try:
+                return await asyncio.wait_for(
+                    handlers[query_type](), self._deadline(query_type)
+                )
+            except Exception:
+                return None
+
+        values = await asyncio.gather(*(bounded(query_type) for query_type in intents))
+        return self._merge(question, intents, dict(zip(intents, values)))
+
+    def _merge(
+        self,
+        question: str,
+        intents: list[QueryType],
+        results: dict[QueryType, str | None],
+    ) -> tuple[str | None, str | None, CacheKey | None]:
+        """
+        Combine the sources that answered in time.
+
+        Market-only questions are answered directly; with a document
+        intent, the market data joins the retrieved context in the LLM
+        prompt. Mixed answers embed live data, so they are never cached.
+        """
+        market = [
+            results[query_type] for query_type in intents
+            if query_type != QueryType.DOCUMENT and results.get(query_type)
+        ]
+        if QueryType.DOCUMENT not in intents and market:
+            return "\n\n".join(market), None, None
+
+        sections = []
+        if results.get(QueryType.DOCUMENT):
+            sections.append(results[QueryType.DOCUMENT])
+        if market:
+            sections.append("Market data:\n" + "\n\n".join(market))
+
+        prompt = full_prompt(question=question, context="\n\n".join(sections) or None)
+        return None, prompt, None
+
+    def _document_context(self, question: str) -> str | None:
+        """
+        Retrieved context for a mixed question; None while the index is
+        loading or when nothing relevant is found, so the user-facing
+        notices never reach the prompt.
+        """
+        context, chunk_ids = self._get_rag_context(question)
+        return context if chunk_ids else None
+
+    @staticmethod
+    def _deadline(query_type: QueryType) -> float:
+        return config.SOURCE_DEADLINES[query_type.value]
+
+    def _prepare_llm(
+        self, question: str, query_type: QueryType
+    ) -> tuple[str | None, str | None, CacheKey | None]:
+        """Build the LLM prompt, or serve a cached answer to it."""
+        context, chunk_ids = None, ()
+        if query_type == QueryType.DOCUMENT:
+            context, chunk_ids = self._get_rag_context(question)
+
+        with span("prompt"):
+            prompt = full_prompt(question=question, context=context)
+
+        # Only document and general answers are stable enough to reuse;
+        # answers built without the index (still loading) are not cached
+        if query_type not in _CACHED_ROUTES or chunk_ids is None:
+            return None, prompt, None
+
+        cache_key = self.answer_cache.key(question, query_type.value, chunk_ids)
+        with span("answer_cache"):
+            cached = self.answer_cache.get(cache_key)
+        if cached is not None:
+            return cached, None, None
+        return None, prompt, cache_key
+
+    def _follow_generations(self) -> None:
+        """Serve the current index generation and watch for newer ones."""
+        try:
+            embedding_client = create_embedding_client(read_only=True)
+        except Exception as e:
+            self.load_error = e
+            raise
+        self.answer_cache.embedding_client = embedding_client
+        generations = IndexGenerations(config.INDEX_GENERATIONS_DIR)
+
+        # Until a generation is published, document questions take the
+        # degraded path as during a normal load
+        self._switch_generation(generations, embedding_client)
+        threading.Thread(
+            target=self._watch_generations,
+            args=(generations, embedding_client),
+            name="marketminds-generations",
+            daemon=True,
+        ).start()
+
+    def _watch_generations(
+        self, generations: IndexGenerations, embedding_client: EmbeddingClient
+    ) -> None:
+        while not self._closed.wait(config.INDEX_GENERATION_POLL):
+            self._switch_generation(generations, embedding_client)
+
+    def _switch_generation(
+        self, generations: IndexGenerations, embedding_client: EmbeddingClient
+    ) -> None:
+        name = generations.current()
+        if name is None or name == self.generation:
+            return
+
+        try:
+            retriever = generations.open(name, embedding_client)
+        except Exception as e:
+            # Keep serving the generation already open; retried next poll
+            self.load_error = e
+            return
+
+        # One reference swap: queries in flight finish on the Retriever
+        # they already hold, which is released after the last of them
+        self.retriever = retriever
+        self.generation = name
+        self.load_error = None
+
+    def _observe_llm(self, start: float, tokens: int) -> None:
+        seconds = time.perf_counter() - start
+        metrics.record("llm", seconds)
+        LLM_TOKENS.inc(tokens)
+        if seconds > 0 and tokens:
+            LLM_TOKENS_PER_SECOND.observe(tokens / seconds)
+
+    def _remember(self, cache_key: CacheKey | None, answer: str) -> None:
+        if cache_key is None or not answer.strip():
+            return
+        if isinstance(answer, LLMFailure):
+            return
+        self.answer_cache.put(cache_key, answer)
+
+    async def _aremember(self, cache_key: CacheKey | None, answer: str) -> None:
+        # Caching embeds the question: keep that off the event loop
+        if cache_key is None or isinstance(answer, LLMFailure):
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._remember, cache_key, answer)
 
     def _handle_live_market_query(self, question: str) -> str | None:
-        ticker = self.ticker_resolver.resolve(question)
+        with span("resolve"):
+            tickers = self.ticker_resolver.resolve_all(question)
 
-        if not ticker:
+        if not tickers:
             return None
 
         try:
-            data = self.market_client.get_stock_price(ticker)
+            with span("market_data"):
+                if len(tickers) == 1:
+                    data = self.market_client.get_stock_price(tickers[0])
+                else:
+                    quotes = self.market_client.get_stock_prices(tickers)
         except Exception:
             return "I couldn't fetch live market data at the moment."
 
+        if len(tickers) == 1:
+            return self._format_quote(data)
+        return self._format_comparison(tickers, quotes)
+
+    async def _ahandle_live_market_query(self, question: str) -> str | None:
+        with span("resolve"):
+            tickers = self.ticker_resolver.resolve_all(question)
+
+        if not tickers:
+            return None
+
+        try:
+            with span("market_data"):
+                if len(tickers) == 1:
+                    data = await self.market_client.aget_stock_price(tickers[0])
+                else:
+                    quotes = await self.market_client.aget_stock_prices(tickers)
+        except Exception:
+            return "I couldn't fetch live market data at the moment."
+
+        if len(tickers) == 1:
+            return self._format_quote(data)
+        return self._format_comparison(tickers, quotes)
+
+    def _format_quote(self, data: dict) -> str:
         return (
             f"{data['ticker']} is trading at {data['price']} {data['currency']} "
             f"(as of {data['timestamp']})."
         )
 
-    def _get_rag_context(self, question: str) -> str:
-        chunks = self.retriever.retrieve(question, top_k=3)
-        if not chunks:
-            return "No relevant documents found."
-        return "\n\n".join(f"- {chunk}" for chunk in chunks)
+    def _format_comparison(self, tickers: list[str], quotes: dict[str, dict]) -> str:
+        """One line per company, in the order they were asked about."""
+        if not quotes:
+            return "I couldn't fetch live market data at the moment."
+
+        lines = ["Live prices:"]
+        for ticker in tickers:
+            data = quotes.get(ticker)
+            if data is None:
+                lines.append(f"- {ticker}: unavailable right now")
+            else:
+                lines.append(
+                    f"- {ticker}: {data['price']} {data['currency']} "
+                    f"(as of {data['timestamp']})"
+                )
+        return "\n".join(lines)
+
+    def _handle_historical_query(self, question: str) -> str | None:
+        with span("resolve"):
+            tickers = self.ticker_resolver.resolve_all(question)
+
+        if not tickers:
+            return None
+
+        days = self.router.lookback_days(question)
+        try:
+            with span("price_history"):
+                histories = [
+                    self.market_client.get_price_history(ticker, days) for ticker in tickers
+                ]
+        except Exception:
+            return "I couldn't fetch price history at the moment."
+
+        return self._format_histories(histories, days)
+
+    async def _ahandle_historical_query(self, question: str) -> str | None:
+        with span("resolve"):
+            tickers = self.ticker_resolver.resolve_all(question)
+
+        if not tickers:
+            return None
+
+        days = self.router.lookback_days(question)
+        try:
+            with span("price_history"):
+                histories = await asyncio.gather(
+                    *(self.market_client.aget_price_history(ticker, days) for ticker in tickers)
+                )
+        except Exception:
+            return "I couldn't fetch price history at the moment."
+
+        return self._format_histories(histories, days)
+
+    def _handle_indicator_query(self, question: str) -> str | None:
+        with span("resolve"):
+            tickers = self.ticker_resolver.resolve_all(question)
+
+        if not tickers:
+            return None
+
+        days = self.router.lookback_days(question, default=365)
+        try:
+            with span("price_history"):
+                histories = [
+                    self.market_client.get_price_history(ticker, days) for ticker in tickers
+                ]
+        except Exception:
+            return "I couldn't fetch price history at the moment."
+
+        return self._format_indicators(question, histories, days)
+
+    async def _ahandle_indicator_query(self, question: str) -> str | None:
+        with span("resolve"):
+            tickers = self.ticker_resolver.resolve_all(question)
+
+        if not tickers:
+            return None
+
+        days = self.router.lookback_days(question, default=365)
+        try:
+            with span("price_history"):
+                histories = await asyncio.gather(
+                    *(self.market_client.aget_price_history(ticker, days) for ticker in tickers)
+                )
+        except Exception:
+            return "I couldn't fetch price history at the moment."
+
+        return self._format_indicators(question, histories, days)
+
+    def _format_indicators(
+        self, question: str, histories: list[PriceHistory], days: int
+    ) -> str:
+        """Deterministic indicator summary; no LLM involved."""
+        histories = [history for history in histories if len(history)]
+        window = self.router.moving_average_window(question)
+        with span("indicators"):
+            stats = indicators.summarize(histories, sma_window=window)
+        if not stats:
+            return "Not enough price history to compute indicators."
+
+        lines = [
+            f"Indicators over the last {days} days "
+            f"({stats[0]['start']} to {stats[0]['end']}, {stats[0]['sessions']} sessions):"
+        ]
+        for s in stats:
+            lines.append(
+                f"- {s['ticker']}: close {s['last_close']:.2f}, "
+                f"return {s['total_return']:+.2%}, "
+                f"volatility {self._num(s['volatility'], '.2%')} (annualised), "
+                f"max drawdown {s['max_drawdown']:.2%}, "
+                f"RSI(14) {self._num(s['rsi'], '.1f')}, "
+                f"{window}-day SMA {self._num(s['sma'], '.2f')}"
+            )
+
+        if len(stats) > 1:
+            _, closes = indicators.align_closes(histories)
+            corr = indicators.correlation(closes)
+            pairs = [
+                f"{stats[i]['ticker']}/{stats[j]['ticker']} {corr[i, j]:.2f}"
+                for i in range(len(stats)) for j in range(i + 1, len(stats))
+            ]
+            lines.append("Correlation of daily returns: " + ", ".join(pairs))
+
+        return "\n".join(lines)
+
+    @staticmethod
+    def _num(value: float, spec: str) -> str:
+        """Format an indicator, or "n/a" when its window is not yet full."""
+        return "n/a" if value != value else format(value, spec)
+
+    def _format_histories(self, histories: list[PriceHistory], days: int) -> str:
+        lines = []
+        for history in histories:
+            if not len(history):
+                lines.append(f"{history.ticker}: no price history available.")
+                continue
+
+            first, last = float(history.close[0]), float(history.close[-1])
+            change = (last / first - 1) * 100 if first else 0.0
+            lines.append(
+                f"{history.ticker} over the last {days} days ({len(history)} sessions): "
+                f"{first:.2f} -> {last:.2f} ({change:+.2f}%), "
+                f"low {float(history.low.min()):.2f}, high {float(history.high.max()):.2f}."
+            )
+
+            recent = history.tail(5)
+            lines.append(
+                "Recent closes: " + ", ".join(
+                    f"{date}: {close:.2f}" for date, close in zip(recent.dates, recent.close)
+                )
+            )
+        return "\n".join(lines)
+
+    def _get_rag_context(self, question: str) -> tuple[str, list[int] | None]:
+        """
+        Retrieved context and the ids of the chunks it was built from
+        (None while the index is still loading).
+        """
+        retriever = self.retriever
+        if retriever is None:
+            return "The document index is still loading; no documents are available yet.", None
+
+        # Over-fetch, then let the budget decide what reaches the prompt.
+        # Scope to the companies / years the question names, widening when
+        # nothing is tagged with them.
+        results = []
+        for filters in self._document_filters(question):
+            results = retriever.search(
+                question, top_k=config.RAG_CANDIDATES, filters=filters
+            )
+            if results:
+                break
+
+        with span("context_assembly"):
+            context, chunk_ids = self.context_assembler.assemble(results)
+        if not context:
+            return "No relevant documents found.", []
+        return context, chunk_ids
+
+    def _document_filters(self, question: str) -> list[dict | None]:
+        """Retrieval filters to try in turn, narrowest first."""
+        # Exact mentions only: a fuzzy guess must not narrow the search
+        tickers = list(dict.fromkeys(
+            ticker for _, _, ticker in self.ticker_resolver.find_matches(question)
+        ))
+        years = fiscal_years(question)
+
+        attempts: list[dict | None] = []
+        if tickers and years:
+            attempts.append({"ticker": tickers, "year": years})
+        if tickers:
+            attempts.append({"ticker": tickers})
+        elif years:
+            attempts.append({"year": years})
+        attempts.append(None)
+        return attempts
@@ -1,27 +1,140 @@
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
 from enum import Enum
 
+# "last 30 days", "past 6 months", "last week", "over the past year"
+_LOOKBACK = re.compile(
+    r"\b(?:last|past|previous)\s+(?:(\d+)\s+)?(day|week|month|year)s?\b"
+)
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+# "50-day moving average", "200 day sma"
+_MA_WINDOW = re.compile(r"\b(\d+)[- ]?d(?:ay)?\s+(?:moving average|sma|ma)\b")
+
+# Whole words only ("sma" is not "small"); "return" and "performance"
+# alone are too often fundamentals ("return on equity", "services
+# performance"), so they need a price / stock context
+_INDICATOR_WORDS = [
+    "volatility", "volatile", "rsi", "moving averages?", "sma", "drawdowns?",
+    "correlation", "correlated", "returns",
+    r"(?:stock|share|price|total|daily|weekly|monthly|annual)\s+return",
+    r"(?:stock|share|price)\s+performance",
+    r"performance\s+of\s+(?:the\s+|its\s+)?(?:stock|shares)",
+]
+# Price-series cues; "trend" and "closes" only count next to a price /
+# stock word ("revenue trend" is not a price history)
+_HISTORY = re.compile(
+    r"\b(?:history|historical|closing prices?|(?:daily|weekly|monthly) closes"
+    r"|(?:price|stock|share) trend"
+    r"|trend (?:of|in) (?:the |its )?(?:price|stock|shares?))\b"
+)
+# Company fundamentals: a lookback or trend over these is a question for
+# the documents, not the price history
+_FUNDAMENTAL = re.compile(
+    r"\b(?:revenues?|earnings|eps|margins?|sales|guidance|profits?|income)\b"
+)
+_DOCUMENT_WORDS = ["report", "document", "pdf", "said"]
+# Live quote cues; "stock" / "share" only name the subject, so they count
+# when the question asks for nothing more specific (indicators, history)
+_QUOTE = re.compile(r"\b(?:price(?!\s+history)|quote|market cap|trading at)\b")
+_SUBJECT_WORDS = ["share", "stock"]
+
+# Confidence of an intent backed by one cue, and added per extra cue
+_BASE_CONFIDENCE = 0.6
+_CUE_CONFIDENCE = 0.15
+# Indicator / history cues inside a document question ("what did the
+# report say about returns") usually describe the document's content
+_DOCUMENT_DISCOUNT = 0.5
+
 
 class QueryType(Enum):
     LIVE_MARKET="live_market"
+    INDICATOR = "indicator"
+    HISTORICAL = "historical"
     DOCUMENT = "document"
     GENERAL = "general"
 
 
+@dataclass(frozen=True)
+class Intent:
+    """One thing a question asks for, with how sure the router is."""
+
+    type: QueryType
+    confidence: float
+
+
 class QueryRouter:
     """
     Routes user queries to the correct data source.
     """
 
     def route(self, question: str) -> QueryType:
+        """The single most likely intent of `question`."""
+        return self.classify(question)[0].type
+
+    def classify(self, question: str) -> list[Intent]:
+        """
+        Every intent found in `question`, most confident first.
+
+        A mixed question ("what did Apple's report say and where is the
+        stock now?") yields several intents; GENERAL is only returned
+        when nothing else is found.
+
+        Returns:
+            list[Intent]: at least one intent; ties keep the order
+            indicator, historical, live market, document.
+        """
         q = question.lower()
+        document_cues = sum(word in q for word in _DOCUMENT_WORDS)
+        discount = _DOCUMENT_DISCOUNT if document_cues else 1.0
+
+        indicator_cues = sum(
+            bool(re.search(rf"\b(?:{word})\b", q)) for word in _INDICATOR_WORDS
+        )
+        if _FUNDAMENTAL.search(q):
+            history_cues = 0
+        else:
+            history_cues = len(_HISTORY.findall(q))
+            # "volatility over the last 6 months": the lookback qualifies
+            # the indicator rather than asking for the price series
+            if not indicator_cues and _LOOKBACK.search(q):
+                history_cues += 1
+        quote_cues = len(_QUOTE.findall(q))
+        if not (quote_cues or indicator_cues or history_cues):
+            quote_cues = sum(word in q for word in _SUBJECT_WORDS)
+
+        cues = [
+            (QueryType.INDICATOR, indicator_cues, discount),
+            (QueryType.HISTORICAL, history_cues, discount),
+            (QueryType.LIVE_MARKET, quote_cues, 1.0),
+            (QueryType.DOCUMENT, document_cues, 1.0),
+        ]
+
+        intents = [
+            Intent(query_type, self._confidence(count) * weight)
+            for query_type, count, weight in cues
+            if count
+        ]
+        if not intents:
+            return [Intent(QueryType.GENERAL, 1.0)]
 
-        if any(word in q for word in ["price", "share", "stock", "market cap"]):
-            return QueryType.LIVE_MARKET
+        # Stable sort keeps the precedence order among equal confidences
+        intents.sort(key=lambda intent: -intent.confidence)
+        return intents
 
-        if any(word in q for word in ["report", "document", "pdf", "said"]):
-            return QueryType.DOCUMENT
+    def _confidence(self, cues: int) -> float:
+        return min(1.0, _BASE_CONFIDENCE + _CUE_CONFIDENCE * (cues - 1))
 
-        return QueryType.GENERAL
+    def lookback_days(self, question: str, default: int = 30) -> int:
+        """Calendar days a historical question asks about."""
+        match = _LOOKBACK.search(question.lower())
+        if not match:
+            return default
+        count = int(match.group(1) or 1)
+        return count * _UNIT_DAYS[match.group(2)]
 
+    def moving_average_window(self, question: str, default: int = 20) -> int:
+        """Window of the moving average a question asks about."""
+        match = _MA_WINDOW.search(question.lower())
+        return int(match.group(1)) if match else default
@@ -4,6 +4,7 @@ Application configuration for MarketMinds Chatbot.
 this module handles the configuration settings required for the backend application.
 havind a dedicated config module allows for better organization and easier management of settings.
 """
+import os
 from pathlib import Path
 
 
@@ -14,14 +15,139 @@ class AppConfig:
     RAW_DATA_DIR: Path = DATA_DIR / "raw"
     PROCESSED_DATA_DIR: Path = DATA_DIR / "processed"
     VECTOR_STORE_DIR: Path = DATA_DIR / "vector_store"
+    VECTOR_STORE_PATH: Path = VECTOR_STORE_DIR / "faiss_store"
 
 
     APP_NAME: str = "MarketMinds"
     DEBUG: bool = True
     DEFAULT_MODEL_NAME: str = "mistral"
 
+    # LLM backend: "http" talks to a running `ollama serve`,
+    # "subprocess" shells out to `ollama run` per request.
+    LLM_BACKEND: str = "http"
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_KEEP_ALIVE: str = "30m"
+    LLM_CONNECT_TIMEOUT: float = 5.0
+    LLM_READ_TIMEOUT: float = 120.0
+    LLM_MAX_CONCURRENCY: int = 4
+    # LLM scheduler: at most LLM_MAX_CONCURRENCY generations run at once;
+    # others wait, interactive before batch and round-robin across
+    # clients, up to LLM_QUEUE_SIZE in total and LLM_CLIENT_QUEUE_SIZE per
+    # client. A question whose estimated wait exceeds its priority's
+    # deadline (seconds) is rejected at once with Retry-After.
+    # LLM_SERVICE_TIME seeds the seconds-per-generation estimate.
+    LLM_QUEUE_SIZE: int = 64
+    LLM_CLIENT_QUEUE_SIZE: int = 8
+    LLM_QUEUE_DEADLINES: dict = {"interactive": 15.0, "batch": 120.0}
+    LLM_SERVICE_TIME: float = 5.0
+
+    # Embeddings: "sentence-transformers" runs a local CPU model,
+    # "dummy" uses the 1-dim length stub.
+    EMBEDDING_BACKEND: str = "sentence-transformers"
+    EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_NUM_THREADS: int | None = None
+    EMBEDDING_CACHE_DIR: Path = DATA_DIR / "embedding_cache"
+    EMBEDDING_CACHE_SIZE: int = 50_000
+
+    # Vector store: appended vectors are folded into the index file
+    # once this many have accumulated.
+    VECTOR_STORE_CHECKPOINT_EVERY: int = 10_000
+    # "flat", "ivf_flat", "ivf_pq", "hnsw" or "auto" (by corpus size),
+    # with default per-query search effort for the approximate types.
+    VECTOR_INDEX_TYPE: str = "auto"
+    VECTOR_NPROBE: int = 16
+    VECTOR_EF_SEARCH: int = 64
+    # "hybrid" fuses vector and BM25 rankings; "vector" or "lexical" alone
+    RETRIEVAL_MODE: str = "hybrid"
+    # Filtered searches matching at most this many chunks scan exactly
+    # those chunks; larger sets go through the index with an ID selector
+    FILTER_EXACT_SCAN_MAX: int = 50_000
+    # Shared index: with SHARED_INDEX=1, API workers serve the read-only
+    # generation last published to INDEX_GENERATIONS_DIR (by
+    # `ingest_pipeline --publish`) instead of building their own store,
+    # and look for a newer one every INDEX_GENERATION_POLL seconds. The
+    # publisher keeps the newest INDEX_GENERATIONS_KEEP generations.
+    SHARED_INDEX: bool = os.environ.get("SHARED_INDEX", "0") == "1"
+    INDEX_GENERATIONS_DIR: Path = VECTOR_STORE_DIR / "generations"
+    INDEX_GENERATION_POLL: float = 5.0
+    INDEX_GENERATIONS_KEEP: int = 3
+
+    # Live quotes: seconds a quote stays fresh, keyed by exchange suffix
+    # ("" = US listings / default), plus how long an expired quote may be
+    # served while it is refreshed in the background.
+    QUOTE_CACHE_TTLS: dict = {"": 15.0, ".NS": 15.0, ".L": 30.0, ".DE": 30.0,
+                              ".PA": 30.0, ".AS": 30.0, ".SW": 30.0}
+    QUOTE_CACHE_STALE_TTL: float = 60.0
+    # Concurrent fetches when a provider has no batch endpoint
+    QUOTE_FANOUT: int = 8
+
+    # Market data providers, tried in order ("yfinance", "finnhub",
+    # "alpha_vantage", "replay"); keyed providers are skipped without a key.
+    MARKET_DATA_PROVIDERS: list = os.environ.get(
+        "MARKET_DATA_PROVIDERS", "yfinance,finnhub,alpha_vantage"
+    ).split(",")
+    FINNHUB_API_KEY: str | None = os.environ.get("FINNHUB_API_KEY")
+    ALPHA_VANTAGE_API_KEY: str | None = os.environ.get("ALPHA_VANTAGE_API_KEY")
+    MARKET_CONNECT_TIMEOUT: float = 3.0
+    MARKET_READ_TIMEOUT: float = 5.0
+    # (requests, per seconds) per provider; free-tier limits by default
+    MARKET_RATE_LIMITS: dict = {"finnhub": (60, 60.0), "alpha_vantage": (5, 60.0)}
+    # Replay provider: recorded quotes ({ticker: quote}, price history
+    # next to it in <name>.history.json) and simulated per-request
+    # latency; set MARKET_RECORD_PATH to record live quotes and history.
+    MARKET_REPLAY_PATH: Path = Path(
+        os.environ.get("MARKET_REPLAY_PATH", DATA_DIR / "replay" / "quotes.json")
+    )
+    MARKET_REPLAY_LATENCY: float = 0.0
+    MARKET_RECORD_PATH: Path | None = (
+        Path(os.environ["MARKET_RECORD_PATH"]) if os.environ.get("MARKET_RECORD_PATH") else None
+    )
+
+    # Daily price history: local columnar store, how far back a cold
+    # ticker is backfilled, and how long a sync stays fresh (seconds).
+    PRICE_STORE_DIR: Path = DATA_DIR / "price_history"
+    PRICE_HISTORY_BACKFILL_DAYS: int = 5 * 365
+    PRICE_HISTORY_REFRESH: float = 6 * 3600.0
+
+    # Prompt context: chunks retrieved per question, token budget for
+    # the context block, and trigram overlap above which a chunk counts
+    # as a duplicate.
+    RAG_CANDIDATES: int = 8
+    CONTEXT_TOKEN_BUDGET: int = 600
+    CONTEXT_DEDUP_THRESHOLD: float = 0.8
+
+    # Routing: intents below this confidence are ignored. Questions with
+    # several intents gather every source concurrently; a source that has
+    # not answered within its deadline (seconds, by route) is left out.
+    INTENT_MIN_CONFIDENCE: float = 0.5
+    SOURCE_DEADLINES: dict = {
+        "live_market": 3.0,
+        "indicator": 5.0,
+        "historical": 5.0,
+        "document": 3.0,
+    }
+
+    # Answer cache: finished LLM answers kept, seconds each stays valid,
+    # and cosine similarity for near-duplicate questions (None = exact only)
+    ANSWER_CACHE_SIZE: int = 2_000
+    ANSWER_CACHE_TTL: float = 24 * 3600.0
+    ANSWER_CACHE_SIMILARITY: float | None = 0.95
+
+    # PDF ingestion processes (None = one per core), chunks a worker
+    # hands over at a time, and batches it may queue ahead per file
+    INGEST_WORKERS: int | None = None
+    INGEST_BATCH_CHUNKS: int = 256
+    INGEST_QUEUE_BATCHES: int = 4
+
+    # Request pipeline: questions admitted at once before /ask sheds
+    # load with 503, and threads for blocking work (retrieval).
+    MAX_INFLIGHT_REQUESTS: int = 512
+    BLOCKING_WORKERS: int = 8
+    # Seconds shutdown waits for a document load still in progress
+    LOAD_SHUTDOWN_TIMEOUT: float = 10.0
+
 
 config = AppConfig()
 
 
- 
\ No newline at end of file
@@ -1,21 +1,54 @@
 """
-Live market data client using Yahoo Finance.
+Live market data client and company/ticker resolution.
 """
 
-from datetime import datetime
-import yfinance as yf
+import asyncio
 from pathlib import Path
 import csv
+import re
+import threading
+import time
+
+import numpy as np
+
+from backend.app.config import config
+from backend.app.data_sources.price_store import PriceHistory, PriceStore
+from backend.app.data_sources.providers import MarketDataProvider, create_market_provider
+from backend.app.data_sources.quote_cache import QuoteCache
+from backend.app.utils.text_utils import AhoCorasick
+
+
+# Corporate suffixes dropped to derive short aliases ("Cisco Systems" -> "Cisco")
+_NAME_SUFFIXES = {
+    "inc", "inc.", "corp", "corp.", "corporation", "ltd", "ltd.", "limited",
+    "plc", "ag", "se", "nv", "sa", "group", "holdings", "industries",
+    "systems", "technologies", "company",
+}
+_MIN_ALIAS_LENGTH = 4
+_MIN_FUZZY_LENGTH = 5
 
 
 class TickerResolver:
     """
     Resolves company names to stock tickers using predefined datasets.
+
+    All company names, derived aliases and ticker symbols are compiled into
+    one Aho–Corasick automaton, so a question is scanned once regardless of
+    how many instruments are listed. Matches must sit on word boundaries;
+    overlapping matches are resolved in favour of the longest. Ticker
+    symbols only match when written in upper case ("AAPL", "RELIANCE"),
+    so short symbols like "IT" or "ON" do not fire on ordinary words.
+    A single-typo fuzzy lookup is used when nothing matches exactly.
     """
 
     def __init__(self):
         self.company_to_ticker = {}
+        self._aliases = {}
+        self._symbols = {}
+        self._matcher = AhoCorasick()
+        self._fuzzy = {}
         self._load_all()
+        self._compile()
 
     def _load_all(self):
         base_dir = Path(__file__).resolve().parents[3]
@@ -34,19 +67,141 @@ class TickerResolver:
                 ticker = row["ticker"]
                 self.company_to_ticker[name] = ticker
 
+                alias = self._alias_for(name)
+                if alias:
+                    self._aliases.setdefault(alias, ticker)
+
+                self._symbols.setdefault(ticker, ticker)
+                base_symbol = ticker.split(".")[0]
+                if len(base_symbol) > 1:
+                    self._symbols.setdefault(base_symbol, ticker)
+
+    def _alias_for(self, name: str) -> str | None:
+        words = name.split()
+        while len(words) > 1 and words[-1] in _NAME_SUFFIXES:
+            words.pop()
+        alias = " ".join(words)
+        if alias != name and len(alias) >= _MIN_ALIAS_LENGTH:
+            return alias
+        return None
+
+    def _compile(self):
+        # Full names win over derived aliases when both exist
+        names = dict(self._aliases)
+        names.update(self.company_to_ticker)
+
+        for name, ticker in names.items():
+            self._matcher.add(name, (ticker, False))
+            if " " not in name and len(name) >= _MIN_FUZZY_LENGTH:
+                for variant in (name, *self._deletions(name)):
+                    self._fuzzy.setdefault(variant, ticker)
+
+        for symbol, ticker in self._symbols.items():
+            self._matcher.add(symbol.lower(), (ticker, True))
+
+        self._matcher.build()
+
+    def find_matches(self, question: str) -> list[tuple[int, int, str]]:
+        """
+        Find every company mentioned in `question`.
+
+        Returns:
+            list: (start, end, ticker) for non-overlapping matches, in
+            the order they appear.
+        """
+        # Lower-case char by char so offsets line up with `question`
+        q = "".join(c.lower() if len(c.lower()) == 1 else c for c in question)
+
+        candidates = []
+        for start, end, (ticker, is_symbol) in self._matcher.iter_matches(q):
+            if not self._on_word_boundary(q, start, end):
+                continue
+            if is_symbol and not question[start:end].isupper():
+                continue
+            candidates.append((start, end, ticker))
+
+        # Longest match first, then leftmost; drop anything overlapping
+        candidates.sort(key=lambda m: (m[0] - m[1], m[0]))
+        taken = []
+        for match in candidates:
+            if all(match[1] <= s or match[0] >= e for s, e, _ in taken):
+                taken.append(match)
+
+        return sorted(taken)
+
     def resolve(self, question: str) -> str | None:
-        q = question.lower()
-        for company, ticker in self.company_to_ticker.items():
-            if company in q:
-                return ticker
+        matches = self.find_matches(question)
+        if matches:
+            return matches[0][2]
+        return self._resolve_fuzzy(question)
+
+    def resolve_all(self, question: str) -> list[str]:
+        """
+        Resolve every company in `question` ("compare Apple and Nvidia").
+
+        Returns:
+            list[str]: distinct tickers in order of appearance (empty when
+            nothing resolves).
+        """
+        tickers = [ticker for _, _, ticker in self.find_matches(question)]
+        if not tickers:
+            fuzzy = self._resolve_fuzzy(question)
+            return [fuzzy] if fuzzy else []
+        return list(dict.fromkeys(tickers))
+
+    def _resolve_fuzzy(self, question: str) -> str | None:
+        for token in re.findall(r"[a-z][a-z0-9&]+", question.lower()):
+            if len(token) < _MIN_FUZZY_LENGTH:
+                continue
+            for variant in (token, *self._deletions(token)):
+                ticker = self._fuzzy.get(variant)
+                if ticker:
+                    return ticker
         return None
 
+    @staticmethod
+    def _deletions(word: str) -> list[str]:
+        """Every string one deletion away from `word` (SymSpell-style)."""
+        return [word[:i] + word[i + 1:] for i in range(len(word))]
+
+    @staticmethod
+    def _on_word_boundary(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not before.isalnum() and not after.isalnum()
+
 
 class MarketDataClient:
     """
     Fetches live market data for equities.
+
+    Quotes come from a MarketDataProvider (yfinance, Finnhub, Alpha
+    Vantage or a recorded replay, with failover between them) and are
+    served through a QuoteCache, so repeated questions about a popular
+    ticker share one upstream fetch per TTL window. Multi-ticker lookups
+    send every uncached ticker to the provider in one batch.
+
+    Daily history lives in a local PriceStore: a ticker is backfilled on
+    first use, topped up incrementally at most once per refresh window,
+    and otherwise served from disk without any network round-trip.
     """
 
+    def __init__(
+        self,
+        provider: MarketDataProvider | None = None,
+        cache: QuoteCache | None = None,
+        history: PriceStore | None = None,
+    ) -> None:
+        self.provider = provider or create_market_provider()
+        self.cache = cache or QuoteCache(
+            self.provider.get_quote, fetch_many=self.provider.get_quotes
+        )
+        self.history = history or PriceStore()
+
+        # ticker -> lock, so concurrent questions share one history sync
+        self._sync_locks: dict[str, threading.Lock] = {}
+        self._sync_guard = threading.Lock()
+
     def get_stock_price(self, ticker: str) -> dict:
         """
         Get the latest stock price for a given ticker.
@@ -57,17 +212,83 @@ class MarketDataClient:
         Returns:
             dict: price info with timestamp
         """
-        stock = yf.Ticker(ticker)
-        data = stock.history(period="1d")
+        return self.cache.get(ticker)
+
+    async def aget_stock_price(self, ticker: str) -> dict:
+        """
+        Async variant of `get_stock_price`.
+
+        Providers are blocking, so the fetch runs in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_stock_price, ticker)
+
+    def get_stock_prices(self, tickers: list[str]) -> dict[str, dict]:
+        """
+        Get the latest prices for several tickers at once.
+
+        Args:
+            tickers (list[str]): Stock ticker symbols.
+
+        Returns:
+            dict[str, dict]: price info by ticker, in request order;
+            tickers that could not be fetched are omitted.
+        """
+        return self.cache.get_many(tickers)
+
+    async def aget_stock_prices(self, tickers: list[str]) -> dict[str, dict]:
+        """
+        Async variant of `get_stock_prices`.
+        """
+        return await asyncio.to_thread(self.get_stock_prices, tickers)
+
+    def get_price_history(self, ticker: str, days: int = 30) -> PriceHistory:
+        """
+        Daily bars for the last `days` calendar days.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            days (int): Look-back window in calendar days.
+
+        Returns:
+            PriceHistory: bars oldest first (empty if none are known).
+        """
+        self._ensure_history(ticker)
+        start = np.datetime64("today", "D") - np.timedelta64(days, "D")
+        return self.history.window(ticker, start=start)
+
+    async def aget_price_history(self, ticker: str, days: int = 30) -> PriceHistory:
+        """
+        Async variant of `get_price_history`.
+        """
+        return await asyncio.to_thread(self.get_price_history, ticker, days)
+
+    def close(self) -> None:
+        """Release provider connections."""
+        self.provider.close()
+
+    def _ensure_history(self, ticker: str) -> None:
+        """Sync `ticker` from the provider unless it synced recently."""
+        with self._sync_guard:
+            lock = self._sync_locks.setdefault(ticker, threading.Lock())
 
-        if data.empty:
-            raise ValueError(f"No data found for ticker {ticker}")
+        with lock:
+            synced_at = self.history.synced_at(ticker)
+            if synced_at is not None and time.time() - synced_at < config.PRICE_HISTORY_REFRESH:
+                return
 
-        latest = data.iloc[-1]
+            last = self.history.last_date(ticker)
+            if last is None:
+                start = np.datetime64("today", "D") - np.timedelta64(
+                    config.PRICE_HISTORY_BACKFILL_DAYS, "D"
+                )
+            else:
+                start = last + np.timedelta64(1, "D")
 
-        return {
-            "ticker": ticker,
-            "price": round(float(latest["Close"]), 2),
-            "currency": "USD",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        }
+            try:
+                self.history.append(self.provider.get_history(ticker, start))
+            except Exception:
+                # Serve what is on disk; only fail when there is nothing
+                if last is None:
+                    raise
+                return
+            self.history.mark_synced(ticker)
@@ -0,0 +1,204 @@
+"""
+Local store for daily price history (OHLCV).
+
+Each ticker is a directory of column files, one fixed-width array per
+field:
+- date.i8: trading day as days since 1970-01-01 (int64, ascending)
+- open.f8 / high.f8 / low.f8 / close.f8 / volume.f8 (float64)
+- meta.json: when the ticker was last synced with a provider
+
+Columns are appended in place and read back through memory maps, so a
+window query is a binary search on the date column plus array slices;
+nothing is parsed and only the touched pages are read. The date column
+is written last and acts as the commit marker: on open, every column is
+trimmed to the shortest one, dropping a torn append.
+"""
+
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend.app.config import config
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+_DATE_DTYPE = np.dtype("<i8")
+_VALUE_DTYPE = np.dtype("<f8")
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+
+
+@dataclass(frozen=True)
+class PriceHistory:
+    """Daily bars for one ticker, as parallel arrays (oldest first)."""
+
+    ticker: str
+    dates: np.ndarray  # datetime64[D]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def empty(cls, ticker: str) -> "PriceHistory":
+        values = np.empty(0, dtype=_VALUE_DTYPE)
+        return cls(ticker, np.empty(0, dtype="datetime64[D]"), *([values] * len(FIELDS)))
+
+    def tail(self, rows: int) -> "PriceHistory":
+        """The most recent `rows` bars."""
+        return self[max(len(self) - rows, 0):]
+
+    def __getitem__(self, key: slice) -> "PriceHistory":
+        return PriceHistory(
+            self.ticker,
+            self.dates[key],
+            *(getattr(self, field)[key] for field in FIELDS),
+        )
+
+
+class PriceStore:
+    """
+    Memory-mapped, append-only columnar store of daily bars per ticker.
+    """
+
+    def __init__(self, directory: Path = config.PRICE_STORE_DIR) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # ticker -> mapped columns (dropped whenever the ticker grows)
+        self._mapped: Dict[str, PriceHistory] = {}
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+
+    def window(
+        self,
+        ticker: str,
+        start: Optional[np.datetime64] = None,
+        end: Optional[np.datetime64] = None,
+    ) -> PriceHistory:
+        """
+        Bars with `start <= date <= end` (either bound optional).
+
+        The returned arrays are read-only views into the memory maps.
+        """
+        history = self._columns(ticker)
+        lo = 0 if start is None else np.searchsorted(
+            history.dates, np.datetime64(start, "D"), side="left"
+        )
+        hi = len(history) if end is None else np.searchsorted(
+            history.dates, np.datetime64(end, "D"), side="right"
+        )
+        return history[lo:hi]
+
+    def last_date(self, ticker: str) -> Optional[np.datetime64]:
+        history = self._columns(ticker)
+        return history.dates[-1] if len(history) else None
+
+    def synced_at(self, ticker: str) -> Optional[float]:
+        """Unix time of the last provider sync, if any."""
+        path = self._dir(ticker) / "meta.json"
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("synced_at")
+
+    # --------------------------------------------------
+    # Mutation
+    # --------------------------------------------------
+
+    def append(self, history: PriceHistory) -> int:
+        """
+        Append bars newer than the last stored date.
+
+        Returns:
+            int: number of bars written.
+        """
+        ticker = history.ticker
+        with self._lock:
+            last = self.last_date(ticker)
+            order = np.argsort(history.dates, kind="stable")
+            dates = history.dates[order].astype("datetime64[D]")
+
+            keep = np.ones(len(dates), dtype=bool)
+            keep[1:] = dates[1:] != dates[:-1]
+            if last is not None:
+                keep &= dates > last
+            if not keep.any():
+                return 0
+
+            rows = order[keep]
+            directory = self._dir(ticker)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            # Values first, dates last: the date column commits the rows
+            for field in FIELDS:
+                values = np.asarray(getattr(history, field), dtype=_VALUE_DTYPE)[rows]
+                with open(directory / f"{field}.f8", "ab") as f:
+                    f.write(values.tobytes())
+            with open(directory / "date.i8", "ab") as f:
+                f.write(dates[keep].astype(_DATE_DTYPE).tobytes())
+
+            self._mapped.pop(ticker, None)
+            return int(keep.sum())
+
+    def mark_synced(self, ticker: str, when: Optional[float] = None) -> None:
+        directory = self._dir(ticker)
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"synced_at": time.time() if when is None else when}, f)
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _dir(self, ticker: str) -> Path:
+        return self.directory / _UNSAFE_CHARS.sub("_", ticker)
+
+    def _columns(self, ticker: str) -> PriceHistory:
+        history = self._mapped.get(ticker)
+        if history is None:
+            history = self._open(ticker)
+            self._mapped[ticker] = history
+        return history
+
+    def _open(self, ticker: str) -> PriceHistory:
+        directory = self._dir(ticker)
+        date_path = directory / "date.i8"
+        if not date_path.exists():
+            return PriceHistory.empty(ticker)
+
+        paths = [date_path] + [directory / f"{field}.f8" for field in FIELDS]
+        for path in paths:
+            path.touch()
+
+        # Trim every column to the rows committed in all of them
+        rows = min(path.stat().st_size // 8 for path in paths)
+        for path in paths:
+            if path.stat().st_size != rows * 8:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * 8)
+
+        if not rows:
+            return PriceHistory.empty(ticker)
+
+        dates = np.memmap(date_path, dtype=_DATE_DTYPE, mode="r", shape=(rows,))
+        return PriceHistory(
+            ticker,
+            dates.view("datetime64[D]"),
+            *(
+                np.memmap(path, dtype=_VALUE_DTYPE, mode="r", shape=(rows,))
+                for path in paths[1:]
+            ),
+        )
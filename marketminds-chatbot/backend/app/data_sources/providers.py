@@ -0,0 +1,580 @@
+"""
+Market data providers for MarketMinds Chatbot.
+
+Every source implements the same small interface
+(`get_quote(ticker) -> dict`, `get_quotes(tickers) -> dict`, and
+optionally `get_history(ticker, start) -> PriceHistory`), so the quote
+cache and the response builder never care where a price came from.
+
+- YFinanceProvider: Yahoo Finance via yfinance (batched downloads)
+- FinnhubProvider / AlphaVantageProvider: REST APIs over one shared,
+  pooled HTTP session, each behind its own rate limiter
+- ReplayProvider: serves quotes (and price history) recorded to JSON
+  files, for offline development and load tests; RecordingProvider
+  captures them
+- FailoverProvider: tries providers in order, skipping any that error
+  or are out of rate-limit budget
+
+All quotes share one shape:
+    {"ticker": str, "price": float, "currency": str, "timestamp": str}
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+import yfinance as yf
+
+from backend.app.config import config
+from backend.app.data_sources.price_store import FIELDS, PriceHistory
+
+
+class ProviderError(Exception):
+    """A provider could not serve a request."""
+
+
+class RateLimitedError(ProviderError):
+    """A provider is out of request budget (locally or upstream)."""
+
+
+class RateLimiter:
+    """
+    Token bucket: `rate` requests per `per` seconds, with bursts up to
+    `rate`. Non-blocking, so a failover chain can move straight on to the
+    next provider instead of queueing behind a throttled one.
+    """
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.fill_rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def create_http_session() -> httpx.Client:
+    """One keep-alive connection pool shared by every HTTP provider."""
+    return httpx.Client(
+        timeout=httpx.Timeout(
+            config.MARKET_READ_TIMEOUT, connect=config.MARKET_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=config.QUOTE_FANOUT,
+            max_keepalive_connections=config.QUOTE_FANOUT,
+        ),
+    )
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class MarketDataProvider:
+    """
+    Base class for quote sources.
+    """
+
+    name = "base"
+
+    def __init__(self, limiter: Optional[RateLimiter] = None) -> None:
+        self.limiter = limiter
+
+    def get_quote(self, ticker: str) -> dict:
+        raise NotImplementedError
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, dict]:
+        """
+        Quotes for several tickers; those that fail are omitted.
+
+        The default issues one request per ticker and stops early when
+        the provider runs out of rate-limit budget.
+        """
+        quotes = {}
+        for ticker in tickers:
+            try:
+                quotes[ticker] = self.get_quote(ticker)
+            except RateLimitedError:
+                break
+            except Exception:
+                continue
+        return quotes
+
+    def get_history(
+        self, ticker: str, start: Optional[np.datetime64] = None
+    ) -> PriceHistory:
+        """
+        Daily bars from `start` (inclusive) to today; None = full history.
+        """
+        raise NotImplementedError(f"{self.name} has no price history")
+
+    def close(self) -> None:
+        pass
+
+    def _acquire(self) -> None:
+        if self.limiter is not None and not self.limiter.try_acquire():
+            raise RateLimitedError(f"{self.name}: rate limit reached")
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance."""
+
+    name = "yfinance"
+
+    def get_quote(self, ticker: str) -> dict:
+        self._acquire()
+        data = yf.Ticker(ticker).history(period="1d")
+
+        if data.empty:
+            raise ValueError(f"No data found for ticker {ticker}")
+
+        return self._quote_from_history(ticker, data)
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, dict]:
+        """All tickers in one download."""
+        if len(tickers) == 1:
+            return super().get_quotes(tickers)
+
+        self._acquire()
+        data = yf.download(
+            tickers,
+            period="1d",
+            group_by="ticker",
+            progress=False,
+            threads=True,
+        )
+
+        quotes = {}
+        for ticker in tickers:
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            history = data[ticker].dropna(subset=["Close"])
+            if not history.empty:
+                quotes[ticker] = self._quote_from_history(ticker, history)
+        return quotes
+
+    def get_history(
+        self, ticker: str, start: Optional[np.datetime64] = None
+    ) -> PriceHistory:
+        self._acquire()
+        stock = yf.Ticker(ticker)
+        if start is None:
+            data = stock.history(period="max", auto_adjust=False)
+        else:
+            data = stock.history(start=str(np.datetime64(start, "D")), auto_adjust=False)
+
+        if data.empty:
+            return PriceHistory.empty(ticker)
+
+        index = data.index.tz_localize(None) if data.index.tz else data.index
+        return PriceHistory(
+            ticker,
+            index.values.astype("datetime64[D]"),
+            *(data[column].to_numpy(dtype="float64") for column in
+              ("Open", "High", "Low", "Close", "Volume")),
+        )
+
+    def _quote_from_history(self, ticker: str, data) -> dict:
+        latest = data.iloc[-1]
+
+        return {
+            "ticker": ticker,
+            "price": round(float(latest["Close"]), 2),
+            "currency": "USD",
+            "timestamp": _now(),
+        }
+
+
+class FinnhubProvider(MarketDataProvider):
+    """Finnhub real-time quotes (`/api/v1/quote`)."""
+
+    name = "finnhub"
+    base_url = "https://finnhub.io/api/v1"
+
+    def __init__(
+        self,
+        session: httpx.Client,
+        api_key: str,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        super().__init__(limiter)
+        self.session = session
+        self.api_key = api_key
+
+    def get_quote(self, ticker: str) -> dict:
+        self._acquire()
+        response = self.session.get(
+            f"{self.base_url}/quote",
+            params={"symbol": ticker, "token": self.api_key},
+        )
+        if response.status_code == 429:
+            raise RateLimitedError(f"{self.name}: upstream rate limit")
+        response.raise_for_status()
+
+        data = response.json()
+        # Unknown symbols come back as all zeros
+        if not data.get("c"):
+            raise ValueError(f"No data found for ticker {ticker}")
+
+        timestamp = (
+            datetime.utcfromtimestamp(data["t"]).isoformat() + "Z"
+            if data.get("t") else _now()
+        )
+        return {
+            "ticker": ticker,
+            "price": round(float(data["c"]), 2),
+            "currency": "USD",
+            "timestamp": timestamp,
+        }
+
+
+class AlphaVantageProvider(MarketDataProvider):
+    """Alpha Vantage latest quote (`GLOBAL_QUOTE`)."""
+
+    name = "alpha_vantage"
+    base_url = "https://www.alphavantage.co/query"
+
+    def __init__(
+        self,
+        session: httpx.Client,
+        api_key: str,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        super().__init__(limiter)
+        self.session = session
+        self.api_key = api_key
+
+    def get_quote(self, ticker: str) -> dict:
+        self._acquire()
+        response = self.session.get(
+            self.base_url,
+            params={"function": "GLOBAL_QUOTE", "symbol": ticker, "apikey": self.api_key},
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        # Throttled requests still return 200, with a "Note"/"Information"
+        if "Note" in data or "Information" in data:
+            raise RateLimitedError(f"{self.name}: upstream rate limit")
+
+        quote = data.get("Global Quote") or {}
+        if not quote.get("05. price"):
+            raise ValueError(f"No data found for ticker {ticker}")
+
+        return {
+            "ticker": ticker,
+            "price": round(float(quote["05. price"]), 2),
+            "currency": "USD",
+            "timestamp": _now(),
+        }
+
+    def get_history(
+        self, ticker: str, start: Optional[np.datetime64] = None
+    ) -> PriceHistory:
+        """`TIME_SERIES_DAILY`; the compact (100-day) payload when it suffices."""
+        compact = (
+            start is not None
+            and np.datetime64("today", "D") - np.datetime64(start, "D")
+            < np.timedelta64(100, "D")
+        )
+
+        self._acquire()
+        response = self.session.get(
+            self.base_url,
+            params={
+                "function": "TIME_SERIES_DAILY",
+                "symbol": ticker,
+                "outputsize": "compact" if compact else "full",
+                "apikey": self.api_key,
+            },
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        if "Note" in data or "Information" in data:
+            raise RateLimitedError(f"{self.name}: upstream rate limit")
+
+        series = data.get("Time Series (Daily)") or {}
+        if not series:
+            return PriceHistory.empty(ticker)
+
+        dates = np.array(list(series), dtype="datetime64[D]")
+        values = np.array(
+            [
+                [bar["1. open"], bar["2. high"], bar["3. low"], bar["4. close"], bar["5. volume"]]
+                for bar in series.values()
+            ],
+            dtype="float64",
+        )
+        keep = dates >= np.datetime64(start, "D") if start is not None else slice(None)
+        return PriceHistory(ticker, dates[keep], *values[keep].T)
+
+
+def history_path(quotes_path: Path) -> Path:
+    """Where price history is recorded next to a quotes file."""
+    return quotes_path.with_name(f"{quotes_path.stem}.history.json")
+
+
+def _history_to_json(history: PriceHistory) -> dict:
+    bars = {"dates": [str(date) for date in history.dates]}
+    for field in FIELDS:
+        bars[field] = getattr(history, field).tolist()
+    return bars
+
+
+def _history_from_json(ticker: str, bars: dict) -> PriceHistory:
+    return PriceHistory(
+        ticker,
+        np.array(bars["dates"], dtype="datetime64[D]"),
+        *(np.array(bars[field], dtype="float64") for field in FIELDS),
+    )
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded quotes from a JSON file ({ticker: quote}), and daily
+    bars from `<name>.history.json` next to it when one was recorded.
+
+    Makes no network calls, so the whole `/ask` path can be exercised
+    offline; `latency` adds a fixed delay per request to mimic upstream.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: Path, latency: float = 0.0) -> None:
+        super().__init__()
+        self.path = path
+        self.latency = latency
+        with open(path, encoding="utf-8") as f:
+            self.quotes: Dict[str, dict] = json.load(f)
+        self.histories: Dict[str, dict] = {}
+        if history_path(path).exists():
+            with open(history_path(path), encoding="utf-8") as f:
+                self.histories = json.load(f)
+
+    def get_quote(self, ticker: str) -> dict:
+        if self.latency:
+            time.sleep(self.latency)
+        quote = self.quotes.get(ticker)
+        if quote is None:
+            raise ValueError(f"No recorded quote for ticker {ticker}")
+        return dict(quote)
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, dict]:
+        if self.latency:
+            time.sleep(self.latency)
+        return {t: dict(self.quotes[t]) for t in tickers if t in self.quotes}
+
+    def get_history(
+        self, ticker: str, start: Optional[np.datetime64] = None
+    ) -> PriceHistory:
+        if self.latency:
+            time.sleep(self.latency)
+        bars = self.histories.get(ticker)
+        if bars is None:
+            raise ValueError(f"No recorded price history for ticker {ticker}")
+        history = _history_from_json(ticker, bars)
+        if start is not None:
+            history = history[int(np.searchsorted(history.dates, np.datetime64(start, "D"))):]
+        return history
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Wraps a provider and saves every quote it returns to `path`, in the
+    format ReplayProvider reads.
+    """
+
+    def __init__(self, inner: MarketDataProvider, path: Path) -> None:
+        super().__init__()
+        self.inner = inner
+        self.name = inner.name
+        self.path = path
+        self._lock = threading.Lock()
+        self._recorded: Dict[str, dict] = {}
+        self._histories: Dict[str, dict] = {}
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                self._recorded = json.load(f)
+        if history_path(path).exists():
+            with open(history_path(path), encoding="utf-8") as f:
+                self._histories = json.load(f)
+
+    def get_quote(self, ticker: str) -> dict:
+        quote = self.inner.get_quote(ticker)
+        self._record({ticker: quote})
+        return quote
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, dict]:
+        quotes = self.inner.get_quotes(tickers)
+        self._record(quotes)
+        return quotes
+
+    def get_history(
+        self, ticker: str, start: Optional[np.datetime64] = None
+    ) -> PriceHistory:
+        history = self.inner.get_history(ticker, start)
+        self._record_history(history)
+        return history
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def _record(self, quotes: Dict[str, dict]) -> None:
+        if not quotes:
+            return
+        with self._lock:
+            self._recorded.update(quotes)
+            self._write(self.path, self._recorded)
+
+    def _record_history(self, history: PriceHistory) -> None:
+        if not len(history):
+            return
+        with self._lock:
+            # Merge with bars recorded earlier (incremental syncs only
+            # fetch recent days); newer values win
+            bars = self._histories.get(history.ticker)
+            if bars is not None:
+                merged = _history_from_json(history.ticker, bars)
+                keep = ~np.isin(merged.dates, history.dates)
+                history = PriceHistory(
+                    history.ticker,
+                    *(np.concatenate([getattr(merged, field)[keep], getattr(history, field)])
+                      for field in ("dates",) + FIELDS),
+                )
+                history = history[np.argsort(history.dates, kind="stable")]
+            self._histories[history.ticker] = _history_to_json(history)
+            self._write(history_path(self.path), self._histories)
+
+    def _write(self, path: Path, data: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+class FailoverProvider(MarketDataProvider):
+    """
+    Tries each provider in order until one answers.
+
+    For batches, whatever the first provider could not serve is passed
+    on to the next, so one throttled source only costs its own tickers.
+    """
+
+    name = "failover"
+
+    def __init__(
+        self,
+        providers: Sequence[MarketDataProvider],
+        session: Optional[httpx.Client] = None,
+    ) -> None:
+        """
+        Args:
+            providers (Sequence[MarketDataProvider]): In priority order.
+            session (Optional[httpx.Client]): Shared HTTP pool, closed
+                together with the providers.
+        """
+        super().__init__()
+        if not providers:
+            raise ValueError("At least one market data provider is required")
+        self.providers = list(providers)
+        self.session = session
+
+    def get_quote(self, ticker: str) -> dict:
+        errors = []
+        for provider in self.providers:
+            try:
+                return provider.get_quote(ticker)
+            except Exception as e:
+                errors.append(f"{provider.name}: {e}")
+        raise ProviderError("; ".join(errors))
+
+    def get_quotes(self, tickers: List[str]) -> Dict[str, dict]:
+        quotes: Dict[str, dict] = {}
+        remaining = list(tickers)
+        for provider in self.providers:
+            if not remaining:
+                break
+            try:
+                quotes.update(provider.get_quotes(remaining))
+            except Exception:
+                continue
+            remaining = [t for t in remaining if t not in quotes]
+        return {t: quotes[t] for t in tickers if t in quotes}
+
+    def get_history(
+        self, ticker: str, start: Optional[np.datetime64] = None
+    ) -> PriceHistory:
+        errors = []
+        for provider in self.providers:
+            try:
+                return provider.get_history(ticker, start)
+            except Exception as e:
+                errors.append(f"{provider.name}: {e}")
+        raise ProviderError("; ".join(errors))
+
+    def close(self) -> None:
+        for provider in self.providers:
+            provider.close()
+        if self.session is not None:
+            self.session.close()
+
+
+def _limiter(name: str) -> Optional[RateLimiter]:
+    limit = config.MARKET_RATE_LIMITS.get(name)
+    return RateLimiter(*limit) if limit else None
+
+
+def create_market_provider(
+    names: Sequence[str] = config.MARKET_DATA_PROVIDERS,
+) -> MarketDataProvider:
+    """
+    Build the configured provider chain.
+
+    Providers that need an API key are skipped when none is set.
+    """
+    session = None
+    providers: List[MarketDataProvider] = []
+
+    for name in names:
+        if name == "yfinance":
+            providers.append(YFinanceProvider(_limiter(name)))
+        elif name == "finnhub" and config.FINNHUB_API_KEY:
+            session = session or create_http_session()
+            providers.append(
+                FinnhubProvider(session, config.FINNHUB_API_KEY, _limiter(name))
+            )
+        elif name == "alpha_vantage" and config.ALPHA_VANTAGE_API_KEY:
+            session = session or create_http_session()
+            providers.append(
+                AlphaVantageProvider(session, config.ALPHA_VANTAGE_API_KEY, _limiter(name))
+            )
+        elif name == "replay":
+            providers.append(
+                ReplayProvider(config.MARKET_REPLAY_PATH, config.MARKET_REPLAY_LATENCY)
+            )
+
+    chain: MarketDataProvider = FailoverProvider(providers, session=session)
+    # One recorder around the whole chain, so whichever provider answers,
+    # every recording lands in the same file
+    if config.MARKET_RECORD_PATH is not None:
+        chain = RecordingProvider(chain, config.MARKET_RECORD_PATH)
+    return chain
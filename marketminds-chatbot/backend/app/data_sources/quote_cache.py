@@ -0,0 +1,227 @@
+"""
+In-process quote cache for live market data.
+
+- per-market TTLs, chosen from the ticker's exchange suffix
+- single-flight: concurrent requests for the same ticker share one fetch
+- batch lookups: all misses of a multi-ticker request go out in one
+  batched fetch (or a bounded concurrent fan-out)
+- stale-while-revalidate: a recently expired quote is served immediately
+  while one background refresh runs
+- hit / stale / miss / coalesced counters for monitoring
+
+The cache wraps any `fetch(ticker) -> dict` callable, so tests can drive
+it with a fake provider and a fake clock instead of the network.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from backend.app.config import config
+
+
+class QuoteCache:
+    """
+    TTL cache with request coalescing in front of a quote fetcher.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], dict],
+        fetch_many: Optional[Callable[[List[str]], Dict[str, dict]]] = None,
+        ttls: Mapping[str, float] = config.QUOTE_CACHE_TTLS,
+        stale_ttl: float = config.QUOTE_CACHE_STALE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            fetch (Callable[[str], dict]): Fetches a fresh quote.
+            fetch_many (Optional[Callable]): Fetches several quotes in one
+                request, returning {ticker: quote} (missing = failed).
+                Without it, batches fan out over `fetch` concurrently.
+            ttls (Mapping[str, float]): Seconds a quote stays fresh, keyed
+                by exchange suffix (".NS", ".L", ...); "" is the default.
+            stale_ttl (float): Extra seconds an expired quote may still be
+                served while it is refreshed in the background.
+            clock (Callable[[], float]): Monotonic time source.
+        """
+        self.fetch = fetch
+        self.fetch_many = fetch_many
+        self.ttls = dict(ttls)
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+        # ticker -> (fetched_at, quote)
+        self._entries: Dict[str, Tuple[float, dict]] = {}
+        # ticker -> fetch currently in flight
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="quote-refresh"
+        )
+        self._fanout = ThreadPoolExecutor(
+            max_workers=config.QUOTE_FANOUT, thread_name_prefix="quote-fanout"
+        )
+
+    def get(self, ticker: str) -> dict:
+        """
+        Return a quote for `ticker`, fetching only when nothing usable
+        is cached.
+        """
+        with self._lock:
+            quote, future, owner = self._claim(ticker)
+        if quote is not None:
+            return quote
+
+        if owner:
+            self._run_fetch(ticker, future)
+        return future.result()
+
+    def get_many(self, tickers: Iterable[str]) -> Dict[str, dict]:
+        """
+        Return quotes for several tickers, fetching every miss together.
+
+        Returns:
+            Dict[str, dict]: quotes by ticker, in request order; tickers
+            whose fetch failed are left out.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        cached: Dict[str, dict] = {}
+        pending: Dict[str, Future] = {}
+        owned: List[str] = []
+
+        with self._lock:
+            for ticker in tickers:
+                quote, future, owner = self._claim(ticker)
+                if quote is not None:
+                    cached[ticker] = quote
+                else:
+                    pending[ticker] = future
+                    if owner:
+                        owned.append(ticker)
+
+        if owned:
+            if self.fetch_many is not None:
+                self._run_fetch_many(owned, pending)
+            else:
+                list(self._fanout.map(
+                    lambda t: self._run_fetch(t, pending[t]), owned
+                ))
+
+        quotes: Dict[str, dict] = {}
+        for ticker in tickers:
+            if ticker in cached:
+                quotes[ticker] = cached[ticker]
+                continue
+            try:
+                quotes[ticker] = pending[ticker].result()
+            except Exception:
+                continue
+        return quotes
+
+    def ttl_for(self, ticker: str) -> float:
+        """Fresh lifetime of a quote, by the ticker's exchange suffix."""
+        suffix = ticker[ticker.rfind("."):] if "." in ticker else ""
+        return self.ttls.get(suffix, self.ttls.get("", 0.0))
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """Drop one ticker (or everything) from the cache."""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker, None)
+
+    def stats(self) -> dict:
+        """Counters for monitoring."""
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _claim(self, ticker: str) -> Tuple[Optional[dict], Optional[Future], bool]:
+        """
+        Look `ticker` up under the lock.
+
+        Returns:
+            Tuple: (quote, None, False) when the cache can answer, else
+            (None, future, owner) where `owner` means the caller must run
+            the fetch and everyone else just waits on `future`.
+        """
+        entry = self._entries.get(ticker)
+        if entry is not None:
+            age = self.clock() - entry[0]
+            ttl = self.ttl_for(ticker)
+            if age < ttl:
+                self.hits += 1
+                return entry[1], None, False
+            if age < ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if ticker not in self._inflight:
+                    future: Future = Future()
+                    self._inflight[ticker] = future
+                    self._refresher.submit(self._run_fetch, ticker, future)
+                return entry[1], None, False
+
+        future = self._inflight.get(ticker)
+        if future is not None:
+            self.coalesced += 1
+            return None, future, False
+
+        self.misses += 1
+        future = Future()
+        self._inflight[ticker] = future
+        return None, future, True
+
+    def _run_fetch_many(self, tickers: List[str], futures: Dict[str, Future]) -> None:
+        """Fetch a batch in one request and publish each result."""
+        try:
+            quotes = self.fetch_many(tickers)
+        except BaseException as e:
+            quotes, error = {}, e
+        else:
+            error = ValueError("No data returned for ticker")
+
+        now = self.clock()
+        with self._lock:
+            for ticker in tickers:
+                self._inflight.pop(ticker, None)
+                if ticker in quotes:
+                    self._entries[ticker] = (now, quotes[ticker])
+                else:
+                    self.errors += 1
+
+        for ticker in tickers:
+            if ticker in quotes:
+                futures[ticker].set_result(quotes[ticker])
+            else:
+                futures[ticker].set_exception(error)
+
+    def _run_fetch(self, ticker: str, future: Future) -> None:
+        """Fetch once and publish the result to every waiter."""
+        try:
+            quote = self.fetch(ticker)
+        except BaseException as e:
+            with self._lock:
+                self.errors += 1
+                self._inflight.pop(ticker, None)
+            future.set_exception(e)
+            return
+
+        with self._lock:
+            self._entries[ticker] = (self.clock(), quote)
+            self._inflight.pop(ticker, None)
+        future.set_result(quote)
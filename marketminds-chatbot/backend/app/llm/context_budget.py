@@ -0,0 +1,131 @@
+"""Context budget manager for MarketMinds Chatbot prompts.
+
+Turns retrieved chunks into the CONTEXT block of a prompt without letting
+it grow unbounded:
+- near-identical chunks (duplicated documents, chunker overlap) are
+  dropped or trimmed
+- chunks are kept in retrieval rank order until the token budget is
+  spent; the last one may be cut on a word boundary to fill the budget
+
+Tokens are estimated from character counts (~4 characters per token for
+English text), which is close enough for budgeting and needs no
+tokenizer.
+"""
+
+import re
+from typing import List, Sequence, Set, Tuple
+
+from backend.app.config import config
+
+CHARS_PER_TOKEN = 4
+
+_WORD = re.compile(r"\w+")
+_MAX_OVERLAP_CHARS = 200
+_MIN_OVERLAP_CHARS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text`."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class ContextAssembler:
+    """
+    Builds a token-budgeted context block from ranked chunks.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = config.CONTEXT_TOKEN_BUDGET,
+        dedup_threshold: float = config.CONTEXT_DEDUP_THRESHOLD,
+        min_fragment_tokens: int = 32,
+    ) -> None:
+        """
+        Args:
+            max_tokens (int): Token budget for the whole context block.
+            dedup_threshold (float): Share of a chunk's word trigrams
+                already present in a kept chunk above which it is dropped.
+            min_fragment_tokens (int): Smallest truncated chunk worth
+                including when the budget runs out mid-chunk.
+        """
+        self.max_tokens = max_tokens
+        self.dedup_threshold = dedup_threshold
+        self.min_fragment_tokens = min_fragment_tokens
+
+    def assemble(self, chunks: Sequence[Tuple[int, str]]) -> Tuple[str, List[int]]:
+        """
+        Select chunks for the prompt.
+
+        Args:
+            chunks (Sequence[Tuple[int, str]]): (chunk id, text), best first.
+
+        Returns:
+            Tuple[str, List[int]]: the context block and the ids of the
+            chunks it contains.
+        """
+        kept: List[Tuple[int, str]] = []
+        kept_shingles: List[Set[Tuple[str, ...]]] = []
+        texts_by_id = {}
+        used = 0
+
+        for chunk_id, text in chunks:
+            text = text.strip()
+            if not text:
+                continue
+
+            shingles = self._shingles(text)
+            if any(self._contained(shingles, other) for other in kept_shingles):
+                continue
+
+            # Consecutive chunks repeat the tail of their predecessor
+            previous = texts_by_id.get(chunk_id - 1)
+            if previous is not None:
+                text = self._strip_overlap(previous, text)
+
+            # "- " prefix plus the blank line separating entries
+            cost = estimate_tokens(text) + (1 if not kept else 2)
+            remaining = self.max_tokens - used
+            if cost > remaining:
+                fragment = self._truncate(text, remaining - 2)
+                if fragment:
+                    kept.append((chunk_id, fragment))
+                break
+
+            kept.append((chunk_id, text))
+            kept_shingles.append(shingles)
+            texts_by_id[chunk_id] = text
+            used += cost
+
+        context = "\n\n".join(f"- {text}" for _, text in kept)
+        return context, [chunk_id for chunk_id, _ in kept]
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _shingles(self, text: str) -> Set[Tuple[str, ...]]:
+        words = _WORD.findall(text.lower())
+        if len(words) < 3:
+            return {tuple(words)}
+        return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+    def _contained(self, shingles: Set, other: Set) -> bool:
+        if not shingles or not other:
+            return False
+        overlap = len(shingles & other) / min(len(shingles), len(other))
+        return overlap >= self.dedup_threshold
+
+    def _strip_overlap(self, previous: str, text: str) -> str:
+        """Drop the prefix of `text` that repeats the end of `previous`."""
+        longest = min(len(previous), len(text), _MAX_OVERLAP_CHARS)
+        for size in range(longest, _MIN_OVERLAP_CHARS - 1, -1):
+            if previous.endswith(text[:size]):
+                return text[size:].lstrip() or text
+        return text
+
+    def _truncate(self, text: str, tokens: int) -> str:
+        if tokens < self.min_fragment_tokens:
+            return ""
+        limit = tokens * CHARS_PER_TOKEN - 1
+        cut = text.rfind(" ", 0, limit)
+        return text[:cut if cut > 0 else limit].rstrip() + "…"
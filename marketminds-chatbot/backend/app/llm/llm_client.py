@@ -2,11 +2,35 @@
 LLM Client for MarketMinds
 
 This module defines a strict interface for interacting with
-Large Language Models (LLMs), and a concrete Ollama implementation.
+Large Language Models (LLMs), and concrete Ollama implementations:
+one that shells out to `ollama run` and one that talks to `ollama serve`
+over a pooled HTTP connection.
 """
 
+import asyncio
+import json
 import subprocess
-from typing import Optional
+import tempfile
+import threading
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+
+from backend.app.config import config
+
+
+class LLMFailure(str):
+    """
+    Error text returned or yielded in place of model output.
+
+    Shown to the user like any answer, but callers that keep answers
+    (the answer cache) can tell it apart, including when it follows part
+    of a streamed answer.
+    """
+
+
+def _failure(detail: str) -> LLMFailure:
+    return LLMFailure(f"LLM execution failed: {detail}")
 
 
 class LLMClient:
@@ -29,6 +53,42 @@ class LLMClient:
             "LLMClient.generate() must be implemented"
         )
 
+    def generate_stream(
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Generate a response incrementally, yielding text fragments as
+        they are produced.
+
+        Clients without native streaming yield the full completion once.
+        """
+        yield self.generate(prompt, context)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+    ) -> str:
+        """
+        Async variant of `generate`.
+
+        Clients without a native async path run `generate` in a worker
+        thread so the event loop is never blocked.
+        """
+        return await asyncio.to_thread(self.generate, prompt, context)
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        context: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of `generate_stream`.
+        """
+        yield await self.agenerate(prompt, context)
+
 
 class OllamaLLMClient(LLMClient):
     """
@@ -49,4 +109,250 @@ class OllamaLLMClient(LLMClient):
             return result.stdout.strip()
 
         except subprocess.CalledProcessError as e:
-            return f"LLM execution failed: {e.stderr}"
+            return _failure(e.stderr)
+
+    def generate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Stream the completion line by line, as `ollama run` prints it (the
+        CLI exposes no token boundaries).
+
+        stderr goes to a temp file rather than a pipe nobody reads until
+        stdout closes, so a process that writes a lot of it cannot block.
+        """
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                ["ollama", "run", self.model_name],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+                encoding="utf-8",
+                errors="ignore",
+                bufsize=1,
+            )
+            try:
+                process.stdin.write(prompt)
+                process.stdin.close()
+
+                for line in process.stdout:
+                    yield line
+
+                if process.wait() != 0:
+                    stderr.seek(0)
+                    yield _failure(stderr.read().decode("utf-8", "ignore"))
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                process.stdout.close()
+
+    async def agenerate(self, prompt: str, context: Optional[str] = None) -> str:
+        process = await asyncio.create_subprocess_exec(
+            "ollama", "run", self.model_name,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate(prompt.encode("utf-8"))
+
+        if process.returncode != 0:
+            return _failure(stderr.decode("utf-8", "ignore"))
+        return stdout.decode("utf-8", "ignore").strip()
+
+    async def agenerate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of `generate_stream` (also line by line).
+        """
+        with tempfile.TemporaryFile() as stderr:
+            process = await asyncio.create_subprocess_exec(
+                "ollama", "run", self.model_name,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=stderr,
+            )
+            try:
+                process.stdin.write(prompt.encode("utf-8"))
+                await process.stdin.drain()
+                process.stdin.close()
+
+                async for line in process.stdout:
+                    yield line.decode("utf-8", "ignore")
+
+                if await process.wait() != 0:
+                    stderr.seek(0)
+                    yield _failure(stderr.read().decode("utf-8", "ignore"))
+            finally:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+
+class OllamaHTTPClient(LLMClient):
+    """
+    LLM client that talks to a long-lived `ollama serve` process over HTTP.
+
+    A single pooled keep-alive connection pool is shared by every request, and
+    the model is kept resident on the server between calls via `keep_alive`,
+    so each generation skips process startup and model load entirely.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        base_url: str = config.OLLAMA_BASE_URL,
+        keep_alive: str = config.OLLAMA_KEEP_ALIVE,
+        connect_timeout: float = config.LLM_CONNECT_TIMEOUT,
+        read_timeout: float = config.LLM_READ_TIMEOUT,
+        max_concurrency: int = config.LLM_MAX_CONCURRENCY,
+        fallback: Optional[LLMClient] = None,
+    ) -> None:
+        """
+        Args:
+            model_name (str): Ollama model to generate with.
+            base_url (str): Root URL of the inference server.
+            keep_alive (str): How long the server keeps the model loaded.
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait between response bytes.
+            max_concurrency (int): Maximum in-flight generations.
+            fallback (Optional[LLMClient]): Client used when the server
+                cannot be reached (e.g. `OllamaLLMClient`).
+        """
+        super().__init__(model_name)
+        self.base_url = base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self.fallback = fallback
+
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        limits = httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_concurrency,
+        )
+
+        # Sync and async callers each get their own pool and limit.
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._http = httpx.Client(
+            base_url=self.base_url, timeout=timeout, limits=limits
+        )
+        self._aslots = asyncio.Semaphore(max_concurrency)
+        self._ahttp = httpx.AsyncClient(
+            base_url=self.base_url, timeout=timeout, limits=limits
+        )
+
+    def _payload(self, prompt: str, stream: bool) -> dict:
+        return {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+
+    def generate(self, prompt: str, context: Optional[str] = None) -> str:
+        payload = self._payload(prompt, stream=False)
+
+        try:
+            with self._slots:
+                response = self._http.post("/api/generate", json=payload)
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+
+        except httpx.TransportError:
+            if self.fallback is not None:
+                return self.fallback.generate(prompt, context)
+            return _failure("inference server unreachable")
+
+        except httpx.HTTPStatusError as e:
+            return _failure(e.response.text)
+
+    def generate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> Iterator[str]:
+        payload = self._payload(prompt, stream=True)
+        started = False
+
+        try:
+            with self._slots, self._http.stream(
+                "POST", "/api/generate", json=payload
+            ) as response:
+                if response.is_error:
+                    response.read()
+                    yield _failure(response.text)
+                    return
+
+                # Ollama streams one JSON object per line.
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("response"):
+                        started = True
+                        yield event["response"]
+                    if event.get("done"):
+                        break
+
+        except httpx.TransportError:
+            # Only fall back if nothing has reached the caller yet.
+            if self.fallback is not None and not started:
+                yield from self.fallback.generate_stream(prompt, context)
+                return
+            yield _failure("inference server unreachable")
+
+    async def agenerate(self, prompt: str, context: Optional[str] = None) -> str:
+        payload = self._payload(prompt, stream=False)
+
+        try:
+            async with self._aslots:
+                response = await self._ahttp.post("/api/generate", json=payload)
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+
+        except httpx.TransportError:
+            if self.fallback is not None:
+                return await self.fallback.agenerate(prompt, context)
+            return _failure("inference server unreachable")
+
+        except httpx.HTTPStatusError as e:
+            return _failure(e.response.text)
+
+    async def agenerate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        payload = self._payload(prompt, stream=True)
+        started = False
+
+        try:
+            async with self._aslots, self._ahttp.stream(
+                "POST", "/api/generate", json=payload
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    yield _failure(response.text)
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("response"):
+                        started = True
+                        yield event["response"]
+                    if event.get("done"):
+                        break
+
+        except httpx.TransportError:
+            if self.fallback is not None and not started:
+                async for token in self.fallback.agenerate_stream(prompt, context):
+                    yield token
+                return
+            yield _failure("inference server unreachable")
+
+    def close(self) -> None:
+        """Release pooled connections."""
+        self._http.close()
+
+    async def aclose(self) -> None:
+        """Release pooled async connections."""
+        await self._ahttp.aclose()
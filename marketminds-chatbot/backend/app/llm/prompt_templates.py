@@ -3,20 +3,26 @@ This module contains all the system and user prompt templates used in interactio
 
 from typing import Optional
 
+# Kept as one constant so every prompt starts with the exact same bytes:
+# the inference server can then reuse its cached prefix (KV cache) and
+# only prefill the context and question.
+SYSTEM_PROMPT = (
+    "You are MarketMinds, an advanced AI assistant for market and financial analysis.\n"
+    "Follow these rules strictly:\n"
+    "1. If the provided CONTEXT contains relevant information, you MUST base your answer on it.\n"
+    "2. If the CONTEXT does NOT contain sufficient information, you MAY use your general knowledge.\n"
+    "3. If you use general knowledge, clearly state that the answer is based on general knowledge, not the documents.\n"
+    "4. Do NOT contradict or override information found in the CONTEXT.\n"
+    "5. Do NOT fabricate numbers, dates, or events.\n"
+    "6. Be concise, factual, and clear.\n"
+)
+
+
 def system_prompt() -> str:
     """
     System-level instructions for the LLM.
     """
-    return (
-        "You are MarketMinds, an advanced AI assistant for market and financial analysis.\n"
-        "Follow these rules strictly:\n"
-        "1. If the provided CONTEXT contains relevant information, you MUST base your answer on it.\n"
-        "2. If the CONTEXT does NOT contain sufficient information, you MAY use your general knowledge.\n"
-        "3. If you use general knowledge, clearly state that the answer is based on general knowledge, not the documents.\n"
-        "4. Do NOT contradict or override information found in the CONTEXT.\n"
-        "5. Do NOT fabricate numbers, dates, or events.\n"
-        "6. Be concise, factual, and clear.\n"
-    )
+    return SYSTEM_PROMPT
 
 
 def user_prompt(question: str) -> str:
@@ -33,6 +39,9 @@ def full_prompt(question: str, context: Optional[str] = None) -> str:
     """
     combines system and user prompts into a full prompt for the LLM.
 
+    The system prompt always comes first and never varies; everything
+    request-specific (context, question) follows it.
+
     Args:
         question (str): The user's question.
         context (Optional[str]): Additional context to provide to the LLM.
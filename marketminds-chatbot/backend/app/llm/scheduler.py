@@ -0,0 +1,341 @@
+"""
+LLM request scheduler for MarketMinds
+
+Sits in front of an LLMClient and decides when each generation may run:
+- at most `max_concurrency` generations at once, matched to what the
+  inference backend can actually run in parallel
+- waiting generations queue by priority ("interactive" before "batch"),
+  and within a priority round-robin across clients, so one client's burst
+  cannot starve the others
+- admission control: a generation is rejected at once (LLMOverloadedError
+  with a Retry-After hint) when its client already has too many queued,
+  the queue is full, or its estimated wait exceeds its priority's
+  deadline; a queued generation still waiting at its deadline is rejected
+  then
+
+The estimated wait is the work queued ahead of the caller divided by the
+concurrency, at the recently observed time per generation. Excess load is
+shed rather than queued, so throughput under overload stays at what the
+backend sustains instead of collapsing into timeouts.
+
+Who is asking, and how urgently, travels in a ContextVar set by the API
+(`set_caller`), so ResponseBuilder calls the scheduler like any client.
+"""
+
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Tuple
+
+from backend.app.config import config
+from backend.app.llm.llm_client import LLMClient
+from backend.app.utils import metrics
+
+# Served strictly in this order
+PRIORITIES = ("interactive", "batch")
+
+# Weight of the latest generation in the time-per-generation estimate
+_SERVICE_TIME_SMOOTHING = 0.2
+
+_caller: contextvars.ContextVar[Tuple[str, str]] = contextvars.ContextVar(
+    "marketminds_llm_caller", default=("", "interactive")
+)
+
+QUEUE_SECONDS = metrics.REGISTRY.histogram(
+    "marketminds_llm_queue_seconds",
+    "Time generations waited for an LLM slot.",
+    labels=("priority",),
+)
+REJECTED = metrics.REGISTRY.counter(
+    "marketminds_llm_rejected_total",
+    "Generations rejected by the LLM scheduler.",
+    labels=("priority", "reason"),
+)
+
+
+class LLMOverloadedError(Exception):
+    """
+    The scheduler will not run a generation now.
+
+    `status` is 429 when the caller's own queue is full (slow down) and
+    503 when the service is saturated; `retry_after` is in seconds.
+    """
+
+    def __init__(self, message: str, status: int, retry_after: int) -> None:
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def set_caller(client: str, priority: str = "interactive") -> None:
+    """Identify the client and priority of LLM calls in the current context."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}, expected one of {PRIORITIES}")
+    _caller.set((client, priority))
+
+
+class _Waiter:
+    """A queued generation; woken from whichever thread frees a slot."""
+
+    __slots__ = ("client", "priority", "granted", "event", "future", "_loop")
+
+    def __init__(self, client: str, priority: str, loop=None) -> None:
+        self.client = client
+        self.priority = priority
+        self.granted = False
+        self._loop = loop
+        if loop is None:
+            self.event = threading.Event()
+            self.future = None
+        else:
+            self.event = None
+            self.future = loop.create_future()
+
+    def grant(self) -> None:
+        self.granted = True
+        if self.future is None:
+            self.event.set()
+        else:
+            self._loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMScheduler(LLMClient):
+    """
+    Admission control and fair queuing in front of an LLMClient.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        max_concurrency: int = config.LLM_MAX_CONCURRENCY,
+        max_queue: int = config.LLM_QUEUE_SIZE,
+        max_client_queue: int = config.LLM_CLIENT_QUEUE_SIZE,
+        deadlines: Optional[Dict[str, float]] = None,
+        service_time: float = config.LLM_SERVICE_TIME,
+    ) -> None:
+        """
+        Args:
+            client (LLMClient): Client that runs the generations.
+            max_concurrency (int): Generations running at once.
+            max_queue (int): Generations allowed to wait, in total.
+            max_client_queue (int): Generations one client may have waiting.
+            deadlines (Optional[Dict[str, float]]): Longest wait (seconds)
+                by priority (default from config).
+            service_time (float): Seconds per generation assumed until
+                generations have been timed.
+        """
+        super().__init__(client.model_name)
+        self.client = client
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max_queue
+        self.max_client_queue = max_client_queue
+        self.deadlines = dict(deadlines or config.LLM_QUEUE_DEADLINES)
+        self.service_time = service_time
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+        # priority -> client -> waiters; clients rotate to the back when served
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    # --------------------------------------------------
+    # LLMClient API
+    # --------------------------------------------------
+
+    def generate(self, prompt: str, context: Optional[str] = None) -> str:
+        with self._slot():
+            return self.client.generate(prompt, context)
+
+    def generate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> Iterator[str]:
+        with self._slot():
+            yield from self.client.generate_stream(prompt, context)
+
+    async def agenerate(self, prompt: str, context: Optional[str] = None) -> str:
+        async with self._aslot():
+            return await self.client.agenerate(prompt, context)
+
+    async def agenerate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        async with self._aslot():
+            async for token in self.client.agenerate_stream(prompt, context):
+                yield token
+
+    def stats(self) -> dict:
+        """Slots in use, queue depth by priority and the service-time estimate."""
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": {
+                    priority: sum(len(waiters) for waiters in queue.values())
+                    for priority, queue in self._queues.items()
+                },
+                "service_time_s": round(self.service_time, 3),
+            }
+
+    def metric_families(self) -> List[metrics.Family]:
+        """Scheduler gauges for `/metrics`, read at scrape time."""
+        stats = self.stats()
+        return [
+            ("marketminds_llm_running", "gauge", "Generations running.",
+             [({}, stats["running"])]),
+            ("marketminds_llm_queued", "gauge", "Generations waiting for a slot.",
+             [({"priority": p}, n) for p, n in stats["queued"].items()]),
+            ("marketminds_llm_service_seconds", "gauge",
+             "Recent seconds per generation (admission estimate).",
+             [({}, stats["service_time_s"])]),
+        ]
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        client, priority = _caller.get()
+        start = time.perf_counter()
+        waiter = self._admit(client, priority)
+        if waiter is not None and not waiter.event.wait(self.deadlines[priority]):
+            if not self._abandon(waiter):
+                self._expired(priority)
+        self._started(priority, start)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def _aslot(self) -> AsyncIterator[None]:
+        client, priority = _caller.get()
+        start = time.perf_counter()
+        waiter = self._admit(client, priority, asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(waiter.future, self.deadlines[priority])
+            except asyncio.TimeoutError:
+                # Granted just as the deadline passed: keep the slot
+                if not self._abandon(waiter):
+                    self._expired(priority)
+            except BaseException:
+                # Caller gone (e.g. client disconnected): hand the slot on
+                if self._abandon(waiter):
+                    self._release(None)
+                raise
+        self._started(priority, start)
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - start)
+
+    def _admit(self, client: str, priority: str, loop=None) -> Optional[_Waiter]:
+        """Take a free slot (None), queue a waiter, or reject."""
+        with self._lock:
+            if self._running < self.max_concurrency and not self._queued:
+                self._running += 1
+                return None
+
+            queue = self._queues[priority]
+            if len(queue.get(client, ())) >= self.max_client_queue:
+                self._reject(priority, "client_queue", 429, self.service_time)
+            if self._queued >= self.max_queue:
+                self._reject(priority, "queue_full", 503, self.service_time)
+
+            wait = self._estimated_wait(client, priority)
+            deadline = self.deadlines[priority]
+            if wait > deadline:
+                self._reject(priority, "deadline", 503, wait - deadline)
+
+            waiter = _Waiter(client, priority, loop)
+            queue.setdefault(client, deque()).append(waiter)
+            self._queued += 1
+            return waiter
+
+    def _estimated_wait(self, client: str, priority: str) -> float:
+        """Seconds until a generation queued now would start (lock held)."""
+        ahead = 0
+        for level in PRIORITIES:
+            queue = self._queues[level]
+            if level != priority:
+                ahead += sum(len(waiters) for waiters in queue.values())
+                continue
+            # Round-robin: every other client gets at most one more turn
+            # than this one before its new waiter is reached
+            mine = len(queue.get(client, ()))
+            ahead += mine + sum(
+                min(len(waiters), mine + 1)
+                for other, waiters in queue.items() if other != client
+            )
+            break
+        return (ahead + 1) * self.service_time / self.max_concurrency
+
+    def _reject(self, priority: str, reason: str, status: int, retry_after: float) -> None:
+        REJECTED.inc(priority=priority, reason=reason)
+        raise LLMOverloadedError(
+            f"LLM is busy ({reason.replace('_', ' ')})",
+            status=status,
+            retry_after=max(1, math.ceil(retry_after)),
+        )
+
+    def _expired(self, priority: str) -> None:
+        self._reject(priority, "expired", 503, self.service_time)
+
+    def _started(self, priority: str, start: float) -> None:
+        waited = time.perf_counter() - start
+        QUEUE_SECONDS.observe(waited, priority=priority)
+        metrics.record("llm_queue", waited)
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """
+        Withdraw a waiter that stopped waiting.
+
+        Returns:
+            bool: True if it had been granted a slot meanwhile (the caller
+            now holds that slot).
+        """
+        with self._lock:
+            if waiter.granted:
+                return True
+            queue = self._queues[waiter.priority]
+            waiters = queue[waiter.client]
+            waiters.remove(waiter)
+            if not waiters:
+                del queue[waiter.client]
+            self._queued -= 1
+            return False
+
+    def _release(self, seconds: Optional[float]) -> None:
+        """Free a slot, handing it straight to the next waiter if any."""
+        with self._lock:
+            if seconds is not None:
+                self.service_time += _SERVICE_TIME_SMOOTHING * (seconds - self.service_time)
+
+            for queue in self._queues.values():
+                if not queue:
+                    continue
+                client, waiters = next(iter(queue.items()))
+                waiter = waiters.popleft()
+                if waiters:
+                    queue.move_to_end(client)
+                else:
+                    del queue[client]
+                self._queued -= 1
+                waiter.grant()
+                return
+            self._running -= 1
@@ -2,20 +2,57 @@
 MarketMinds FastAPI Backend
 """
 
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from typing import Literal
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
+from backend.app.config import config
 from backend.app.chatbot.response_builder import ResponseBuilder
-from backend.app.llm.llm_client import OllamaLLMClient
+from backend.app.llm.llm_client import LLMClient, OllamaHTTPClient, OllamaLLMClient
+from backend.app.llm.scheduler import LLMOverloadedError, LLMScheduler, set_caller
+from backend.app.utils import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+def _report_load(future: asyncio.Future) -> None:
+    """Log a failed background document load (it has no caller to raise to)."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Loading the document index failed", exc_info=future.exception())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Boot immediately; the document index loads in the background
+    loop = asyncio.get_running_loop()
+    loader = loop.run_in_executor(None, response_builder.load_documents)
+    loader.add_done_callback(_report_load)
+    yield
+    response_builder.close()
+    # Drop the load if it never started; otherwise let it finish (up to a
+    # limit) before the clients it uses are closed
+    loader.cancel()
+    await asyncio.wait([loader], timeout=config.LOAD_SHUTDOWN_TIMEOUT)
+    response_builder.market_client.close()
+    if isinstance(llm_client, OllamaHTTPClient):
+        llm_client.close()
+        await llm_client.aclose()
 
 
 app = FastAPI(
     title="MarketMinds API",
     description="Local RAG-powered financial chatbot backend",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # ---------- Frontend setup ----------
@@ -31,27 +68,206 @@ def serve_frontend():
 
 
 # ---------- Core system ----------
-llm_client = OllamaLLMClient(model_name="mistral")
-response_builder = ResponseBuilder(llm_client)
+def create_llm_client() -> LLMClient:
+    subprocess_client = OllamaLLMClient(model_name=config.DEFAULT_MODEL_NAME)
+    if config.LLM_BACKEND == "subprocess":
+        return subprocess_client
+    return OllamaHTTPClient(
+        model_name=config.DEFAULT_MODEL_NAME,
+        fallback=subprocess_client,
+    )
+
+
+llm_client = create_llm_client()
+# Every generation goes through the scheduler (concurrency limit, queue)
+llm_scheduler = LLMScheduler(llm_client)
+response_builder = ResponseBuilder(llm_scheduler)
 
 
 # ---------- API models ----------
 class QueryRequest(BaseModel):
     question: str
+    # Return a per-stage timing breakdown with the answer
+    timings: bool = False
+    # Interactive questions are answered before batch ones
+    priority: Literal["interactive", "batch"] = "interactive"
 
 
 class QueryResponse(BaseModel):
     answer: str
+    timings: dict[str, float] | None = None
 
 
 # ---------- Health ----------
 @app.get("/health")
 def health_check():
+    """Liveness: the process is up and serving."""
     return {"status": "ok"}
 
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness: the document index is loaded."""
+    if response_builder.is_ready:
+        if response_builder.generation is not None:
+            return {"status": "ready", "generation": response_builder.generation}
+        return {"status": "ready"}
+    if response_builder.load_error is not None:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed", "error": str(response_builder.load_error)},
+        )
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+
+@app.get("/stats")
+def cache_stats():
+    """Hit/miss counters of the answer, quote and embedding caches."""
+    return response_builder.stats()
+
+
+# ---------- Metrics ----------
+REQUESTS = metrics.REGISTRY.counter(
+    "marketminds_requests_total", "HTTP requests by endpoint and status.",
+    labels=("endpoint", "status"),
+)
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    "marketminds_request_seconds", "Time to answer, by endpoint (streams: until the last token).",
+    labels=("endpoint",),
+)
+
+
+def server_metrics() -> list[metrics.Family]:
+    return [(
+        "marketminds_inflight_requests", "gauge",
+        "Questions currently being answered.", [({}, inflight_requests)],
+    )] + response_builder.metric_families() + llm_scheduler.metric_families()
+
+
+metrics.REGISTRY.add_collector(server_metrics)
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """All metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def breakdown(trace: dict[str, float], start: float) -> dict[str, float]:
+    """Stage timings of one request in milliseconds, plus the total."""
+    timings = {stage: round(seconds * 1000, 2) for stage, seconds in trace.items()}
+    timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
+
+
+# ---------- Backpressure ----------
+# Questions are cheap coroutines while they wait on I/O, so one worker can
+# hold many of them; past MAX_INFLIGHT_REQUESTS we shed load instead of
+# queueing without bound. LLM generations are further limited by the
+# scheduler, which rejects questions it could not start in time.
+inflight_requests = 0
+
+
+def overloaded_response(
+    endpoint: str, error: LLMOverloadedError | None = None
+) -> JSONResponse:
+    status, retry_after = (error.status, error.retry_after) if error else (503, 1)
+    REQUESTS.inc(endpoint=endpoint, status=str(status))
+    detail = (
+        "Too many questions from this client, please retry shortly."
+        if status == 429 else "Server is busy, please retry shortly."
+    )
+    return JSONResponse(
+        status_code=status,
+        content={"detail": detail},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def identify_caller(http_request: Request, request: QueryRequest) -> None:
+    """Tag this request's LLM calls with its client and priority."""
+    client = http_request.headers.get("x-client-id")
+    if not client and http_request.client is not None:
+        client = http_request.client.host
+    set_caller(client or "", request.priority)
+
+
 # ---------- Chat endpoint ----------
-@app.post("/ask", response_model=QueryResponse)
-def ask_question(request: QueryRequest):
-    answer = response_builder.build_response(request.question)
-    return QueryResponse(answer=answer)
+@app.post("/ask", response_model=QueryResponse, response_model_exclude_none=True)
+async def ask_question(request: QueryRequest, http_request: Request):
+    global inflight_requests
+    if inflight_requests >= config.MAX_INFLIGHT_REQUESTS:
+        return overloaded_response("/ask")
+
+    start = time.perf_counter()
+    trace = metrics.start_trace() if request.timings else None
+    identify_caller(http_request, request)
+    inflight_requests += 1
+    try:
+        answer = await response_builder.abuild_response(request.question)
+    except LLMOverloadedError as e:
+        return overloaded_response("/ask", e)
+    except Exception:
+        REQUESTS.inc(endpoint="/ask", status="500")
+        raise
+    finally:
+        inflight_requests -= 1
+
+    REQUESTS.inc(endpoint="/ask", status="200")
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint="/ask")
+
+    if trace is None:
+        return QueryResponse(answer=answer)
+    return QueryResponse(answer=answer, timings=breakdown(trace, start))
+
+
+@app.post("/ask/stream")
+async def ask_question_stream(request: QueryRequest, http_request: Request):
+    """
+    Stream the answer as newline-delimited JSON: one `{"token": ...}`
+    object per fragment, followed by `{"done": true}` (with `"timings"`
+    when requested).
+    """
+    global inflight_requests
+    if inflight_requests >= config.MAX_INFLIGHT_REQUESTS:
+        return overloaded_response("/ask/stream")
+
+    start = time.perf_counter()
+    trace = metrics.start_trace() if request.timings else None
+    identify_caller(http_request, request)
+    inflight_requests += 1
+
+    # Run up to the first fragment before responding, so a question the
+    # LLM scheduler rejects gets a real status instead of a broken stream
+    tokens = response_builder.abuild_response_stream(request.question)
+    try:
+        first = await anext(tokens, None)
+    except LLMOverloadedError as e:
+        inflight_requests -= 1
+        return overloaded_response("/ask/stream", e)
+    except Exception:
+        inflight_requests -= 1
+        REQUESTS.inc(endpoint="/ask/stream", status="500")
+        raise
+
+    async def events():
+        global inflight_requests
+        status = "500"
+        try:
+            if first is not None:
+                yield json.dumps({"token": first}) + "\n"
+            async for token in tokens:
+                yield json.dumps({"token": token}) + "\n"
+            done = {"done": True}
+            if trace is not None:
+                done["timings"] = breakdown(trace, start)
+            yield json.dumps(done) + "\n"
+            status = "200"
+        finally:
+            inflight_requests -= 1
+            REQUESTS.inc(endpoint="/ask/stream", status=status)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint="/ask/stream")
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -0,0 +1,279 @@
+"""
+Per-chunk provenance for the retriever.
+
+Row i describes chunk i: source document, company ticker, page and
+fiscal year. Rows are fixed-width records appended to `metadata.rec` and
+read through a memory map; source names and tickers are stored once in
+`metadata.json` and referenced by position.
+
+Filters resolve to the set of chunk ids a search may return. Each of the
+source, ticker and year columns is partitioned by value on first use
+(a stable argsort, rebuilt after appends), so resolving a filter costs
+time proportional to the chunks it matches rather than to the corpus.
+
+Unknown fields are stored as -1 and never match a filter on that field.
+
+`save_partitions` writes the partitions next to a published copy of the
+table (`metadata.<column>.keys` / `.order`); a table opened with them
+maps them instead of sorting, so every process serving that copy shares
+one set of pages.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RECORD_DTYPE = np.dtype(
+    [("source", "<i4"), ("ticker", "<i4"), ("page", "<i4"), ("year", "<i4")]
+)
+_UNKNOWN = -1
+_PARTITIONED = ("source", "ticker", "year")
+
+# Four-digit years ("2023", "FY2023", "AAPL_10K_2023"); digits inside
+# amounts ("2,021", "$2019", "2023.5") are not years
+_YEAR = re.compile(r"(?<![\d.,$])(?:fy\s?)?((?:19|20)\d{2})(?![\d,%])", re.IGNORECASE)
+
+
+class ChunkMetadata:
+    """
+    Append-only, memory-mapped metadata table aligned with a ChunkStore.
+    """
+
+    def __init__(self, directory: Path, read_only: bool = False) -> None:
+        if not read_only:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.records_path = directory / "metadata.rec"
+        self.labels_path = directory / "metadata.json"
+
+        self.sources: List[str] = []
+        self.tickers: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+        self._ticker_ids: Dict[str, int] = {}
+        self._records: Optional[np.memmap] = None
+        # column -> (values sorted, chunk ids in that order)
+        self._partitions: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        if not read_only:
+            self.records_path.touch()
+        if self.labels_path.exists():
+            with open(self.labels_path, encoding="utf-8") as f:
+                labels = json.load(f)
+            self.sources, self.tickers = labels["sources"], labels["tickers"]
+            self._source_ids = {s: i for i, s in enumerate(self.sources)}
+            self._ticker_ids = {t: i for i, t in enumerate(self.tickers)}
+
+        self._count = (
+            self.records_path.stat().st_size // RECORD_DTYPE.itemsize
+            if self.records_path.exists() else 0
+        )
+
+        # A read-only table (a published generation) can be pruned while
+        # still served: map every file now, since a map outlives the unlink
+        if read_only:
+            self._mapped()
+            for column in _PARTITIONED:
+                self._partition(column)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: int) -> dict:
+        record = self._mapped()[idx]
+        return {
+            "source": self._label(self.sources, record["source"]),
+            "ticker": self._label(self.tickers, record["ticker"]),
+            "page": None if record["page"] == _UNKNOWN else int(record["page"]),
+            "year": None if record["year"] == _UNKNOWN else int(record["year"]),
+        }
+
+    # --------------------------------------------------
+    # Mutation
+    # --------------------------------------------------
+
+    def extend(self, metadata: Iterable[Optional[dict]]) -> None:
+        """Append one row per chunk; None (or missing keys) = unknown."""
+        rows = []
+        labels_changed = False
+        for meta in metadata:
+            meta = meta or {}
+            source, new_source = self._intern(meta.get("source"), self.sources, self._source_ids)
+            ticker, new_ticker = self._intern(meta.get("ticker"), self.tickers, self._ticker_ids)
+            labels_changed |= new_source or new_ticker
+            rows.append((
+                source,
+                ticker,
+                _UNKNOWN if meta.get("page") is None else meta["page"],
+                _UNKNOWN if meta.get("year") is None else meta["year"],
+            ))
+        if not rows:
+            return
+
+        # Labels before records, so a record never points at a missing label
+        if labels_changed:
+            self._save_labels()
+        with open(self.records_path, "ab") as f:
+            f.write(np.array(rows, dtype=RECORD_DTYPE).tobytes())
+
+        self._count += len(rows)
+        self._records = None
+        self._partitions = {}
+
+    def resize(self, count: int) -> None:
+        """
+        Match the chunk count: drop rows past it (torn append) or pad
+        with unknown rows (chunks stored before metadata existed).
+        """
+        if count < self._count:
+            self._records = None
+            self._partitions = {}
+            with open(self.records_path, "r+b") as f:
+                f.truncate(count * RECORD_DTYPE.itemsize)
+            self._count = count
+        elif count > self._count:
+            self.extend([None] * (count - self._count))
+
+    def clear(self) -> None:
+        self.resize(0)
+        self.sources, self.tickers = [], []
+        self._source_ids, self._ticker_ids = {}, {}
+        self._save_labels()
+
+    def save_partitions(self, directory: Path) -> None:
+        """Write the value partitions of every filterable column to `directory`."""
+        for column in _PARTITIONED:
+            keys, order = self._partition(column)
+            (directory / f"metadata.{column}.keys").write_bytes(keys.tobytes())
+            (directory / f"metadata.{column}.order").write_bytes(order.tobytes())
+
+    # --------------------------------------------------
+    # Filtering
+    # --------------------------------------------------
+
+    def match(
+        self,
+        sources: Optional[Sequence[str]] = None,
+        tickers: Optional[Sequence[str]] = None,
+        years: Optional[Sequence[int]] = None,
+        pages: Optional[Sequence[int]] = None,
+    ) -> np.ndarray:
+        """
+        Ids of chunks matching every given filter (any value within one).
+
+        Args:
+            sources: Source document names.
+            tickers: Company tickers.
+            years: Fiscal years.
+            pages: (first, last) page range, inclusive.
+
+        Returns:
+            np.ndarray: sorted int64 chunk ids.
+        """
+        selections = []
+        if sources is not None:
+            selections.append(self._select(
+                "source", [self._source_ids[s] for s in sources if s in self._source_ids]
+            ))
+        if tickers is not None:
+            selections.append(self._select(
+                "ticker", [self._ticker_ids[t] for t in tickers if t in self._ticker_ids]
+            ))
+        if years is not None:
+            selections.append(self._select("year", list(years)))
+
+        if selections:
+            # Probe the larger selections with the smallest one
+            selections.sort(key=len)
+            ids = selections[0]
+            # (an empty selection sorts first, so `other` is never empty)
+            for other in selections[1:]:
+                if not len(ids):
+                    break
+                pos = np.minimum(np.searchsorted(other, ids), len(other) - 1)
+                ids = ids[other[pos] == ids]
+        else:
+            ids = np.arange(self._count, dtype="int64")
+
+        if pages is not None and len(ids):
+            first, last = pages
+            page = self._mapped()["page"][ids]
+            ids = ids[(page >= first) & (page <= last)]
+
+        return ids
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _select(self, column: str, values: List[int]) -> np.ndarray:
+        """Sorted ids of chunks whose `column` is one of `values`."""
+        keys, order = self._partition(column)
+        ranges = [
+            order[np.searchsorted(keys, value):np.searchsorted(keys, value, side="right")]
+            for value in dict.fromkeys(values)
+        ]
+        if not ranges:
+            return np.empty(0, dtype="int64")
+        # Ids within one value are already ascending (stable sort)
+        return ranges[0] if len(ranges) == 1 else np.sort(np.concatenate(ranges))
+
+    def _partition(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(values sorted, chunk ids in that order), saved or built once."""
+        partition = self._partitions.get(column)
+        if partition is None:
+            partition = self._load_partition(column)
+        if partition is None:
+            records = self._mapped()[column]
+            order = np.argsort(records, kind="stable").astype("int64")
+            partition = (records[order], order)
+        self._partitions[column] = partition
+        return partition
+
+    def _load_partition(self, column: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        keys_path = self.directory / f"metadata.{column}.keys"
+        order_path = self.directory / f"metadata.{column}.order"
+        if not self._count or not keys_path.exists() or not order_path.exists():
+            return None
+        # Saved for a different row count: stale, sort instead
+        if keys_path.stat().st_size != self._count * 4 or order_path.stat().st_size != self._count * 8:
+            return None
+        return (
+            np.memmap(keys_path, dtype="<i4", mode="r", shape=(self._count,)),
+            np.memmap(order_path, dtype="int64", mode="r", shape=(self._count,)),
+        )
+
+    def _mapped(self) -> np.ndarray:
+        if not self._count:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        if self._records is None:
+            self._records = np.memmap(
+                self.records_path, dtype=RECORD_DTYPE, mode="r", shape=(self._count,)
+            )
+        return self._records
+
+    def _intern(self, label: Optional[str], labels: List[str], ids: Dict[str, int]):
+        if label is None:
+            return _UNKNOWN, False
+        if label in ids:
+            return ids[label], False
+        ids[label] = len(labels)
+        labels.append(label)
+        return ids[label], True
+
+    def _label(self, labels: List[str], idx: int) -> Optional[str]:
+        return None if idx == _UNKNOWN else labels[idx]
+
+    def _save_labels(self) -> None:
+        tmp_path = self.labels_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"sources": self.sources, "tickers": self.tickers}, f)
+        os.replace(tmp_path, self.labels_path)
+
+
+def fiscal_years(text: str) -> List[int]:
+    """Distinct years mentioned in `text` ("FY2023", "2022 annual report")."""
+    return list(dict.fromkeys(int(year) for year in _YEAR.findall(text)))
@@ -0,0 +1,149 @@
+"""
+Append-only chunk text store for the retriever.
+
+Chunk text is kept out of RAM: the UTF-8 bytes of every chunk are appended
+to `chunks.bin` and the end offset of each chunk to `chunks.idx` (int64).
+Both files are read through memory maps, so opening a store is O(1) and
+only the chunks actually returned by a search are ever paged in.
+
+A read-only store (a published index generation) is opened as found:
+nothing is created or truncated.
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+_OFFSET_DTYPE = np.dtype("<i8")
+
+
+class ChunkStore:
+    """
+    Memory-mapped, append-only sequence of text chunks.
+    """
+
+    def __init__(self, directory: Path, read_only: bool = False) -> None:
+        if not read_only:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        self.data_path = directory / "chunks.bin"
+        self.offsets_path = directory / "chunks.idx"
+
+        self._count = 0
+        self._data: Optional[np.memmap] = None
+        self._offsets: Optional[np.memmap] = None
+
+        self._open()
+
+    # --------------------------------------------------
+    # Sequence API
+    # --------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: int) -> str:
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("chunk index out of range")
+
+        self._ensure_mapped()
+        start = int(self._offsets[idx - 1]) if idx > 0 else 0
+        end = int(self._offsets[idx])
+        if start == end:
+            return ""
+        return bytes(self._data[start:end]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(self._count):
+            yield self[idx]
+
+    # --------------------------------------------------
+    # Mutation
+    # --------------------------------------------------
+
+    def extend(self, chunks: Iterable[str]) -> None:
+        """
+        Append chunks without rewriting existing data.
+        """
+        encoded: List[bytes] = [chunk.encode("utf-8") for chunk in chunks]
+        if not encoded:
+            return
+
+        base = self._data_size()
+        ends = base + np.cumsum([len(b) for b in encoded], dtype=_OFFSET_DTYPE)
+
+        # Text first, so a crash never leaves offsets pointing past the data
+        with open(self.data_path, "ab") as f:
+            f.write(b"".join(encoded))
+        with open(self.offsets_path, "ab") as f:
+            f.write(ends.astype(_OFFSET_DTYPE).tobytes())
+
+        self._count += len(encoded)
+        self._data = self._offsets = None
+
+    def truncate(self, count: int) -> None:
+        """
+        Drop every chunk from position `count` onwards.
+        """
+        count = max(0, min(count, self._count))
+        size = 0
+        if count:
+            self._ensure_mapped()
+            size = int(self._offsets[count - 1])
+
+        self._data = self._offsets = None
+        with open(self.data_path, "r+b") as f:
+            f.truncate(size)
+        with open(self.offsets_path, "r+b") as f:
+            f.truncate(count * _OFFSET_DTYPE.itemsize)
+        self._count = count
+
+    def clear(self) -> None:
+        self.truncate(0)
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _open(self) -> None:
+        if not self.read_only:
+            self.data_path.touch()
+            self.offsets_path.touch()
+
+        count = self.offsets_path.stat().st_size // _OFFSET_DTYPE.itemsize
+        data_size = self.data_path.stat().st_size
+
+        # Discard offsets whose text never made it to disk
+        if count:
+            offsets = np.memmap(
+                self.offsets_path, dtype=_OFFSET_DTYPE, mode="r", shape=(count,)
+            )
+            count = int(np.searchsorted(offsets, data_size, side="right"))
+            del offsets
+
+        self._count = count
+        if not self.read_only:
+            self.truncate(count)
+        elif count:
+            # Map now: a published generation may be pruned while served
+            self._ensure_mapped()
+
+    def _data_size(self) -> int:
+        if not self._count:
+            return 0
+        self._ensure_mapped()
+        return int(self._offsets[self._count - 1])
+
+    def _ensure_mapped(self) -> None:
+        if self._offsets is None:
+            self._offsets = np.memmap(
+                self.offsets_path,
+                dtype=_OFFSET_DTYPE,
+                mode="r",
+                shape=(self._count,),
+            )
+        if self._data is None and self.data_path.stat().st_size:
+            self._data = np.memmap(self.data_path, dtype=np.uint8, mode="r")
@@ -0,0 +1,297 @@
+"""Embedding cache for MarketMinds Chatbot.
+
+Wraps any EmbeddingClient so that each distinct text is embedded once:
+- keys are a hash of the whitespace-normalised text and the model id
+- hot vectors live in a bounded in-memory LRU
+- document vectors are also appended to an on-disk store that is read
+  back through a memory map, so re-ingesting an unchanged corpus (or
+  restarting the server) costs lookups instead of model inference
+
+Query vectors (`embed_query`) stay in memory: persisting every distinct
+question would grow the store without bound. Several processes may share
+one store; appends hold an exclusive file lock and number their rows from
+the file size, so two writers never claim the same row. Read-only clients
+(API workers serving a published index) never write to it.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer per store assumed
+    fcntl = None
+
+from backend.app.rag.embeddings import EmbeddingClient
+
+_DIGEST_SIZE = 16
+
+
+class CachedEmbeddingClient(EmbeddingClient):
+    """Caching decorator around an EmbeddingClient."""
+
+    def __init__(
+        self,
+        inner: EmbeddingClient,
+        cache_dir: Optional[Path] = None,
+        max_memory_entries: int = 10_000,
+        read_only: bool = False,
+    ) -> None:
+        """
+        Args:
+            inner (EmbeddingClient): Client used on cache misses.
+            cache_dir (Optional[Path]): Directory for the on-disk store;
+                None keeps the cache in memory only.
+            max_memory_entries (int): Vectors held in the in-memory LRU.
+            read_only (bool): Look vectors up in the on-disk store but
+                never write to it.
+        """
+        self.inner = inner
+        self.dimension = inner.dimension
+        self.model_id = inner.model_id
+        self.max_memory_entries = max_memory_entries
+        self.read_only = read_only
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # On-disk store: row i of the vectors file belongs to key i
+        self._disk_rows: Dict[bytes, int] = {}
+        self._disk_count = 0  # rows of the files read into _disk_rows
+        self._disk_vectors: Optional[np.memmap] = None
+        self._keys_path: Optional[Path] = None
+        self._vectors_path: Optional[Path] = None
+        self._lock_path: Optional[Path] = None
+
+        if cache_dir is not None:
+            if not read_only:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+            stem = hashlib.sha1(self.model_id.encode("utf-8")).hexdigest()[:12]
+            self._keys_path = cache_dir / f"{stem}.keys"
+            self._vectors_path = cache_dir / f"{stem}.f32"
+            self._lock_path = cache_dir / f"{stem}.lock"
+            self._load_disk_index()
+
+    # --------------------------------------------------
+    # Public API
+    # --------------------------------------------------
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return embeddings, calling the wrapped client only for misses.
+
+        Misses are added to the on-disk store unless it is read-only.
+        """
+        out = np.empty((len(texts), self.dimension), dtype="float32")
+        keys = [self._key(text) for text in texts]
+
+        # key -> positions in `texts` still needing a vector
+        missing: "OrderedDict[bytes, List[int]]" = OrderedDict()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    out[i] = vector
+            if missing and self._keys_path is not None:
+                # Another process may have stored some since: re-read the
+                # store once for the whole batch, not once per miss
+                self._read_new_rows()
+                for key in [key for key in missing if key in self._disk_rows]:
+                    out[missing.pop(key)] = self._lookup(key)
+
+        if not missing:
+            return out
+
+        # Embed each distinct missing text once
+        miss_texts = [texts[positions[0]] for positions in missing.values()]
+        vectors = self.inner.embed(miss_texts)
+
+        with self._lock:
+            self.misses += len(miss_texts)
+            new_keys = []
+            for (key, positions), vector in zip(missing.items(), vectors):
+                out[positions] = vector
+                self._remember(key, vector)
+                if key not in self._disk_rows:
+                    new_keys.append(key)
+            if not self.read_only:
+                self._append_to_disk(new_keys, missing, vectors)
+
+        return out
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed a search query; a miss is cached in memory only."""
+        key = self._key(text)
+        with self._lock:
+            vector = self._lookup(key, refresh=True)
+        if vector is None:
+            vector = self.inner.embed_query(text)[0]
+            with self._lock:
+                self.misses += 1
+                self._remember(key, vector)
+        return np.asarray(vector, dtype="float32").reshape(1, -1)
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._lru),
+            "disk_entries": len(self._disk_rows),
+        }
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _key(self, text: str) -> bytes:
+        normalized = " ".join(text.split())
+        digest = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+        digest.update(self.model_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalized.encode("utf-8"))
+        return digest.digest()
+
+    def _lookup(self, key: bytes, refresh: bool = False) -> Optional[np.ndarray]:
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return vector
+
+        row = self._disk_rows.get(key)
+        if row is None and refresh and self._keys_path is not None:
+            # Another process may have stored it since
+            self._read_new_rows()
+            row = self._disk_rows.get(key)
+        if row is None:
+            return None
+
+        vector = np.array(self._mapped_vectors(row)[row])
+        self._remember(key, vector)
+        self.disk_hits += 1
+        return vector
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_entries:
+            self._lru.popitem(last=False)
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock on the on-disk store across processes."""
+        with open(self._lock_path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load_disk_index(self) -> None:
+        if not self._keys_path.exists() or not self._vectors_path.exists():
+            return
+        if self.read_only:
+            self._read_new_rows()
+            return
+
+        with self._file_lock():
+            self._read_new_rows()
+            self._drop_torn_tail()
+
+    def _drop_torn_tail(self) -> None:
+        """Truncate both files to the complete rows; call under the file lock.
+
+        Writers finish under the lock, so a tail past the complete rows is
+        left by a writer that crashed mid-append: drop it so the next
+        append starts on a row boundary in both files.
+        """
+        for path, row_bytes in (
+            (self._keys_path, _DIGEST_SIZE),
+            (self._vectors_path, self.dimension * 4),
+        ):
+            with open(path, "a+b") as f:
+                f.truncate(self._disk_count * row_bytes)
+
+    def _read_new_rows(self) -> None:
+        """Index rows other writers appended since the last read."""
+        row_bytes = self.dimension * 4
+        try:
+            rows = min(
+                os.path.getsize(self._keys_path) // _DIGEST_SIZE,
+                os.path.getsize(self._vectors_path) // row_bytes,
+            )
+        except FileNotFoundError:
+            return
+        if rows <= self._disk_count:
+            return
+
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._disk_count * _DIGEST_SIZE)
+            raw_keys = f.read((rows - self._disk_count) * _DIGEST_SIZE)
+        for offset in range(len(raw_keys) // _DIGEST_SIZE):
+            key = raw_keys[offset * _DIGEST_SIZE:(offset + 1) * _DIGEST_SIZE]
+            self._disk_rows.setdefault(key, self._disk_count + offset)
+        self._disk_count = rows
+
+    def _mapped_vectors(self, row: int) -> np.memmap:
+        # Re-map lazily once the file has grown past the current view
+        if self._disk_vectors is None or row >= len(self._disk_vectors):
+            self._disk_vectors = np.memmap(
+                self._vectors_path,
+                dtype="float32",
+                mode="r",
+                shape=(self._disk_count, self.dimension),
+            )
+        return self._disk_vectors
+
+    def _append_to_disk(
+        self,
+        new_keys: List[bytes],
+        missing: "OrderedDict[bytes, List[int]]",
+        vectors: np.ndarray,
+    ) -> None:
+        if self._keys_path is None or not new_keys:
+            return
+
+        index_of = {key: i for i, key in enumerate(missing)}
+        with self._file_lock():
+            # Rows are numbered from the files as they are now, after
+            # whatever other processes appended
+            self._read_new_rows()
+            new_keys = [key for key in new_keys if key not in self._disk_rows]
+            if not new_keys:
+                return
+            # Another writer may have crashed since this store was opened
+            self._drop_torn_tail()
+            block = np.ascontiguousarray(
+                vectors[[index_of[key] for key in new_keys]], dtype="float32"
+            )
+
+            # Vectors first, so a crash never leaves keys pointing past the data
+            with open(self._vectors_path, "ab") as f:
+                f.write(block.tobytes())
+            with open(self._keys_path, "ab") as f:
+                f.write(b"".join(new_keys))
+
+            for offset, key in enumerate(new_keys):
+                self._disk_rows[key] = self._disk_count + offset
+            self._disk_count += len(new_keys)
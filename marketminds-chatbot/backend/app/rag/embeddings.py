@@ -3,41 +3,142 @@
 This module defines how text chunks are converted into 
 vector embeddings.
 
-At this stage:
--embeddings are stubbed
-- no external models are called
+Embeddings are returned as a contiguous float32 NumPy matrix of shape
+(len(texts), dimension), ready to be handed to FAISS without copying.
+
+Clients:
+- SentenceTransformerEmbeddingClient: local CPU model, batched encoding
+- DummyEmbeddingClient: deterministic stub for testing the pipeline
 """
-from typing import List
+from typing import List, Optional
+
+import numpy as np
+
+from backend.app.config import config
+
 
 class EmbeddingClient:
     """Base embeddding client interface."""
 
-    def embed(self,texts: List[str])->List[List[float]]:
+    #: Length of each embedding vector.
+    dimension: int
+
+    #: Identifies the model producing the vectors (used for cache keys).
+    model_id: str
+
+    def embed(self,texts: List[str])->np.ndarray:
         """Convert a list of texts into their corresponding embeddings.
         
         Args:
             texts (List[str]): List of text chunks to embed.
         
         Returns:
-            List[List[float]]: List of embeddings, each represented as a list of floats.
+            np.ndarray: float32 matrix of shape (len(texts), dimension).
         
         """
 
         raise NotImplementedError(
             "EmbeddingClient.embed() must be implemented."
         )
-    
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed a search query (not a document chunk).
+
+        Args:
+            text (str): The query.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (1, dimension).
+        """
+        return self.embed([text])
+
+
+class SentenceTransformerEmbeddingClient(EmbeddingClient):
+    """Embedding client backed by a local sentence-transformers model.
+
+    Texts are encoded in batches of `batch_size` on the CPU; `num_threads`
+    controls the intra-op thread pool so ingest throughput scales with cores.
+    """
+
+    def __init__(
+        self,
+        model_name: str = config.EMBEDDING_MODEL_NAME,
+        batch_size: int = config.EMBEDDING_BATCH_SIZE,
+        num_threads: Optional[int] = config.EMBEDDING_NUM_THREADS,
+        device: str = "cpu",
+    ) -> None:
+        """
+        Args:
+            model_name (str): sentence-transformers model name or local path.
+            batch_size (int): Number of texts encoded per forward pass.
+            num_threads (Optional[int]): CPU threads for inference;
+                None leaves the library default (all cores).
+            device (str): Torch device to run on.
+        """
+        try:
+            import torch
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "SentenceTransformerEmbeddingClient requires the "
+                "'sentence-transformers' package."
+            ) from e
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.model_id = model_name
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(model_name, device=device)
+        self.dimension = self._model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in batches into L2-normalised vectors."""
+        if not texts:
+            return np.empty((0, self.dimension), dtype="float32")
+
+        vectors = self._model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return np.ascontiguousarray(vectors, dtype="float32")
+
+
 class DummyEmbeddingClient(EmbeddingClient):
         """dummy embedding client for testing the pipeline"""
-        def embed(self, texts: List[str]) -> List[List[float]]:
+
+        dimension = 1
+        model_id = "dummy-length"
+
+        def embed(self, texts: List[str]) -> np.ndarray:
              """Generate dummy embeddings for the given texts."""
-             embeddings=[]
+             #fake deterministic embedding
+             lengths = [float(len(text)) for text in texts]
+
+             return np.array(lengths, dtype="float32").reshape(-1, 1)
+
+
+def create_embedding_client(read_only: bool = False) -> EmbeddingClient:
+    """Build the embedding client selected by `config.EMBEDDING_BACKEND`,
+    wrapped in the embedding cache.
 
-             for text in texts:
-                  #fake deterministic embedding
-                  vector = [float(len(text))]
-                  embeddings.append(vector)
+    Args:
+        read_only (bool): Only read the on-disk embedding cache (API
+            workers; the ingestion job is its single writer).
+    """
+    from backend.app.rag.embedding_cache import CachedEmbeddingClient
 
-                 
+    if config.EMBEDDING_BACKEND == "dummy":
+        inner: EmbeddingClient = DummyEmbeddingClient()
+    else:
+        inner = SentenceTransformerEmbeddingClient()
 
-             return embeddings
\ No newline at end of file
+    return CachedEmbeddingClient(
+        inner,
+        cache_dir=config.EMBEDDING_CACHE_DIR,
+        max_memory_entries=config.EMBEDDING_CACHE_SIZE,
+        read_only=read_only,
+    )
@@ -0,0 +1,145 @@
+"""
+Published, read-only generations of the vector store.
+
+API workers do not each build and ingest a store of their own: the
+ingestion job publishes a snapshot of its store (a generation), and every
+worker serves the newest one.
+
+Layout under the generations directory:
+- gen-000001/, gen-000002/, ...: complete stores, never modified once
+  published; generation.json records what each one holds
+- CURRENT: name of the generation workers should serve, replaced
+  atomically when a new one is published
+
+Publishing checkpoints the writer's store first, so a generation has no
+in-memory delta: workers map every file read-only and the OS page cache
+holds a single copy of the index, vectors, chunk text, metadata and
+postings however many workers serve it. Files the writer only ever
+replaces (index and lexical checkpoints, label table) are hard-linked
+into the generation; files it appends to in place are copied.
+
+A worker switches generations by replacing one reference: queries in
+flight keep the Retriever they started with, and the old generation's
+maps are released when the last of them finishes. A read-only store
+maps every file when it is opened, so a generation pruned while a worker
+still serves it stays readable on POSIX until that worker lets go.
+"""
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from backend.app.config import config
+from backend.app.rag.embeddings import EmbeddingClient
+from backend.app.rag.retriever import Retriever
+
+_PREFIX = "gen-"
+
+# Written to a temp file and os.replace'd by the writer: a hard link is a
+# stable snapshot
+_REPLACED_FILES = (
+    "index.faiss", "metadata.json", "lexical.json", "lexical.vocab",
+    "lexical.vocab_offsets", "lexical.offsets", "lexical.docs", "lexical.tfs",
+    "lexical.lengths",
+)
+# Appended to (or truncated) in place: copied
+_APPENDED_FILES = ("vectors.f32", "chunks.bin", "chunks.idx", "metadata.rec", "deleted.ids")
+
+
+class IndexGenerations:
+    """
+    Publishes and opens index generations under one directory.
+    """
+
+    def __init__(self, root: Path, keep: int = config.INDEX_GENERATIONS_KEEP) -> None:
+        self.root = root
+        self.keep = max(keep, 1)
+        self.current_path = root / "CURRENT"
+
+    def current(self) -> Optional[str]:
+        """Name of the generation to serve, or None before the first publish."""
+        try:
+            return self.current_path.read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def open(self, name: str, embedding_client: EmbeddingClient) -> Retriever:
+        """Open a published generation read-only."""
+        return Retriever(embedding_client, self.root / name, read_only=True)
+
+    def publish(self, retriever: Retriever) -> str:
+        """
+        Snapshot a writable store as the next generation and make it current.
+
+        Args:
+            retriever (Retriever): The ingestion job's store.
+
+        Returns:
+            str: Name of the new generation.
+        """
+        retriever.checkpoint()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        names = self._generations()
+        number = int(names[-1][len(_PREFIX):]) + 1 if names else 1
+        name = f"{_PREFIX}{number:06d}"
+
+        # Assembled under a temp name, so a generation directory is
+        # always complete
+        staging = self.root / f"{name}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+
+        source = retriever.vector_store_path
+        for file_name in _REPLACED_FILES:
+            if (source / file_name).exists():
+                self._link(source / file_name, staging / file_name)
+        for file_name in _APPENDED_FILES:
+            if (source / file_name).exists():
+                shutil.copyfile(source / file_name, staging / file_name)
+        retriever.metadata.save_partitions(staging)
+
+        with open(staging / "generation.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "chunks": len(retriever.text_chunks),
+                "deleted": len(retriever.deleted_ids),
+                "dimension": retriever.index.d,
+                "published": time.time(),
+            }, f)
+        staging.rename(self.root / name)
+
+        tmp_path = self.current_path.with_suffix(".tmp")
+        tmp_path.write_text(name, encoding="utf-8")
+        os.replace(tmp_path, self.current_path)
+
+        self._prune(name)
+        return name
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _generations(self) -> List[str]:
+        """Published generation names, oldest first."""
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name for path in self.root.iterdir()
+            if path.is_dir() and path.name.startswith(_PREFIX) and path.suffix != ".tmp"
+        )
+
+    def _link(self, source: Path, target: Path) -> None:
+        try:
+            os.link(source, target)
+        except OSError:
+            # No hard links across devices (or on some filesystems)
+            shutil.copyfile(source, target)
+
+    def _prune(self, current: str) -> None:
+        """Drop all but the newest `keep` generations (never `current`)."""
+        for name in self._generations()[:-self.keep]:
+            if name != current:
+                shutil.rmtree(self.root / name, ignore_errors=True)
@@ -0,0 +1,159 @@
+"""
+FAISS index construction for the retriever.
+
+Supported index types:
+- flat: exact exhaustive search (IndexFlatL2)
+- ivf_flat: inverted file over k-means cells, full vectors per cell
+- ivf_pq: inverted file with product-quantised codes (smallest, lossy)
+- hnsw: hierarchical navigable small-world graph
+- auto: pick one of the above from the corpus size
+
+Approximate indexes trade recall for query latency; `nprobe` (IVF) and
+`ef_search` (HNSW) move along that curve per query.
+"""
+
+from typing import Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "auto")
+
+# Below these corpus sizes a trained index is not worth building
+# (and k-means has too few points per centroid).
+MIN_TRAINING_POINTS = {
+    "ivf_flat": 2_000,
+    "ivf_pq": 10_000,
+}
+
+HNSW_NEIGHBOURS = 32
+
+
+def choose_index_type(num_vectors: int) -> str:
+    """
+    Pick an index type for a corpus of `num_vectors`.
+
+    Exact search is fastest to build and cheap below ~20k vectors; IVF-Flat
+    keeps full precision up to ~1M; past that IVF-PQ keeps memory bounded.
+    """
+    if num_vectors < 20_000:
+        return "flat"
+    if num_vectors < 1_000_000:
+        return "ivf_flat"
+    return "ivf_pq"
+
+
+def resolve_index_type(index_type: str, num_vectors: int) -> str:
+    """
+    Map a configured index type to the one to build for `num_vectors`.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}"
+        )
+    if index_type == "auto":
+        index_type = choose_index_type(num_vectors)
+    if num_vectors < MIN_TRAINING_POINTS.get(index_type, 0):
+        return "flat"
+    return index_type
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """
+    Report which of the supported types an index is.
+    """
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(index, faiss.IndexIVFFlat):
+        return "ivf_flat"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+
+def build_index(index_type: str, vectors: np.ndarray) -> faiss.Index:
+    """
+    Build, train and fill an index of `index_type` over `vectors`.
+
+    Args:
+        index_type (str): One of the concrete types (not "auto").
+        vectors (np.ndarray): float32 matrix (may be memory-mapped).
+
+    Returns:
+        faiss.Index: Index containing every row of `vectors`.
+    """
+    num_vectors, dimension = vectors.shape
+    index = faiss.index_factory(
+        dimension, _factory_string(index_type, num_vectors, dimension)
+    )
+
+    if not index.is_trained:
+        index.train(_training_sample(vectors, index_type))
+
+    # Add in slices so a memory-mapped matrix is never copied whole
+    step = 65_536
+    for start in range(0, num_vectors, step):
+        index.add(np.ascontiguousarray(vectors[start:start + step]))
+
+    return index
+
+
+def search_parameters(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    selector: Optional[faiss.IDSelector] = None,
+) -> Optional[faiss.SearchParameters]:
+    """
+    Per-query search parameters for `index` (None when nothing is set).
+
+    Passing parameters per call rather than mutating the index keeps
+    concurrent queries with different settings independent.
+
+    Args:
+        index (faiss.Index): Index about to be searched.
+        nprobe (Optional[int]): IVF cells to visit.
+        ef_search (Optional[int]): HNSW candidate list size.
+        selector (Optional[faiss.IDSelector]): Restricts which ids may
+            be returned.
+    """
+    index_type = index_type_of(index)
+    if index_type in ("ivf_flat", "ivf_pq") and nprobe:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+    if index_type == "hnsw" and ef_search:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=ef_search)
+    if selector is not None:
+        return faiss.SearchParameters(sel=selector)
+    return None
+
+
+def _factory_string(index_type: str, num_vectors: int, dimension: int) -> str:
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "hnsw":
+        return f"HNSW{HNSW_NEIGHBOURS}"
+
+    # ~4*sqrt(n) cells, with at least 39 training points per cell
+    nlist = int(4 * np.sqrt(num_vectors))
+    nlist = max(1, min(nlist, num_vectors // 39))
+
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+
+    # Sub-quantizers of ~8 dimensions each; m must divide the dimension
+    m = max(1, dimension // 8)
+    while dimension % m:
+        m -= 1
+    return f"IVF{nlist},PQ{m}"
+
+
+def _training_sample(vectors: np.ndarray, index_type: str) -> np.ndarray:
+    # k-means converges well with a few hundred points per centroid
+    max_points = 256 * 1_000 if index_type == "ivf_pq" else 100_000
+    if len(vectors) <= max_points:
+        return np.ascontiguousarray(vectors, dtype="float32")
+
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.choice(len(vectors), size=max_points, replace=False))
+    return np.ascontiguousarray(vectors[rows], dtype="float32")
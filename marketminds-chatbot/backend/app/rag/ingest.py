@@ -5,60 +5,216 @@ this module handles the ingestion of documents into the RAG system.
 -cleaning texts
 -splitting into chunks
 
+Documents are processed as a stream: pages -> cleaned segments
+(sentences / table rows) -> overlapping chunks tagged with page numbers.
+Only the current page and the chunk being assembled are held in memory,
+so document size does not affect peak memory.
+
 it does not :
 -create embeddings
 -store vectors
 -call LLMs"""
 
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from backend.app.utils.pdf_utils import extract_text_from_pdf   
-from typing import List
+from backend.app.utils.pdf_utils import iter_pdf_pages
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Sentence ends: terminal punctuation followed by whitespace and the start
+# of a new sentence (so "3.5%" or "Inc.," are not split).
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+
+# Table rows: several numeric cells, laid out in columns or making up
+# most of the line (e.g. "Revenue 394,328 365,817 274,515").
+_NUMBER = re.compile(r"[-(]?[$€£₹]?\d[\d,.]*%?\)?")
+_COLUMN_SEPARATOR = re.compile(r"\t|\s{3,}")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A chunk of document text with the pages it spans."""
+
+    text: str
+    page: Optional[int] = None
+    end_page: Optional[int] = None
+
 
 class DocumentIngestor:
     """responisble for ingesting and preprocessing docs for RAG"""
 
-    def ingest_pdf(self, pdf_path:Path, chunk_size:int=500)->List[str]:
+    def ingest_pdf(
+        self, pdf_path: Path, chunk_size: int = 500, overlap: int = 50
+    ) -> List[str]:
         """Ingest a PDF document and split into chunks suitable for RAG.
         Args:
             pdf_path (Path): Path to the PDF document.
-            chunk_size (int): The size of each text chunk.
+            chunk_size (int): Maximum characters per chunk.
+            overlap (int): Characters repeated from the previous chunk.
         Returns:
             List[str]: List of text chunks.
         """
-        raw_text = extract_text_from_pdf(pdf_path)
-        chunks = self.ingest_text(raw_text, chunk_size)
+        return [
+            chunk.text
+            for chunk in self.iter_pdf_chunks(pdf_path, chunk_size, overlap)
+        ]
+
+    def iter_pdf_chunks(
+        self, pdf_path: Path, chunk_size: int = 500, overlap: int = 50
+    ) -> Iterator[Chunk]:
+        """Stream a PDF's chunks page by page, with page metadata.
 
-        return chunks
-    def ingest_text(self,raw_text:str,chunk_size: int=500)->List[str]:
+        Args:
+            pdf_path (Path): Path to the PDF document.
+            chunk_size (int): Maximum characters per chunk.
+            overlap (int): Characters repeated from the previous chunk.
+
+        Yields:
+            Chunk: chunk text and the pages it spans.
+        """
+        return self.iter_chunks(iter_pdf_pages(pdf_path), chunk_size, overlap)
+
+    def ingest_text(
+        self, raw_text: str, chunk_size: int = 500, overlap: int = 50
+    ) -> List[str]:
         """ingest raw text and split into chunks suitable for RAG.
 
         Args:
             raw_text (str): The raw text document to ingest.
-            chunk_size (int): The size of each text chunk.
-            
-        Returns:    
+            chunk_size (int): Maximum characters per chunk.
+            overlap (int): Characters repeated from the previous chunk.
+
+        Returns:
             List[str]: List of text chunks.
         """
-        cleaned_text = self._clean_text(raw_text)
-        chunks = self._chunk_text(cleaned_text, chunk_size)
+        pages = [(None, raw_text)]
+        return [
+            chunk.text for chunk in self.iter_chunks(pages, chunk_size, overlap)
+        ]
 
-        return chunks
-    
-    def _clean_text(self,text:str)->str:
-        """ clean raw text by removing whitespace and noise"""
-        return " ".join(text.split())
-    
-    def _chunk_text(self,text:str,chunk_size:int)->List[str]:
-        """split  text into fixed size chunks."""
+    def iter_chunks(
+        self,
+        pages: Iterable[Tuple[Optional[int], str]],
+        chunk_size: int = 500,
+        overlap: int = 50,
+    ) -> Iterator[Chunk]:
+        """Assemble overlapping chunks from a stream of (page, text) pairs.
+
+        Segments (sentences, table rows) are packed greedily up to
+        `chunk_size`; each new chunk starts with the trailing segments of
+        the previous one, up to `overlap` characters. Segments are never
+        cut unless a single one exceeds `chunk_size`, in which case it is
+        split on word boundaries.
+        """
+        buffer: List[Tuple[Optional[int], str]] = []
+        length = 0
+
+        for page, segment in self._iter_segments(pages, chunk_size):
+            added = len(segment) + (1 if buffer else 0)
+            if buffer and length + added > chunk_size:
+                yield self._make_chunk(buffer)
+                buffer = self._overlap_tail(buffer, overlap, chunk_size - len(segment) - 1)
+                length = sum(len(text) for _, text in buffer) + max(len(buffer) - 1, 0)
+                added = len(segment) + (1 if buffer else 0)
+
+            buffer.append((page, segment))
+            length += added
+
+        if buffer:
+            yield self._make_chunk(buffer)
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
 
-        chunks=[]
-        start=0
+    def _iter_segments(
+        self,
+        pages: Iterable[Tuple[Optional[int], str]],
+        chunk_size: int,
+    ) -> Iterator[Tuple[Optional[int], str]]:
+        """Split each page into cleaned sentences and intact table rows."""
+        for page, text in pages:
+            prose: List[str] = []
 
-        while start<len(text):
-            end=start+chunk_size
-            chunk=text[start:end]
-            chunks.append(chunk)
-            start=end
+            for line in text.splitlines():
+                if self._is_table_row(line):
+                    # Flush prose before the table so order is kept
+                    yield from self._split_prose(page, " ".join(prose), chunk_size)
+                    prose = []
+                    yield from self._split_long(page, self._clean_text(line), chunk_size)
+                else:
+                    prose.append(line)
 
-        return chunks
-    
\ No newline at end of file
+            yield from self._split_prose(page, " ".join(prose), chunk_size)
+
+    def _split_prose(
+        self, page: Optional[int], text: str, chunk_size: int
+    ) -> Iterator[Tuple[Optional[int], str]]:
+        for sentence in _SENTENCE_END.split(self._clean_text(text)):
+            yield from self._split_long(page, sentence, chunk_size)
+
+    def _split_long(
+        self, page: Optional[int], segment: str, chunk_size: int
+    ) -> Iterator[Tuple[Optional[int], str]]:
+        """Cut an oversized segment on word boundaries (never mid-word)."""
+        if not segment:
+            return
+        while len(segment) > chunk_size:
+            cut = segment.rfind(" ", 0, chunk_size + 1)
+            if cut <= 0:
+                cut = chunk_size
+            yield page, segment[:cut].rstrip()
+            segment = segment[cut:].lstrip()
+        if segment:
+            yield page, segment
+
+    def _overlap_tail(
+        self,
+        buffer: List[Tuple[Optional[int], str]],
+        overlap: int,
+        room: int,
+    ) -> List[Tuple[Optional[int], str]]:
+        """Trailing segments of `buffer` to repeat in the next chunk.
+
+        Whole segments are preferred; if even the last one is too long,
+        its trailing words are used instead.
+        """
+        budget = min(overlap, room)
+        if budget <= 0:
+            return []
+
+        tail: List[Tuple[Optional[int], str]] = []
+        used = 0
+        for page, text in reversed(buffer):
+            used += len(text) + (1 if tail else 0)
+            if used > budget:
+                break
+            tail.insert(0, (page, text))
+
+        if not tail:
+            page, text = buffer[-1]
+            cut = text.find(" ", len(text) - budget - 1)
+            if cut != -1 and cut + 1 < len(text):
+                tail = [(page, text[cut + 1:])]
+        return tail
+
+    def _make_chunk(self, buffer: List[Tuple[Optional[int], str]]) -> Chunk:
+        return Chunk(
+            text=" ".join(text for _, text in buffer),
+            page=buffer[0][0],
+            end_page=buffer[-1][0],
+        )
+
+    def _is_table_row(self, line: str) -> bool:
+        if line.count("|") >= 2:
+            return True
+
+        tokens = line.split()
+        numbers = sum(1 for token in tokens if _NUMBER.fullmatch(token))
+        if numbers < 2:
+            return False
+        return bool(_COLUMN_SEPARATOR.search(line.strip())) or numbers * 2 >= len(tokens)
+
+    def _clean_text(self,text:str)->str:
+        """ clean raw text by removing whitespace and noise"""
+        return " ".join(text.split())
@@ -0,0 +1,314 @@
+"""Incremental, parallel PDF ingestion for MarketMinds Chatbot.
+
+Keeps the vector store in sync with a directory of PDFs:
+- text extraction and chunking run across a process pool; each worker
+  hands its chunks over in bounded batches that are embedded and appended
+  as they arrive, so memory stays flat however large a filing is
+- a manifest records each file's size, mtime, content hash and chunk ids
+- only new or changed files are processed; chunks of changed or deleted
+  files are removed from the retriever
+- progress is committed to the manifest after every file, so an
+  interrupted run resumes where it stopped
+- each chunk is stored with its source file, page, and the company and
+  fiscal year named in the file's path ("AAPL/10-K_FY2023.pdf")
+
+Run standalone with:
+    python -m backend.app.rag.ingest_pipeline [--source DIR] [--workers N] [--publish]
+
+`--publish` then snapshots the store as a new index generation for API
+workers running with SHARED_INDEX (see generations.py).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import Manager
+from pathlib import Path
+from queue import Empty
+from typing import Iterator, List, Optional
+
+from backend.app.config import config
+from backend.app.data_sources.financial_api import TickerResolver
+from backend.app.rag.chunk_metadata import fiscal_years
+from backend.app.rag.generations import IndexGenerations
+from backend.app.rag.ingest import Chunk, DocumentIngestor
+from backend.app.rag.retriever import Retriever
+
+MANIFEST_VERSION = 1
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_pdf(
+    path: Path, known_sha256: Optional[str], chunk_size: int, batch_size: int, batches
+) -> None:
+    """Worker: hash a PDF and, unless its content is unchanged, chunk it.
+
+    Puts on `batches` (a bounded queue, so a worker never runs far ahead
+    of the parent): (content hash, changed), then lists of at most
+    `batch_size` chunks when changed, then None.
+    """
+    try:
+        sha256 = _file_sha256(path)
+        changed = sha256 != known_sha256
+        batches.put((sha256, changed))
+        if changed:
+            batch: List[Chunk] = []
+            for chunk in DocumentIngestor().iter_pdf_chunks(path, chunk_size):
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    batches.put(batch)
+                    batch = []
+            if batch:
+                batches.put(batch)
+    finally:
+        batches.put(None)
+
+
+class IngestionPipeline:
+    """Synchronises a directory of PDFs into a Retriever."""
+
+    def __init__(
+        self,
+        retriever: Retriever,
+        chunk_size: int = 500,
+        max_workers: Optional[int] = config.INGEST_WORKERS,
+        manifest_path: Optional[Path] = None,
+        ticker_resolver: Optional[TickerResolver] = None,
+    ) -> None:
+        """
+        Args:
+            retriever (Retriever): Store the chunks are written to.
+            chunk_size (int): Chunk size passed to DocumentIngestor.
+            max_workers (Optional[int]): Extraction processes (None = cores).
+            manifest_path (Optional[Path]): Defaults to `manifest.json`
+                inside the vector store.
+            ticker_resolver (Optional[TickerResolver]): Tags chunks with
+                the company named in their file path (built on first use).
+        """
+        self.retriever = retriever
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.manifest_path = (
+            manifest_path or retriever.vector_store_path / "manifest.json"
+        )
+        self.manifest = self._load_manifest()
+        self._ticker_resolver = ticker_resolver
+
+    def run(self, source_dir: Path) -> dict:
+        """Ingest new/changed PDFs under `source_dir` and drop deleted ones.
+
+        Returns:
+            dict: file names added, updated, removed, and unchanged count.
+        """
+        summary = {"added": [], "updated": [], "removed": [], "unchanged": 0}
+        self._recover()
+
+        files = self.manifest["files"]
+        on_disk = {
+            path.relative_to(source_dir).as_posix(): path
+            for path in sorted(source_dir.glob("**/*.pdf"))
+        }
+
+        # 1. Files that disappeared
+        for name in sorted(set(files) - set(on_disk)):
+            self._remove_chunks(files.pop(name))
+            summary["removed"].append(name)
+        if summary["removed"]:
+            self._save_manifest()
+
+        # 2. Files that are new or whose size/mtime moved
+        candidates = []
+        for name, path in on_disk.items():
+            stat = path.stat()
+            entry = files.get(name)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                summary["unchanged"] += 1
+            else:
+                candidates.append((name, path, stat))
+
+        if not candidates:
+            return summary
+
+        # 3. Extract in parallel; the main process commits one file at a
+        # time (its chunk ids must be contiguous) while later files are
+        # extracted up to their queue bound. The queues' manager closes
+        # first, so on an error no worker stays blocked on a full queue.
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool, Manager() as manager:
+            jobs = []
+            for name, path, stat in candidates:
+                batches = manager.Queue(maxsize=config.INGEST_QUEUE_BATCHES)
+                future = pool.submit(
+                    _extract_pdf,
+                    path,
+                    files.get(name, {}).get("sha256"),
+                    self.chunk_size,
+                    config.INGEST_BATCH_CHUNKS,
+                    batches,
+                )
+                jobs.append((name, stat, future, batches))
+
+            for name, stat, future, batches in jobs:
+                received = self._receive(future, batches)
+                sha256, changed = next(received)
+                status = self._commit(name, stat, sha256, received if changed else None)
+                if status == "unchanged":
+                    summary["unchanged"] += 1
+                else:
+                    summary[status].append(name)
+
+        return summary
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _receive(self, future: Future, batches) -> Iterator:
+        """Items a worker puts on `batches`, up to its final None."""
+        while True:
+            try:
+                item = batches.get(timeout=1.0)
+            except Empty:
+                if future.done():
+                    # Died before its final None (e.g. killed)
+                    future.result()
+                    raise RuntimeError("PDF extraction worker exited early")
+                continue
+            if item is None:
+                break
+            yield item
+        # Re-raise anything the worker failed with
+        future.result()
+
+    def _commit(
+        self,
+        name: str,
+        stat: os.stat_result,
+        sha256: str,
+        batches: Optional[Iterator[List[Chunk]]],
+    ) -> str:
+        files = self.manifest["files"]
+        previous = files.get(name)
+        entry = {"sha256": sha256, "size": stat.st_size, "mtime": stat.st_mtime}
+
+        if batches is None:
+            # Touched but identical content: keep the existing chunks
+            entry.update(
+                first_chunk=previous["first_chunk"],
+                num_chunks=previous["num_chunks"],
+            )
+            files[name] = entry
+            self._save_manifest()
+            return "unchanged"
+
+        # Mark the append as in flight so a crash can be rolled back
+        first_chunk = len(self.retriever.text_chunks)
+        self.manifest["pending"] = {"file": name, "first_chunk": first_chunk}
+        self._save_manifest()
+
+        source = self._source_metadata(name)
+        try:
+            for chunks in batches:
+                self.retriever.add_documents(
+                    [chunk.text for chunk in chunks],
+                    [dict(source, page=chunk.page) for chunk in chunks],
+                )
+        except BaseException:
+            # Drop the part of the file already appended
+            self._recover()
+            raise
+        if previous:
+            self._remove_chunks(previous)
+
+        num_chunks = len(self.retriever.text_chunks) - first_chunk
+        entry.update(first_chunk=first_chunk, num_chunks=num_chunks)
+        files[name] = entry
+        self.manifest["pending"] = None
+        self._save_manifest()
+        return "updated" if previous else "added"
+
+    def _source_metadata(self, name: str) -> dict:
+        """Company and fiscal year named in a file's relative path."""
+        if self._ticker_resolver is None:
+            self._ticker_resolver = TickerResolver()
+
+        # "AAPL/10-K_FY2023.pdf" -> "AAPL 10 K FY2023"
+        words = re.sub(r"[\W_]+", " ", name.rsplit(".", 1)[0])
+        matches = self._ticker_resolver.find_matches(words)
+        years = fiscal_years(words)
+        return {
+            "source": name,
+            "ticker": matches[0][2] if matches else None,
+            "year": years[0] if years else None,
+        }
+
+    def _recover(self) -> None:
+        """Drop chunks appended by a run that died before committing."""
+        pending = self.manifest.get("pending")
+        if not pending:
+            return
+
+        orphans = range(pending["first_chunk"], len(self.retriever.text_chunks))
+        self.retriever.remove_chunks(orphans)
+        self.manifest["pending"] = None
+        self._save_manifest()
+
+    def _remove_chunks(self, entry: dict) -> None:
+        first = entry["first_chunk"]
+        self.retriever.remove_chunks(range(first, first + entry["num_chunks"]))
+
+    def _load_manifest(self) -> dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        return {"version": MANIFEST_VERSION, "files": {}, "pending": None}
+
+    def _save_manifest(self) -> None:
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from backend.app.rag.embeddings import create_embedding_client
+
+    parser = argparse.ArgumentParser(description="Ingest PDFs into the vector store.")
+    parser.add_argument("--source", type=Path, default=config.RAW_DATA_DIR)
+    parser.add_argument("--workers", type=int, default=config.INGEST_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--publish", action="store_true",
+                        help="Publish the result as a new index generation.")
+    args = parser.parse_args(argv)
+
+    retriever = Retriever(
+        embedding_client=create_embedding_client(),
+        vector_store_path=config.VECTOR_STORE_PATH,
+    )
+    pipeline = IngestionPipeline(
+        retriever, chunk_size=args.chunk_size, max_workers=args.workers
+    )
+    summary = pipeline.run(args.source)
+
+    print(
+        f"added={len(summary['added'])} updated={len(summary['updated'])} "
+        f"removed={len(summary['removed'])} unchanged={summary['unchanged']} "
+        f"chunks={len(retriever.text_chunks)}"
+    )
+
+    if args.publish:
+        name = IndexGenerations(config.INDEX_GENERATIONS_DIR).publish(retriever)
+        print(f"published {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""
+BM25 inverted index over the retriever's chunks.
+
+Dense embeddings blur exact tokens that matter in finance (tickers,
+"FY2023", "EBITDA"); this index scores them lexically so the retriever
+can fuse both rankings.
+
+Layout mirrors the vector store: a checkpoint in compressed sparse row
+form, memory-mapped, plus an in-memory delta for chunks appended since.
+- lexical.vocab: UTF-8 terms in byte order, concatenated; a term's id is
+  its position, found by binary search
+- lexical.vocab_offsets: int64, term t is vocab[vocab_offsets[t]:vocab_offsets[t+1]]
+- lexical.offsets: int64, postings of term t are [offsets[t], offsets[t+1])
+- lexical.docs / lexical.tfs: int32 chunk ids / uint16 term frequencies
+- lexical.lengths: uint32 token count per chunk
+- lexical.json: number of chunks covered and total token count
+
+Every checkpoint file is mapped, vocabulary included, so processes
+serving the same read-only index (a published generation) share one
+copy through the page cache.
+
+A query touches only the posting lists of its own terms: per-term BM25
+contributions are computed as whole-array NumPy operations against
+precomputed per-chunk length norms, then summed with one bincount.
+"""
+
+import json
+import os
+import re
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.&'-][a-z0-9]+)*")
+
+# Too common to discriminate; skipped at index and query time
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that "
+    "the this to was were will with what which who how did does do".split()
+)
+
+_FILES = ("vocab", "vocab_offsets", "offsets", "docs", "tfs", "lengths")
+
+# Checkpoint layout written by this version (lexical.json "format")
+_FORMAT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, keeping "10-k", "s&p", "3.5" intact."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class LexicalIndex:
+    """
+    Append-only BM25 index with a memory-mapped checkpoint.
+    """
+
+    def __init__(
+        self, directory: Path, k1: float = 1.2, b: float = 0.75, read_only: bool = False
+    ) -> None:
+        """
+        Args:
+            directory (Path): Directory of the checkpoint files.
+            k1 (float): BM25 term-frequency saturation.
+            b (float): BM25 length normalisation.
+            read_only (bool): Serve the checkpoint as is; never index,
+                rebuild or delete files.
+        """
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.read_only = read_only
+
+        self.meta_path = directory / "lexical.json"
+        self._paths = {name: directory / f"lexical.{name}" for name in _FILES}
+
+        self._reset()
+        if self.meta_path.exists():
+            self._open_checkpoint()
+
+    def __len__(self) -> int:
+        return self.num_checkpointed + len(self._delta_lengths)
+
+    # --------------------------------------------------
+    # Indexing
+    # --------------------------------------------------
+
+    def add(self, chunks: Iterable[str]) -> None:
+        """Index chunks, numbered consecutively after the existing ones."""
+        self._check_writable()
+        doc = len(self)
+        delta = self._delta
+        for text in chunks:
+            counts = Counter(tokenize(text))
+            for term, tf in counts.items():
+                postings = delta.get(term)
+                if postings is None:
+                    postings = delta[term] = (array("q"), array("q"))
+                postings[0].append(doc)
+                postings[1].append(tf)
+            self._delta_lengths.append(sum(counts.values()))
+            self._total_length += self._delta_lengths[-1]
+            doc += 1
+        self._norms = None
+
+    def sync(self, chunks) -> None:
+        """
+        Bring the index in line with a chunk store after a restart:
+        re-index chunks past the checkpoint, or rebuild if the
+        checkpoint covers chunks the store no longer has.
+
+        A read-only index must already cover exactly the store's chunks.
+        """
+        if self.read_only:
+            if self.num_checkpointed != len(chunks):
+                raise ValueError(
+                    f"{self.directory}: lexical checkpoint covers "
+                    f"{self.num_checkpointed} chunks, the store has {len(chunks)}"
+                )
+            return
+        if self.num_checkpointed > len(chunks):
+            self.clear()
+        self._delta.clear()
+        self._delta_lengths = []
+        self._total_length = self._checkpoint_length
+        self.add(chunks[i] for i in range(self.num_checkpointed, len(chunks)))
+
+    def clear(self) -> None:
+        self._check_writable()
+        for path in [self.meta_path, *self._paths.values()]:
+            path.unlink(missing_ok=True)
+        self._reset()
+
+    def checkpoint(self) -> None:
+        """Merge the delta into a new on-disk checkpoint."""
+        self._check_writable()
+        if not self._delta_lengths and self.meta_path.exists():
+            return
+
+        # Add terms first seen in the delta; ids are renumbered to keep
+        # the vocabulary sorted
+        old_vocab = self._terms()
+        vocab = sorted(set(old_vocab).union(term.encode("utf-8") for term in self._delta))
+        term_ids = {term: i for i, term in enumerate(vocab)}
+
+        # Delta postings as (term, doc, tf) triplets
+        delta_terms, delta_docs, delta_tfs = [], [], []
+        for term, (docs, tfs) in self._delta.items():
+            delta_terms.append(np.full(len(docs), term_ids[term.encode("utf-8")], dtype="int64"))
+            delta_docs.append(np.frombuffer(docs, dtype="int64").astype("int32"))
+            delta_tfs.append(np.minimum(np.frombuffer(tfs, dtype="int64"), 65535).astype("uint16"))
+
+        old_ids = np.array([term_ids[term] for term in old_vocab], dtype="int64")
+        old_terms = np.repeat(old_ids, np.diff(self._offsets))
+        terms = np.concatenate([old_terms, *delta_terms])
+        docs = np.concatenate([np.asarray(self._docs), *delta_docs]).astype("int32")
+        tfs = np.concatenate([np.asarray(self._tfs), *delta_tfs]).astype("uint16")
+
+        # Stable: old postings precede delta postings within each term,
+        # so every posting list stays sorted by chunk id
+        order = np.argsort(terms, kind="stable")
+        offsets = np.zeros(len(vocab) + 1, dtype="int64")
+        np.cumsum(np.bincount(terms, minlength=len(vocab)), out=offsets[1:])
+        lengths = np.concatenate([
+            np.asarray(self._lengths), np.asarray(self._delta_lengths, dtype="uint32")
+        ]).astype("uint32")
+
+        vocab_offsets = np.zeros(len(vocab) + 1, dtype="int64")
+        np.cumsum([len(term) for term in vocab], out=vocab_offsets[1:])
+
+        paths = self._paths
+        self._write(paths["vocab"], b"".join(vocab))
+        self._write(paths["vocab_offsets"], vocab_offsets.tobytes())
+        self._write(paths["offsets"], offsets.tobytes())
+        self._write(paths["docs"], docs[order].tobytes())
+        self._write(paths["tfs"], tfs[order].tobytes())
+        self._write(paths["lengths"], lengths.tobytes())
+        # The metadata commits the checkpoint
+        meta = {
+            "num_docs": len(lengths),
+            "total_length": self._total_length,
+            "format": _FORMAT,
+        }
+        self._write(self.meta_path, json.dumps(meta).encode("utf-8"))
+
+        self._reset()
+        self._open_checkpoint()
+
+    # --------------------------------------------------
+    # Search
+    # --------------------------------------------------
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        exclude: Optional[np.ndarray] = None,
+        include: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Best `top_k` chunks for `query` by BM25.
+
+        Args:
+            query (str): Question text.
+            top_k (int): Number of results.
+            exclude (Optional[np.ndarray]): Sorted chunk ids to skip.
+            include (Optional[np.ndarray]): Sorted chunk ids to restrict
+                the search to; posting lists are intersected with it up
+                front, so a narrow filter only scores its own chunks.
+
+        Returns:
+            List[Tuple[int, float]]: (chunk id, score), best first.
+        """
+        num_docs = len(self)
+        terms = set(tokenize(query))
+        if not num_docs or not terms:
+            return []
+
+        norms = self._length_norms()
+
+        # Rarest (highest idf) terms first
+        lists = []
+        for term in terms:
+            # idf stays corpus-wide; only the scored postings are restricted
+            df, docs, tfs = self._postings(term, include)
+            if len(docs):
+                lists.append((np.log1p((num_docs - df + 0.5) / (df + 0.5)), docs, tfs))
+        if not lists:
+            return []
+        lists.sort(key=lambda item: -item[0])
+
+        # Best score any chunk could still gain from terms i, i+1, ...
+        bounds = np.cumsum([idf * (self.k1 + 1) for idf, _, _ in lists][::-1])[::-1]
+
+        unique_docs = np.empty(0, dtype="int64")
+        scores = np.empty(0, dtype="float64")
+        # Switched to a dense per-chunk accumulator once the candidates
+        # cover a large share of the corpus (very common query terms)
+        dense: Optional[np.ndarray] = None
+        excluding = exclude is not None and len(exclude) > 0
+
+        for i, (idf, docs, tfs) in enumerate(lists):
+            if (
+                dense is None
+                and len(scores) >= top_k
+                and bounds[i] < np.partition(scores, -top_k)[-top_k]
+            ):
+                # MaxScore: the remaining terms cannot lift an unseen chunk
+                # into the top k, so only intersect them with candidates
+                # (posting lists are sorted by chunk id)
+                pos = np.minimum(np.searchsorted(docs, unique_docs), len(docs) - 1)
+                hit = docs[pos] == unique_docs
+                tf = tfs[pos[hit]].astype("float32")
+                scores[hit] += idf * tf * (self.k1 + 1) / (tf + norms[unique_docs[hit]])
+                continue
+
+            tf = tfs.astype("float32")
+            contributions = idf * tf * (self.k1 + 1) / (tf + norms[docs])
+
+            if dense is None and len(unique_docs) + len(docs) > num_docs // 8:
+                dense = np.zeros(num_docs, dtype="float64")
+                dense[unique_docs] = scores
+            if dense is not None:
+                # Chunk ids are unique within a posting list
+                dense[docs] += contributions
+                continue
+
+            if excluding:
+                keep = ~np.isin(docs, exclude, assume_unique=True)
+                docs, contributions = docs[keep], contributions[keep]
+            merged, inverse = np.unique(
+                np.concatenate([unique_docs, docs]), return_inverse=True
+            )
+            scores = np.bincount(
+                inverse, weights=np.concatenate([scores, contributions]),
+                minlength=len(merged),
+            )
+            unique_docs = merged
+
+        if dense is not None:
+            if excluding:
+                dense[exclude[exclude < num_docs]] = 0.0
+            unique_docs = np.flatnonzero(dense)
+            scores = dense[unique_docs]
+
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(unique_docs[i]), float(scores[i])) for i in best]
+
+    # --------------------------------------------------
+    # Internal helpers
+    # --------------------------------------------------
+
+    def _restrict(
+        self, docs: np.ndarray, tfs: np.ndarray, include: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Intersect a posting list with sorted ids, probing the shorter side."""
+        if len(include) < len(docs):
+            # Match the posting dtype, or searchsorted converts all of `docs`
+            include = include.astype(docs.dtype, copy=False)
+            pos = np.minimum(np.searchsorted(docs, include), len(docs) - 1)
+            pos = pos[docs[pos] == include]
+            return docs[pos], tfs[pos]
+
+        pos = np.minimum(np.searchsorted(include, docs), len(include) - 1)
+        hit = include[pos] == docs
+        return docs[hit], tfs[hit]
+
+    def _postings(
+        self, term: str, include: Optional[np.ndarray] = None
+    ) -> Tuple[int, np.ndarray, np.ndarray]:
+        """Document frequency, then chunk ids and tfs (within `include`)."""
+        parts = []
+
+        term_id = self._term_id(term)
+        if term_id is not None:
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            parts.append((self._docs[start:end], self._tfs[start:end]))
+
+        delta = self._delta.get(term)
+        if delta is not None:
+            parts.append((
+                np.frombuffer(delta[0], dtype="int64"),
+                np.frombuffer(delta[1], dtype="int64"),
+            ))
+
+        if not parts:
+            return 0, np.empty(0, dtype="int64"), np.empty(0, dtype="uint16")
+
+        df = sum(len(docs) for docs, _ in parts)
+        if include is not None:
+            # Restrict before copying, so cost follows the filtered set
+            parts = [self._restrict(docs, tfs, include) for docs, tfs in parts]
+        return (
+            df,
+            np.concatenate([np.asarray(docs, dtype="int64") for docs, _ in parts]),
+            np.concatenate([np.asarray(tfs) for _, tfs in parts]),
+        )
+
+    def _length_norms(self) -> np.ndarray:
+        """k1 * (1 - b + b * len / avg_len) per chunk, cached."""
+        if self._norms is None:
+            lengths = np.concatenate([
+                np.asarray(self._lengths, dtype="float32"),
+                np.asarray(self._delta_lengths, dtype="float32"),
+            ])
+            avg = max(self._total_length / max(len(lengths), 1), 1.0)
+            self._norms = self.k1 * (1 - self.b + self.b * lengths / avg)
+        return self._norms
+
+    def _reset(self) -> None:
+        self.num_checkpointed = 0
+        self._checkpoint_length = 0
+        self._vocab = np.empty(0, dtype="uint8")
+        self._vocab_offsets = np.zeros(1, dtype="int64")
+        self._offsets = np.zeros(1, dtype="int64")
+        self._docs = np.empty(0, dtype="int32")
+        self._tfs = np.empty(0, dtype="uint16")
+        self._lengths = np.empty(0, dtype="uint32")
+
+        # term -> (chunk ids, tfs) for chunks appended since the checkpoint
+        self._delta: Dict[str, Tuple[array, array]] = {}
+        self._delta_lengths: List[int] = []
+        self._total_length = 0
+        self._norms: Optional[np.ndarray] = None
+
+    def _open_checkpoint(self) -> None:
+        with open(self.meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+
+        # Files from a checkpoint that died before its metadata was
+        # written, or from an older layout: start over (sync re-indexes
+        # from the chunk store)
+        if meta.get("format") != _FORMAT or not all(p.exists() for p in self._paths.values()):
+            self._discard_checkpoint()
+            return
+
+        self._vocab = self._map("vocab", "uint8")
+        self._vocab_offsets = self._map("vocab_offsets", "int64")
+        self._offsets = self._map("offsets", "int64")
+        self._docs = self._map("docs", "int32")
+        self._tfs = self._map("tfs", "uint16")
+        self._lengths = self._map("lengths", "uint32")
+
+        terms = len(self._vocab_offsets) - 1
+        if (
+            len(self._lengths) != meta["num_docs"]
+            or terms < 0
+            or len(self._offsets) != terms + 1
+            or self._vocab_offsets[-1] != len(self._vocab)
+        ):
+            self._discard_checkpoint()
+            return
+
+        self.num_checkpointed = meta["num_docs"]
+        self._checkpoint_length = self._total_length = meta["total_length"]
+        self._norms = None
+
+    def _discard_checkpoint(self) -> None:
+        if self.read_only:
+            raise ValueError(f"{self.directory} has no usable lexical checkpoint")
+        self.clear()
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise PermissionError(f"{self.directory} lexical index is opened read-only")
+
+    def _terms(self) -> List[bytes]:
+        """The vocabulary, in id order."""
+        vocab = bytes(self._vocab)
+        bounds = self._vocab_offsets.tolist()
+        return [vocab[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def _term_id(self, term: str) -> Optional[int]:
+        """Id of `term` by binary search over the mapped vocabulary."""
+        key = term.encode("utf-8")
+        vocab, bounds = self._vocab, self._vocab_offsets
+        lo, hi = 0, len(bounds) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if vocab[bounds[mid]:bounds[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(bounds) - 1 and vocab[bounds[lo]:bounds[lo + 1]].tobytes() == key:
+            return lo
+        return None
+
+    def _map(self, name: str, dtype: str) -> np.ndarray:
+        path = self._paths[name]
+        if not path.stat().st_size:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
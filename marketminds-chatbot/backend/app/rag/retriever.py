@@ -1,13 +1,63 @@
 """
 Retriever module with FAISS persistence
+
+The vector store is a directory:
+- vectors.f32: every embedding, appended row by row (source of truth)
+- index.faiss: checkpoint written with FAISS's native serializer and
+  opened memory-mapped (read-only) at startup; covers the first
+  `index.ntotal` rows of vectors.f32
+- chunks.bin / chunks.idx: append-only chunk text (see ChunkStore)
+- deleted.ids: ids of removed chunks (int64), excluded at search time
+- metadata.*: source, ticker, page and fiscal year of every chunk (see
+  ChunkMetadata)
+- lexical.*: BM25 inverted index over the same chunks (see LexicalIndex),
+  checkpointed together with the vector index
+
+Appends only ever write the new vectors and text, and are searched
+exhaustively until the next checkpoint folds them into the index. The
+checkpoint is rebuilt (and trained) whenever the configured index type
+calls for a different index at the current corpus size.
+
+`search` fuses the dense and BM25 rankings with reciprocal rank fusion,
+so exact tokens (tickers, fiscal years, metric names) are found even
+when the embedding does not separate them.
+
+A store opened with `read_only=True` (a published index generation, see
+generations.py) is served exactly as found: no file is created,
+truncated or appended to, and every structure is memory-mapped.
+
+Filters (company, document, year, pages) are resolved against the
+metadata table into the set of allowed chunk ids before searching: a
+narrow set is scanned exactly, gathering only its own vectors, and a
+broad one is passed to FAISS as an ID selector. BM25 intersects its
+posting lists with the same set. Results are never post-filtered, so a
+filtered search always returns up to `top_k` matching chunks.
 """
 
-from typing import List
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from pathlib import Path
-import pickle
 import faiss
 import numpy as np
+from backend.app.config import config
+from backend.app.rag.chunk_metadata import ChunkMetadata
+from backend.app.rag.chunk_store import ChunkStore
 from backend.app.rag.embeddings import EmbeddingClient
+from backend.app.rag.lexical_index import LexicalIndex
+from backend.app.utils.metrics import span
+from backend.app.rag.index_factory import (
+    build_index,
+    index_type_of,
+    resolve_index_type,
+    search_parameters,
+)
+
+# Zero-copy mmap for flat codes where FAISS supports it
+_MMAP_FLAG = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+
+# Reciprocal rank fusion damping (the usual value from the RRF paper)
+_RRF_K = 60
 
 
 class Retriever:
@@ -19,60 +69,449 @@ class Retriever:
         self,
         embedding_client: EmbeddingClient,
         vector_store_path: Path,
+        checkpoint_every: int = config.VECTOR_STORE_CHECKPOINT_EVERY,
+        index_type: str = config.VECTOR_INDEX_TYPE,
+        retrieval_mode: str = config.RETRIEVAL_MODE,
+        read_only: bool = False,
     ) -> None:
         self.embedding_client = embedding_client
         self.vector_store_path = vector_store_path
+        self.checkpoint_every = checkpoint_every
+        self.index_type = index_type
+        self.retrieval_mode = retrieval_mode
+        self.read_only = read_only
+
+        self.index_path = vector_store_path / "index.faiss"
+        self.vectors_path = vector_store_path / "vectors.f32"
+        self.deleted_path = vector_store_path / "deleted.ids"
+
+        self.text_chunks = ChunkStore(vector_store_path, read_only=read_only)
+        self.metadata = ChunkMetadata(vector_store_path, read_only=read_only)
+        self.lexical_index = LexicalIndex(vector_store_path, read_only=read_only)
 
-        self.text_chunks: List[str] = []
+        # `index` holds the (read-only, mmap'd) checkpoint; `delta_index`
+        # holds vectors appended since, searched exhaustively.
         self.index = None
+        self.delta_index = None
 
-        if self.vector_store_path.exists():
+        # Removed chunk ids, and FAISS selectors excluding them (cached)
+        self.deleted_ids = np.empty(0, dtype="int64")
+        self._selectors = None
+        # Vectors map kept for the life of a read-only store
+        self._vector_map: Optional[np.ndarray] = None
+
+        if self.index_path.exists():
             self._load()
+        elif read_only:
+            raise FileNotFoundError(f"No index checkpoint in {vector_store_path}")
         else:
             self._initialize_index()
 
+        if read_only:
+            # Mapped now, so the store stays readable if its files are
+            # deleted (a pruned generation still being served)
+            self._vector_map = self._vectors()
+
     def _initialize_index(self):
-        # We use 1-dim dummy embeddings for now
-        self.index = faiss.IndexFlatL2(1)
+        # Size the index from the embedder so any model plugs in
+        self.index = faiss.IndexFlatL2(self.embedding_client.dimension)
+        self.delta_index = faiss.IndexFlatL2(self.embedding_client.dimension)
+        self.text_chunks.clear()
+        self.metadata.clear()
+        self.lexical_index.clear()
+        self.vectors_path.write_bytes(b"")
+        self.deleted_path.write_bytes(b"")
+        self.deleted_ids = np.empty(0, dtype="int64")
+        self._selectors = None
+        # Drop any checkpoint of an old store (e.g. another dimension), so
+        # the empty index is always written
+        self.index_path.unlink(missing_ok=True)
+        self._checkpoint()
 
-    def add_documents(self, chunks: List[str]) -> None:
+    def add_documents(
+        self, chunks: List[str], metadata: Optional[Sequence[Optional[dict]]] = None
+    ) -> None:
+        """
+        Embed and store chunks.
+
+        Args:
+            chunks (List[str]): Chunk texts.
+            metadata (Optional[Sequence[Optional[dict]]]): Per-chunk
+                "source", "ticker", "page" and "year" (any may be missing).
+        """
+        self._check_writable()
         vectors = self.embedding_client.embed(chunks)
 
-        if not vectors:
+        if len(vectors) == 0:
             return
 
-        faiss_vectors = [v for v in vectors]
-        self.index.add(np.array(faiss_vectors))
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
 
+        # Vectors and metadata before text: on restart, extra rows are
+        # trimmed to match the chunk count
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+        self.metadata.extend(metadata or [None] * len(chunks))
         self.text_chunks.extend(chunks)
-        self._save()
+        self.delta_index.add(vectors)
+        self.lexical_index.add(chunks)
 
-    def retrieve(self, query: str, top_k: int = 3) -> List[str]:
-        query_vector = self.embedding_client.embed([query])[0]
+        if self.delta_index.ntotal >= self.checkpoint_every:
+            self._checkpoint()
 
-        query_np = np.array([query_vector], dtype="float32")
+    def remove_chunks(self, chunk_ids: Iterable[int]) -> None:
+        """
+        Exclude chunks from all future searches.
 
-        distances, indices = self.index.search(query_np, top_k)
+        Chunk ids are positions in `text_chunks`; the underlying rows are
+        left in place, so ids of other chunks never change.
+        """
+        self._check_writable()
+        ids = np.fromiter(chunk_ids, dtype="int64")
+        ids = np.setdiff1d(ids, self.deleted_ids)
+        if not len(ids):
+            return
+
+        with open(self.deleted_path, "ab") as f:
+            f.write(ids.tobytes())
+        self.deleted_ids = np.union1d(self.deleted_ids, ids)
+        self._selectors = None
+
+    def checkpoint(self) -> None:
+        """Fold every appended vector and chunk into the on-disk checkpoints."""
+        self._check_writable()
+        self._checkpoint()
+        self.lexical_index.checkpoint()
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 3,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        filters: Optional[Dict[str, object]] = None,
+    ) -> List[str]:
+        """
+        Return the `top_k` chunks closest to `query`.
+
+        Args:
+            query (str): Question text.
+            top_k (int): Number of chunks to return.
+            nprobe (Optional[int]): IVF cells to visit (default from config).
+            ef_search (Optional[int]): HNSW candidate list size
+                (default from config).
+            filters (Optional[Dict[str, object]]): Restrict the search to
+                chunks whose "source", "ticker" or "year" is one of the
+                given value(s), or whose page lies in "pages"
+                ((first, last)). Keys combine with AND.
+        """
+        return [
+            chunk
+            for _, chunk in self.search(query, top_k, nprobe, ef_search, filters)
+        ]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        filters: Optional[Dict[str, object]] = None,
+    ) -> List[Tuple[int, str]]:
+        """
+        Like `retrieve`, but returns (chunk id, chunk) pairs.
+
+        Chunk ids are stable positions in the store, so callers can key
+        caches on exactly which chunks an answer was built from.
+        """
+        mode = self.retrieval_mode
+        rankings = []
+
+        allowed = None
+        if filters:
+            with span("filter"):
+                allowed = self._filter_ids(filters)
+            if not len(allowed):
+                return []
+
+        if mode in ("vector", "hybrid"):
+            # Dig deeper than top_k when fusing, so a chunk ranked well
+            # lexically but modestly by vectors can still surface
+            depth = top_k if mode == "vector" else max(top_k * 4, 20)
+            with span("embed"):
+                query_np = self.embedding_client.embed_query(query)
+            with span("vector_search"):
+                if allowed is not None and len(allowed) <= config.FILTER_EXACT_SCAN_MAX:
+                    _, indices = self._search_subset(query_np, depth, allowed)
+                else:
+                    _, indices = self._search(query_np, depth, nprobe, ef_search, allowed)
+            rankings.append([int(idx) for idx in indices[0] if idx >= 0])
+
+        if mode in ("lexical", "hybrid"):
+            depth = top_k if mode == "lexical" else max(top_k * 4, 20)
+            with span("lexical_search"):
+                hits = self.lexical_index.search(
+                    query, depth, exclude=self.deleted_ids, include=allowed
+                )
+            rankings.append([chunk_id for chunk_id, _ in hits])
 
         results = []
-        for idx in indices[0]:
-            if idx < len(self.text_chunks):
-                results.append(self.text_chunks[idx])
+        for idx in self._fuse(rankings)[:top_k]:
+            if 0 <= idx < len(self.text_chunks):
+                results.append((idx, self.text_chunks[idx]))
 
         return results
 
-    def _save(self):
-        with open(self.vector_store_path, "wb") as f:
-            pickle.dump(
-                {
-                    "index": self.index,
-                    "chunks": self.text_chunks,
-                },
-                f,
+    def evaluate_recall(
+        self,
+        k: int = 10,
+        num_queries: int = 100,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> dict:
+        """
+        Measure recall@k of the current index against exact search.
+
+        Queries are sampled from the stored vectors; ground truth is an
+        exhaustive scan over the same vectors.
+
+        Returns:
+            dict: index type, recall@k and per-query latency of both.
+        """
+        vectors = self._vectors()
+        if not len(vectors):
+            return {"index_type": index_type_of(self.index), "recall": None}
+
+        rng = np.random.default_rng(0)
+        rows = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+        queries = np.ascontiguousarray(vectors[np.sort(rows)])
+
+        start = time.perf_counter()
+        _, exact = faiss.knn(queries, vectors, k)
+        flat_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, approx = self._search(queries, k, nprobe, ef_search)
+        ann_seconds = time.perf_counter() - start
+
+        hits = sum(
+            len(set(e[e >= 0]) & set(a[a >= 0])) for e, a in zip(exact, approx)
+        )
+        return {
+            "index_type": index_type_of(self.index),
+            "num_vectors": len(vectors),
+            "k": k,
+            "recall": hits / (len(queries) * k),
+            "flat_ms_per_query": 1000 * flat_seconds / len(queries),
+            "ann_ms_per_query": 1000 * ann_seconds / len(queries),
+        }
+
+    def _search(
+        self,
+        query_np: np.ndarray,
+        top_k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        allowed: Optional[np.ndarray] = None,
+    ):
+        """
+        Search checkpoint and delta, merging into global chunk ids.
+
+        `allowed` (sorted ids, already without deleted ones) restricts
+        the search; otherwise only deleted ids are excluded.
+        """
+        if allowed is None:
+            base_selector, delta_selector = self._exclusion_selectors()
+        else:
+            base_selector, delta_selector = self._inclusion_selectors(allowed)
+
+        params = search_parameters(
+            self.index,
+            nprobe=nprobe or config.VECTOR_NPROBE,
+            ef_search=ef_search or config.VECTOR_EF_SEARCH,
+            selector=base_selector,
+        )
+        distances, indices = self.index.search(query_np, top_k, params=params)
+        if not self.delta_index.ntotal:
+            return distances, indices
+
+        delta_distances, delta_indices = self.delta_index.search(
+            query_np,
+            top_k,
+            params=search_parameters(self.delta_index, selector=delta_selector),
+        )
+        delta_indices = np.where(
+            delta_indices >= 0, delta_indices + self.index.ntotal, -1
+        )
+
+        all_distances = np.hstack([distances, delta_distances])
+        all_indices = np.hstack([indices, delta_indices])
+        # Missing results come back as -1 with +inf-like distances
+        all_distances[all_indices < 0] = np.inf
+
+        order = np.argsort(all_distances, axis=1, kind="stable")[:, :top_k]
+        return (
+            np.take_along_axis(all_distances, order, axis=1),
+            np.take_along_axis(all_indices, order, axis=1),
+        )
+
+    def _search_subset(self, query_np: np.ndarray, top_k: int, allowed: np.ndarray):
+        """
+        Exact search over the allowed chunks only.
+
+        Gathers just their vectors from the memory map, so the cost is
+        proportional to the filtered set rather than to the corpus.
+        """
+        subset = np.ascontiguousarray(self._vectors()[allowed])
+        distances, positions = faiss.knn(query_np, subset, min(top_k, len(allowed)))
+        return distances, np.where(positions >= 0, allowed[positions], -1)
+
+    def _filter_ids(self, filters: Dict[str, object]) -> np.ndarray:
+        """Sorted ids of live chunks matching `filters`."""
+        def values(key):
+            value = filters.get(key)
+            if value is None or isinstance(value, (list, tuple, set)):
+                return value
+            return [value]
+
+        ids = self.metadata.match(
+            sources=values("source"),
+            tickers=values("ticker"),
+            years=values("year"),
+            pages=filters.get("pages"),
+        )
+        if len(self.deleted_ids):
+            ids = np.setdiff1d(ids, self.deleted_ids, assume_unique=True)
+        return ids
+
+    def _inclusion_selectors(self, allowed: np.ndarray):
+        """Selectors admitting only `allowed` in the checkpoint and the delta."""
+        offset = self.index.ntotal
+        return (
+            faiss.IDSelectorBatch(allowed[allowed < offset]),
+            faiss.IDSelectorBatch(allowed[allowed >= offset] - offset),
+        )
+
+    def _fuse(self, rankings: List[List[int]]) -> List[int]:
+        """Reciprocal rank fusion: sum of 1 / (k + rank) over rankings."""
+        if len(rankings) == 1:
+            return rankings[0]
+
+        scores = {}
+        for ranking in rankings:
+            for rank, chunk_id in enumerate(ranking):
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (_RRF_K + rank + 1)
+        return sorted(scores, key=scores.get, reverse=True)
+
+    def _exclusion_selectors(self):
+        """Selectors hiding deleted ids from the checkpoint and the delta."""
+        if not len(self.deleted_ids):
+            return None, None
+
+        offset = self.index.ntotal
+        if self._selectors is None or self._selectors[0] != offset:
+            base_ids = self.deleted_ids[self.deleted_ids < offset]
+            delta_ids = self.deleted_ids[self.deleted_ids >= offset] - offset
+
+            # Keep the inner batches alive alongside the NOT wrappers
+            batches = [faiss.IDSelectorBatch(base_ids), faiss.IDSelectorBatch(delta_ids)]
+            self._selectors = (
+                offset,
+                batches,
+                faiss.IDSelectorNot(batches[0]) if len(base_ids) else None,
+                faiss.IDSelectorNot(batches[1]) if len(delta_ids) else None,
             )
+        return self._selectors[2], self._selectors[3]
+
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise PermissionError(f"{self.vector_store_path} is opened read-only")
+
+    def _vectors(self) -> np.ndarray:
+        """Every stored vector, memory-mapped."""
+        if self._vector_map is not None:
+            return self._vector_map
+        rows = self.index.ntotal + self.delta_index.ntotal
+        if not rows:
+            return np.empty((0, self.index.d), dtype="float32")
+        return np.memmap(
+            self.vectors_path, dtype="float32", mode="r", shape=(rows, self.index.d)
+        )
+
+    def _checkpoint(self):
+        """Fold the delta into the index file and re-open it mmap'd."""
+        total = self.index.ntotal + self.delta_index.ntotal
+        target_type = resolve_index_type(self.index_type, total)
+
+        if target_type != index_type_of(self.index) or not self.index_path.exists():
+            # (Re)build and train from scratch over every stored vector
+            if total:
+                merged = build_index(target_type, self._vectors())
+            else:
+                merged = faiss.IndexFlatL2(self.index.d)
+        elif self.delta_index.ntotal:
+            # The mmap'd checkpoint is read-only; extend a RAM copy
+            merged = faiss.read_index(str(self.index_path))
+            merged.add(np.ascontiguousarray(self._vectors()[self.index.ntotal:]))
+        else:
+            return
+
+        tmp_path = self.index_path.with_suffix(".tmp")
+        faiss.write_index(merged, str(tmp_path))
+        os.replace(tmp_path, self.index_path)
+
+        self.index = faiss.read_index(str(self.index_path), _MMAP_FLAG)
+        self.delta_index.reset()
+        self.lexical_index.checkpoint()
 
     def _load(self):
-        with open(self.vector_store_path, "rb") as f:
-            data = pickle.load(f)
-            self.index = data["index"]
-            self.text_chunks = data["chunks"]
+        self.index = faiss.read_index(str(self.index_path), _MMAP_FLAG)
+
+        # A store built with a different embedder cannot be searched
+        if self.index.d != self.embedding_client.dimension:
+            if self.read_only:
+                raise ValueError(
+                    f"{self.vector_store_path} holds {self.index.d}-dim vectors, "
+                    f"the embedder produces {self.embedding_client.dimension}"
+                )
+            self._initialize_index()
+            return
+
+        self.delta_index = faiss.IndexFlatL2(self.index.d)
+
+        # Replay appends since the checkpoint, dropping any torn tail
+        row_bytes = self.index.d * 4
+        stored_rows = (
+            self.vectors_path.stat().st_size // row_bytes
+            if self.vectors_path.exists() else 0
+        )
+        rows = min(stored_rows, len(self.text_chunks))
+
+        if not self.read_only:
+            with open(self.vectors_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+            self.text_chunks.truncate(rows)
+            # Chunks stored before metadata existed are padded as unknown
+            self.metadata.resize(rows)
+
+        if self.deleted_path.exists():
+            self.deleted_ids = np.unique(
+                np.fromfile(self.deleted_path, dtype="int64")
+            )
+
+        if rows > self.index.ntotal:
+            delta = np.fromfile(
+                self.vectors_path,
+                dtype="float32",
+                count=(rows - self.index.ntotal) * self.index.d,
+                offset=self.index.ntotal * row_bytes,
+            ).reshape(-1, self.index.d)
+            self.delta_index.add(delta)
+
+        # Re-index chunks past the lexical checkpoint (all of them for a
+        # store created before the lexical index existed)
+        self.lexical_index.sync(self.text_chunks)
+        if self.read_only:
+            return
+        if len(self.lexical_index) - self.lexical_index.num_checkpointed >= self.checkpoint_every:
+            self.lexical_index.checkpoint()
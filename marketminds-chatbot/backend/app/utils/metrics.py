@@ -0,0 +1,253 @@
+"""
+Metrics and timing spans for MarketMinds Chatbot.
+
+A small in-process registry exposed in the Prometheus text format, so
+`/metrics` needs no extra dependency:
+- Counter, Gauge and Histogram series, optionally labelled
+- collectors: callables run at scrape time, for values that already
+  live elsewhere (cache stats, queue depths)
+- `span(stage)`: times a block into the `marketminds_stage_seconds`
+  histogram and, when a request trace is active, into that trace
+
+Recording is a lock-protected add per observation, cheap enough to leave
+on for every request. Traces are carried in a ContextVar, so code that
+hands work to a thread pool must copy the context (see `in_context`).
+"""
+
+import contextvars
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans range from microseconds (routing) to minutes (LLM)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (metric name, type, help, samples); a sample is (labels, value) or
+# (labels, value, name suffix) for histogram series
+Family = Tuple[str, str, str, List[tuple]]
+
+_trace: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "marketminds_trace", default=None
+)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.label_names, key))
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            samples = [(self._labels(k), v) for k, v in self._values.items()]
+        return [(self.name, self.kind, self.help, samples)]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observations."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> List[Family]:
+        with self._lock:
+            snapshot = [(k, list(s[0]), s[1]) for k, s in self._series.items()]
+
+        samples = []
+        for key, counts, total in snapshot:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((
+                    {**labels, "le": _format_value(bound)}, cumulative, "_bucket"
+                ))
+            samples.append((labels, total, "_sum"))
+            samples.append((labels, cumulative, "_count"))
+        return [(self.name, self.kind, self.help, samples)]
+
+
+class Registry:
+    """Metrics and scrape-time collectors, rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]) -> None:
+        """Register a callable returning metric families at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        families: List[Family] = []
+        for metric in self._metrics:
+            families.extend(metric.collect())
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in samples:
+                labels, value = sample[0], sample[1]
+                suffix = sample[2] if len(sample) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "marketminds_stage_seconds",
+    "Time spent in each stage of answering a question.",
+    labels=("stage",),
+)
+
+
+class span:
+    """
+    Time a block as one stage of the current request.
+
+        with span("retrieval"):
+            ...
+
+    Repeated stages within one request add up in its trace.
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        record(self.stage, time.perf_counter() - self._start)
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record an already measured stage duration."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage] = trace.get(stage, 0.0) + seconds
+
+
+def start_trace() -> Dict[str, float]:
+    """Collect the stages of the current request (task / context) into a dict."""
+    trace: Dict[str, float] = {}
+    _trace.set(trace)
+    return trace
+
+
+def in_context(fn: Callable, *args) -> Callable[[], object]:
+    """
+    Bind `fn(*args)` to a copy of the current context, so spans recorded
+    on a pool thread still reach the caller's trace.
+    """
+    context = contextvars.copy_context()
+    return lambda: context.run(fn, *args)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{key}="{_escape(value)}"' for key, value in labels.items()
+    ) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -6,7 +6,7 @@ Handles loading and text extraction from PDF Files.
 """
 
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Tuple
 
 from pypdf import PdfReader
 
@@ -20,12 +20,25 @@ def extract_text_from_pdf(file_path: Path) -> str:
     Returns:
         str: Extracted text from the PDF.
     """
+    pages_text : List[str]=[text for _, text in iter_pdf_pages(file_path)]
+
+    return "\n".join(pages_text)
+
+
+def iter_pdf_pages(file_path: Path) -> Iterator[Tuple[int, str]]:
+    """
+    Lazily extract text from a PDF one page at a time.
+
+    Args:
+        file_path (Path): Path to the PDF file.
+
+    Yields:
+        Tuple[int, str]: 1-based page number and that page's text
+        (pages without text are skipped).
+    """
     reader = PdfReader(str(file_path))
-    pages_text : List[str]=[]
 
-    for page in reader.pages:
+    for page_number, page in enumerate(reader.pages, start=1):
         text = page.extract_text()
         if text:
-            pages_text.append(text)
-
-    return "\n".join(pages_text)
\ No newline at end of file
+            yield page_number, text
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Text utilities for MarketMinds Chatbot.
+
+Provides a compiled multi-pattern matcher (Aho–Corasick) used to find
+every known entity name in a piece of text in a single pass.
+"""
+
+from collections import deque
+from typing import Dict, Generic, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AhoCorasick(Generic[T]):
+    """
+    Aho–Corasick automaton over a fixed set of string patterns.
+
+    Build once with `add` + `build`, then `iter_matches` scans text in
+    O(len(text) + matches) regardless of how many patterns there are.
+    """
+
+    def __init__(self) -> None:
+        # Trie nodes: outgoing edges, failure link, patterns ending here
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, T]]] = [[]]
+        self._built = False
+
+    def __len__(self) -> int:
+        return sum(len(out) for out in self._out)
+
+    def add(self, pattern: str, value: T) -> None:
+        """Register `pattern`; matches report (start, end, value)."""
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), value))
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links (breadth-first over the trie)."""
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+
+                # Inherit matches of the longest proper suffix
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, T]]:
+        """Yield (start, end, value) for every pattern occurrence in `text`."""
+        if not self._built:
+            self.build()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in out[node]:
+                yield i + 1 - length, i + 1, value
@@ -0,0 +1,210 @@
+"""
+Component benchmarks for MarketMinds.
+
+Suites:
+- ingest: DocumentIngestor chunking throughput over synthetic pages
+- retrieval: Retriever.add_documents throughput, cold-open time and
+  retrieve latency (vector, lexical, hybrid and ticker-filtered) at
+  each corpus size
+- resolver: TickerResolver construction and resolve / resolve_all cost
+
+Embeddings come from HashEmbeddingClient, whose own time is reported
+separately and excluded from the add throughput.
+
+Run with:
+    python -m benchmarks.bench_components [--suite ingest retrieval resolver]
+        [--sizes 10000,100000,1000000] [--dim 384] [--out FILE]
+"""
+
+import argparse
+import itertools
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from backend.app.config import config
+from backend.app.data_sources.financial_api import TickerResolver
+from backend.app.rag.index_factory import index_type_of
+from backend.app.rag.ingest import DocumentIngestor
+from backend.app.rag.retriever import Retriever
+from benchmarks.fakes import (
+    TICKERS,
+    HashEmbeddingClient,
+    synthetic_corpus,
+    synthetic_queries,
+    vocabulary,
+)
+from benchmarks.harness import memory, summarize, time_calls, write_report
+
+_RESOLVER_QUESTIONS = [
+    "What is the price of Apple?",
+    "Compare Microsoft and Nvidia stock performance over the last year",
+    "How volatile has TSLA been in the past 6 months?",
+    "What did the annual report say about revenue growth?",
+    "Is Reliance Industries a good buy right now?",
+    "Explain what inflation means for bond yields",
+    "Show me the history of ASML and SAP",
+    "what's the share price of amazn today",
+]
+
+
+def bench_ingest(pages: int = 2_000, repeat: int = 3) -> dict:
+    """Chunking throughput over prose pages with embedded table rows."""
+    rng = np.random.default_rng(0)
+    words = np.array(vocabulary())
+    texts = []
+    for _ in range(pages):
+        sentences = [
+            " ".join(words[np.minimum(rng.zipf(1.2, 18), len(words)) - 1]).capitalize() + "."
+            for _ in range(25)
+        ]
+        table = [
+            f"Revenue   {rng.integers(1e5, 1e6):,}   {rng.integers(1e5, 1e6):,}"
+            for _ in range(5)
+        ]
+        texts.append(" ".join(sentences[:15]) + "\n" + "\n".join(table) + "\n" + " ".join(sentences[15:]))
+    page_stream = list(enumerate(texts, start=1))
+    total_bytes = sum(len(text.encode("utf-8")) for text in texts)
+
+    ingestor = DocumentIngestor()
+    chunks = []
+    samples = time_calls(
+        lambda: chunks.append(sum(1 for _ in ingestor.iter_chunks(page_stream))),
+        repeat=repeat,
+        warmup=1,
+    )
+    best = min(samples)
+    return {
+        "pages": pages,
+        "megabytes": round(total_bytes / 2**20, 2),
+        "chunks": chunks[-1],
+        "latency": summarize(samples),
+        "pages_per_s": round(pages / best, 1),
+        "mb_per_s": round(total_bytes / 2**20 / best, 2),
+        "chunks_per_s": round(chunks[-1] / best, 1),
+        "memory": memory(),
+    }
+
+
+def bench_retrieval(
+    size: int,
+    dimension: int = 384,
+    num_queries: int = 200,
+    batch: int = 10_000,
+    top_k: int = 8,
+) -> dict:
+    """Build a store of `size` chunks, then measure opening and querying it."""
+    texts, metadata = synthetic_corpus(size)
+    queries = synthetic_queries(num_queries)
+    workdir = Path(tempfile.mkdtemp(prefix="marketminds-bench-"))
+
+    try:
+        embedder = HashEmbeddingClient(dimension)
+        retriever = Retriever(embedder, workdir)
+
+        start = time.perf_counter()
+        for i in range(0, size, batch):
+            retriever.add_documents(texts[i:i + batch], metadata[i:i + batch])
+        add_seconds = time.perf_counter() - start - embedder.seconds
+        del texts, metadata
+
+        # Cold open of the persisted store (what a restart pays)
+        del retriever
+        start = time.perf_counter()
+        retriever = Retriever(HashEmbeddingClient(dimension), workdir)
+        open_seconds = time.perf_counter() - start
+
+        results = {
+            "chunks": size,
+            "dimension": dimension,
+            "index_type": index_type_of(retriever.index),
+            "add_chunks_per_s": round(size / max(add_seconds, 1e-9), 1),
+            "open_s": round(open_seconds, 3),
+            "store_mb": round(
+                sum(p.stat().st_size for p in workdir.iterdir()) / 2**20, 1
+            ),
+        }
+
+        for mode in ("vector", "lexical", "hybrid"):
+            retriever.retrieval_mode = mode
+            results[f"retrieve_{mode}"] = _query_latency(retriever, queries, top_k)
+
+        retriever.retrieval_mode = config.RETRIEVAL_MODE
+        results["retrieve_filtered_ticker"] = _query_latency(
+            retriever, queries, top_k, filters={"ticker": TICKERS[0]}
+        )
+        results["memory"] = memory()
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_resolver(repeat: int = 2_000) -> dict:
+    start = time.perf_counter()
+    resolver = TickerResolver()
+    init_seconds = time.perf_counter() - start
+
+    questions = itertools.cycle(_RESOLVER_QUESTIONS)
+
+    return {
+        "init_s": round(init_seconds, 4),
+        "resolve": summarize(
+            time_calls(lambda: resolver.resolve(next(questions)), repeat)
+        ),
+        "resolve_all": summarize(
+            time_calls(lambda: resolver.resolve_all(next(questions)), repeat)
+        ),
+        "memory": memory(),
+    }
+
+
+def _query_latency(
+    retriever: Retriever, queries: List[str], top_k: int, filters: Optional[dict] = None
+) -> dict:
+    """Per-query retrieve latency, with the embedding stand-in excluded."""
+    embedder = retriever.embedding_client
+    samples = []
+    for query in queries:
+        embedded = embedder.seconds
+        start = time.perf_counter()
+        retriever.retrieve(query, top_k=top_k, filters=filters)
+        samples.append(time.perf_counter() - start - (embedder.seconds - embedded))
+    return summarize(samples)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="MarketMinds component benchmarks.")
+    parser.add_argument(
+        "--suite", nargs="+", default=["ingest", "retrieval", "resolver"],
+        choices=["ingest", "retrieval", "resolver"],
+    )
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="Comma-separated corpus sizes for the retrieval suite.")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2_000)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = {}
+    if "ingest" in args.suite:
+        results["ingest"] = bench_ingest(args.pages)
+    if "resolver" in args.suite:
+        results["resolver"] = bench_resolver()
+    if "retrieval" in args.suite:
+        results["retrieval"] = {
+            str(size): bench_retrieval(size, args.dim, args.queries) for size in sizes
+        }
+
+    params = {**vars(args), "out": str(args.out) if args.out else None, "sizes": sizes}
+    path = write_report("components", params, results, args.out)
+    print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
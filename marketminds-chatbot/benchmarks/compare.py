@@ -0,0 +1,107 @@
+"""
+Compare two benchmark reports.
+
+Every numeric measurement present in both reports is paired by its path
+("retrieval.100000.retrieve_hybrid.p95_ms"). Latencies (`*_ms`, `*_s`)
+and memory (`*_mb`) regress when they grow, throughputs (`*_per_s`,
+`*_rps`) when they shrink. Changes beyond the threshold are flagged, and
+the exit status is 1 when any measurement regressed, so the script can
+gate CI.
+
+Run with:
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_HIGHER_IS_BETTER = ("_per_s", "_rps")
+_LOWER_IS_BETTER = ("_ms", "_s", "_mb")
+
+
+def flatten(node, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """(dotted path, value) for every numeric leaf; lists are indexed."""
+    if isinstance(node, dict):
+        items = node.items()
+    elif isinstance(node, list):
+        items = enumerate(node)
+    else:
+        if isinstance(node, (int, float)) and not isinstance(node, bool):
+            yield prefix, float(node)
+        return
+
+    for key, value in items:
+        yield from flatten(value, f"{prefix}.{key}" if prefix else str(key))
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> List[dict]:
+    """
+    Relative change of every comparable measurement.
+
+    Returns:
+        List[dict]: path, both values, relative change and whether it
+        is a regression or an improvement beyond `threshold`.
+    """
+    before: Dict[str, float] = dict(flatten(baseline.get("results", {})))
+    rows = []
+    for path, new in flatten(candidate.get("results", {})):
+        old = before.get(path)
+        direction = _direction(path)
+        if old is None or direction is None or old == 0:
+            continue
+
+        change = (new - old) / abs(old)
+        worse = change * direction < 0
+        rows.append({
+            "path": path,
+            "baseline": old,
+            "candidate": new,
+            "change": round(change, 4),
+            "status": (
+                ("regression" if worse else "improvement")
+                if abs(change) > threshold else "unchanged"
+            ),
+        })
+    return rows
+
+
+def _direction(path: str) -> Optional[int]:
+    """+1 when higher is better, -1 when lower is better, None otherwise."""
+    if path.endswith(_HIGHER_IS_BETTER):
+        return 1
+    if path.endswith(_LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change treated as significant (0.1 = 10%%).")
+    parser.add_argument("--all", action="store_true", help="Also list unchanged rows.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')} ({len(rows)} measurements)")
+    for row in rows:
+        if args.all or row["status"] != "unchanged":
+            print(
+                f"{row['status']:>11}  {row['change']:+8.1%}  {row['path']}: "
+                f"{row['baseline']:g} -> {row['candidate']:g}"
+            )
+
+    return 1 if any(row["status"] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
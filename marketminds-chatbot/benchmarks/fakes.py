@@ -0,0 +1,183 @@
+"""
+Local stand-ins for the benchmarks.
+
+Nothing here touches the network or loads a model, so runs are
+repeatable and measure MarketMinds itself:
+- FakeLLMClient: answers after a scripted latency, optionally streamed
+- HashEmbeddingClient: deterministic pseudo-random unit vectors of any
+  dimension, at roughly the cost of a hash per text
+- synthetic_corpus: chunk texts with Zipf-distributed vocabulary and
+  ticker / fiscal-year metadata
+- write_replay_quotes: a quote file for ReplayProvider
+"""
+
+import asyncio
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.app.llm.llm_client import LLMClient
+from backend.app.rag.embeddings import EmbeddingClient
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "COST", "NFLX"]
+YEARS = [2020, 2021, 2022, 2023, 2024]
+
+_FINANCE_WORDS = (
+    "revenue income margin growth guidance dividend buyback cash flow debt "
+    "segment services hardware cloud advertising subscription inventory "
+    "supply chain capital expenditure research development risk outlook "
+    "quarter fiscal year operating expenses net sales gross profit"
+).split()
+
+
+class FakeLLMClient(LLMClient):
+    """
+    LLM stand-in with scripted latency.
+
+    Each call takes `latency` seconds plus uniform jitter; streaming
+    spreads that time over `tokens` fragments.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.0,
+        tokens: int = 40,
+        seed: int = 0,
+    ) -> None:
+        super().__init__(model_name="fake")
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens = max(tokens, 1)
+        self._rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    def generate(self, prompt: str, context: Optional[str] = None) -> str:
+        time.sleep(self._delay())
+        return self._answer()
+
+    def generate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> Iterator[str]:
+        step = self._delay() / self.tokens
+        for token in self._tokens():
+            time.sleep(step)
+            yield token
+
+    async def agenerate(self, prompt: str, context: Optional[str] = None) -> str:
+        await asyncio.sleep(self._delay())
+        return self._answer()
+
+    async def agenerate_stream(
+        self, prompt: str, context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        step = self._delay() / self.tokens
+        for token in self._tokens():
+            await asyncio.sleep(step)
+            yield token
+
+    def _delay(self) -> float:
+        self.calls += 1
+        return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _tokens(self) -> List[str]:
+        return [f"token{i} " for i in range(self.tokens)]
+
+    def _answer(self) -> str:
+        return "".join(self._tokens())
+
+
+class HashEmbeddingClient(EmbeddingClient):
+    """
+    Deterministic unit vectors seeded by a CRC of the text.
+
+    `seconds` accumulates time spent embedding, so callers can subtract
+    the stand-in's own cost from what they measure.
+    """
+
+    model_id = "hash"
+
+    def __init__(self, dimension: int = 384) -> None:
+        self.dimension = dimension
+        self.seconds = 0.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        out = np.empty((len(texts), self.dimension), dtype="float32")
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+            out[i] = rng.standard_normal(self.dimension, dtype="float32")
+        out /= np.linalg.norm(out, axis=1, keepdims=True)
+        self.seconds += time.perf_counter() - start
+        return out
+
+
+def vocabulary(size: int = 20_000) -> List[str]:
+    """Finance words first (most frequent under Zipf), then filler terms."""
+    return _FINANCE_WORDS + [f"term{i}" for i in range(size - len(_FINANCE_WORDS))]
+
+
+def synthetic_corpus(
+    num_chunks: int,
+    words_per_chunk: int = 60,
+    seed: int = 0,
+) -> Tuple[List[str], List[dict]]:
+    """
+    Chunk texts and metadata for a store of `num_chunks` chunks.
+
+    Chunks are grouped by company and year the way a directory of
+    filings would be ingested, one ticker and year per source file.
+
+    Returns:
+        Tuple[List[str], List[dict]]: texts and per-chunk metadata.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(vocabulary())
+    ranks = np.minimum(rng.zipf(1.2, size=(num_chunks, words_per_chunk)), len(words)) - 1
+
+    files = len(TICKERS) * len(YEARS)
+    per_file = -(-num_chunks // files)
+
+    texts, metadata = [], []
+    for i in range(num_chunks):
+        file_no = i // per_file
+        ticker = TICKERS[file_no % len(TICKERS)]
+        year = YEARS[file_no // len(TICKERS) % len(YEARS)]
+        texts.append(f"{ticker} FY{year} " + " ".join(words[ranks[i]]))
+        metadata.append({
+            "source": f"{ticker}_10-K_{year}.pdf",
+            "ticker": ticker,
+            "page": (i % per_file) // 4 + 1,
+            "year": year,
+        })
+    return texts, metadata
+
+
+def synthetic_queries(count: int, seed: int = 1) -> List[str]:
+    rng = np.random.default_rng(seed)
+    words = vocabulary()
+    return [
+        " ".join(rng.choice(words[:2000], size=4)) + f" {TICKERS[i % len(TICKERS)]}"
+        for i in range(count)
+    ]
+
+
+def write_replay_quotes(path: Path, tickers: Sequence[str] = TICKERS) -> Path:
+    """Recorded quotes for ReplayProvider, one per ticker."""
+    quotes = {
+        ticker: {
+            "ticker": ticker,
+            "price": round(100.0 + 10 * i, 2),
+            "currency": "USD",
+            "timestamp": "2024-01-02T15:30:00Z",
+        }
+        for i, ticker in enumerate(tickers)
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(quotes, f)
+    return path
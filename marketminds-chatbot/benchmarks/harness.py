@@ -0,0 +1,134 @@
+"""
+Measurement helpers shared by the MarketMinds benchmarks.
+
+- latency samples are summarised as count / mean / p50 / p95 / p99 / max
+  in milliseconds
+- memory is reported as current and peak RSS of this process, read from
+  the OS (no extra dependency)
+- every run is written as one JSON report tagged with the git commit, so
+  reports from two commits can be diffed with `benchmarks.compare`
+"""
+
+import json
+import mmap
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+
+
+def summarize(samples: Iterable[float]) -> dict:
+    """
+    Latency summary of `samples` (seconds).
+
+    Returns:
+        dict: count, mean, p50, p95, p99 and max, in milliseconds.
+    """
+    values = np.asarray(list(samples), dtype="float64") * 1000
+    if not len(values):
+        return {"count": 0}
+
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int, warmup: int = 3) -> List[float]:
+    """Wall-clock seconds of `repeat` calls to `fn`, after `warmup` calls."""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size in MiB (None where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return round(pages * mmap.PAGESIZE / 2**20, 1)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def memory() -> dict:
+    return {"rss_mb": rss_mb(), "peak_rss_mb": peak_rss_mb()}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(name: str, params: dict, results: dict, out: Optional[Path]) -> Path:
+    """
+    Write a benchmark report as JSON.
+
+    Args:
+        name (str): Benchmark name ("components", "load").
+        params (dict): Arguments the run was made with.
+        results (dict): Measurements.
+        out (Optional[Path]): Output file; defaults to
+            `benchmarks/results/<name>-<commit>.json`.
+
+    Returns:
+        Path: where the report was written.
+    """
+    commit = git_commit()
+    report = {
+        "benchmark": name,
+        "commit": commit,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+
+    if out is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"{name}-{commit or 'local'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return out
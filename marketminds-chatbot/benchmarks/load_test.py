@@ -0,0 +1,280 @@
+"""
+Load test for the MarketMinds `/ask` endpoints.
+
+By default the FastAPI app is started in-process with local stand-ins:
+- FakeLLMClient with scripted latency instead of Ollama, behind the
+  app's own LLM scheduler
+- ReplayProvider with a fixed per-request delay instead of live quotes
+- a synthetic document store embedded with HashEmbeddingClient
+
+so the run measures routing, retrieval, caching and the HTTP layer under
+concurrency, not a model or the network. With `--url` the load is sent
+to an already running server instead (no stand-ins, no server RSS).
+
+For each concurrency level a fixed number of questions is sent by that
+many concurrent clients, each with its own X-Client-Id; results report
+throughput, latency percentiles (and time to first token with
+`--stream`), status codes (429 / 503 when load is shed) and server RSS.
+
+Run with:
+    python -m benchmarks.load_test [--concurrency 1,8,32] [--requests 500]
+        [--llm-latency 0.2] [--quote-latency 0.05] [--stream] [--out FILE]
+"""
+
+import argparse
+import asyncio
+import itertools
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+import numpy as np
+
+from backend.app.config import config
+from benchmarks.fakes import (
+    TICKERS,
+    YEARS,
+    FakeLLMClient,
+    HashEmbeddingClient,
+    synthetic_corpus,
+    write_replay_quotes,
+)
+from benchmarks.harness import memory, summarize, write_report
+
+_QUESTION_KINDS = ("live", "document", "mixed", "general")
+
+
+def question_pool(size: int, mix: dict, seed: int = 0) -> List[str]:
+    """
+    Questions drawn by kind according to `mix` (kind -> weight).
+
+    A finite pool makes repeats (and so cache hits) as likely as they
+    are for a real audience asking about the same few companies.
+    """
+    rng = np.random.default_rng(seed)
+    kinds = list(mix)
+    weights = np.array([mix[kind] for kind in kinds], dtype="float64")
+    topics = ["revenue growth", "margins", "buybacks", "supply chain", "guidance", "risks"]
+
+    questions = []
+    for i in range(size):
+        kind = kinds[rng.choice(len(kinds), p=weights / weights.sum())]
+        ticker = TICKERS[rng.integers(len(TICKERS))]
+        year = YEARS[rng.integers(len(YEARS))]
+        topic = topics[rng.integers(len(topics))]
+        if kind == "live":
+            questions.append(f"What is the price of {ticker}?")
+        elif kind == "document":
+            questions.append(f"What did the {ticker} FY{year} report say about {topic}?")
+        elif kind == "mixed":
+            questions.append(
+                f"What did the {ticker} report say about {topic} and where is the stock now?"
+            )
+        else:
+            questions.append(f"Explain {topic} for an investor, case {i}")
+    return questions
+
+
+def start_local_server(args) -> tuple:
+    """
+    Start the app in a background thread with local stand-ins.
+
+    Returns:
+        tuple: (base url, uvicorn server, temp dir)
+    """
+    import uvicorn
+
+    workdir = Path(tempfile.mkdtemp(prefix="marketminds-load-"))
+    config.PRICE_STORE_DIR = workdir / "prices"
+    config.MAX_INFLIGHT_REQUESTS = args.max_inflight or config.MAX_INFLIGHT_REQUESTS
+    config.LLM_MAX_CONCURRENCY = args.llm_concurrency or config.LLM_MAX_CONCURRENCY
+
+    # Imported late so the settings above are seen by module defaults
+    import backend.app.main as server
+    from backend.app.chatbot.answer_cache import AnswerCache
+    from backend.app.data_sources.financial_api import MarketDataClient
+    from backend.app.data_sources.price_store import PriceStore
+    from backend.app.data_sources.providers import ReplayProvider
+    from backend.app.data_sources.quote_cache import QuoteCache
+    from backend.app.rag.retriever import Retriever
+
+    builder = server.response_builder
+    server.llm_scheduler.client = FakeLLMClient(
+        args.llm_latency, args.llm_jitter, args.llm_tokens
+    )
+
+    provider = ReplayProvider(
+        write_replay_quotes(workdir / "quotes.json"), latency=args.quote_latency
+    )
+    cache = None
+    if args.no_cache:
+        cache = QuoteCache(provider.get_quote, provider.get_quotes, ttls={"": 0.0}, stale_ttl=0.0)
+        builder.answer_cache = AnswerCache(max_entries=0)
+    builder.market_client = MarketDataClient(
+        provider=provider, cache=cache, history=PriceStore(workdir / "prices")
+    )
+
+    retriever = Retriever(HashEmbeddingClient(args.dim), workdir / "store")
+    texts, metadata = synthetic_corpus(args.chunks)
+    for i in range(0, len(texts), 10_000):
+        retriever.add_documents(texts[i:i + 10_000], metadata[i:i + 10_000])
+
+    # The store is ready; skip the startup load
+    builder.load_documents = lambda: None
+    builder.retriever = retriever
+    builder.answer_cache.embedding_client = retriever.embedding_client
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    uvicorn_server = uvicorn.Server(
+        uvicorn.Config(server.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=uvicorn_server.run, daemon=True).start()
+    while not uvicorn_server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", uvicorn_server, workdir
+
+
+async def run_level(
+    base_url: str,
+    questions: List[str],
+    concurrency: int,
+    total: int,
+    stream: bool,
+    timeout: float,
+) -> dict:
+    """Send `total` questions from `concurrency` concurrent clients."""
+    pending = itertools.islice(itertools.cycle(questions), total)
+    latencies, first_tokens = [], []
+    statuses: Counter = Counter()
+
+    async def worker(number: int):
+        # One connection per simulated client: a shared pool serialises
+        # the clients on its own bookkeeping at high concurrency
+        async with httpx.AsyncClient(
+            base_url=base_url, timeout=timeout, headers={"X-Client-Id": f"load-{number}"}
+        ) as client:
+            for question in pending:
+                start = time.perf_counter()
+                try:
+                    if stream:
+                        status = await _ask_stream(client, question, start, first_tokens)
+                    else:
+                        response = await client.post("/ask", json={"question": question})
+                        status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                statuses[str(status)] += 1
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        stats = await client.get("/stats")
+
+    results = {
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "statuses": dict(statuses),
+        "latency": summarize(latencies),
+        "server_stats": stats.json() if stats.status_code == 200 else None,
+    }
+    if stream:
+        results["time_to_first_token"] = summarize(first_tokens)
+    return results
+
+
+async def _ask_stream(client: httpx.AsyncClient, question: str, start: float, first_tokens: list):
+    async with client.stream("POST", "/ask/stream", json={"question": question}) as response:
+        if response.status_code != 200:
+            return response.status_code
+        first = True
+        async for _ in response.aiter_lines():
+            if first:
+                first_tokens.append(time.perf_counter() - start)
+                first = False
+    return 200
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load test the /ask endpoints.")
+    parser.add_argument("--url", default=None,
+                        help="Target a running server instead of an in-process one.")
+    parser.add_argument("--concurrency", default="1,8,32",
+                        help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=500,
+                        help="Requests per concurrency level.")
+    parser.add_argument("--mix", default="live=0.35,document=0.35,mixed=0.1,general=0.2",
+                        help=f"Question mix, weights by kind ({', '.join(_QUESTION_KINDS)}).")
+    parser.add_argument("--pool", type=int, default=200,
+                        help="Distinct questions to draw from.")
+    parser.add_argument("--stream", action="store_true", help="Use /ask/stream.")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-jitter", type=float, default=0.05)
+    parser.add_argument("--llm-tokens", type=int, default=40)
+    parser.add_argument("--quote-latency", type=float, default=0.05)
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the answer and quote caches.")
+    parser.add_argument("--max-inflight", type=int, default=None)
+    parser.add_argument("--llm-concurrency", type=int, default=None,
+                        help="Generations the LLM scheduler runs at once.")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    mix = {}
+    for part in args.mix.split(","):
+        kind, weight = part.split("=")
+        if kind not in _QUESTION_KINDS:
+            parser.error(f"unknown question kind: {kind}")
+        mix[kind] = float(weight)
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+
+    server = workdir = None
+    base_url = args.url
+    if base_url is None:
+        base_url, server, workdir = start_local_server(args)
+
+    questions = question_pool(args.pool, mix)
+    results = {}
+    try:
+        for level in levels:
+            result = asyncio.run(
+                run_level(base_url, questions, level, args.requests, args.stream, args.timeout)
+            )
+            # Server RSS is only known when the server runs in this process
+            result["memory"] = memory() if server is not None else None
+            # Keyed by concurrency, so reports compare level by level
+            results[str(level)] = result
+            print(
+                f"concurrency={level} rps={result['throughput_rps']} "
+                f"p50={result['latency'].get('p50_ms')}ms "
+                f"p99={result['latency'].get('p99_ms')}ms statuses={result['statuses']}"
+            )
+    finally:
+        if server is not None:
+            server.should_exit = True
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    params = {**vars(args), "out": str(args.out) if args.out else None, "mix": mix}
+    path = write_report("load", params, results, args.out)
+    print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ async function sendQuestion() {
     input.value = "";
 
     try {
-        const response = await fetch("/ask", {
+        const response = await fetch("/ask/stream", {
             method: "POST",
             headers: {
                 "Content-Type": "application/json"
@@ -22,8 +22,30 @@ async function sendQuestion() {
             return;
         }
 
-        const data = await response.json();
-        addMessage(data.answer, "bot");
+        // Render tokens as they arrive (newline-delimited JSON)
+        const message = addMessage("", "bot");
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        let answer = "";
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split("\n");
+            buffer = lines.pop();
+
+            for (const line of lines) {
+                if (!line) continue;
+                const event = JSON.parse(line);
+                if (event.token) {
+                    answer += event.token;
+                    setMessageText(message, answer);
+                }
+            }
+        }
 
     } catch (err) {
         addMessage("Failed to reach backend.", "bot");
@@ -43,8 +65,14 @@ function addMessage(text, role) {
     const chat = document.getElementById("chat");
     const div = document.createElement("div");
     div.className = `message ${role}`;
-    div.innerHTML = text.replace(/\n/g, "<br>");
     chat.appendChild(div);
+    setMessageText(div, text);
+    return div;
+}
+
+function setMessageText(div, text) {
+    const chat = document.getElementById("chat");
+    div.innerHTML = text.replace(/\n/g, "<br>");
 
     //️// Auto-scroll to bottom
     chat.scrollTop = chat.scrollHeight;
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the app as `backend.app...`, as it runs from this directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
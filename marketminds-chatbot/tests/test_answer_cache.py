@@ -0,0 +1,69 @@
+from backend.app.chatbot.answer_cache import AnswerCache
+from benchmarks.fakes import HashEmbeddingClient
+
+
+class CountingEmbeddingClient(HashEmbeddingClient):
+    """Embeds every question to the same vector and counts the calls."""
+
+    def __init__(self):
+        super().__init__(8)
+        self.texts = []
+
+    def embed(self, texts):
+        self.texts.extend(texts)
+        return super().embed(["same"] * len(texts))
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    embedder = CountingEmbeddingClient()
+    clock = Clock()
+    cache = AnswerCache(
+        max_entries=kwargs.pop("max_entries", 10),
+        ttl=60.0,
+        similarity_threshold=kwargs.pop("similarity_threshold", 0.9),
+        embedding_client=embedder,
+        clock=clock,
+    )
+    return cache, embedder, clock
+
+
+def test_exact_hit_normalises_the_question_and_expires():
+    cache, _, clock = make_cache(similarity_threshold=None)
+    cache.put(cache.key("What is revenue?", "document", [1, 2]), "answer")
+
+    assert cache.get(cache.key("  what is REVENUE ", "document", [1, 2])) == "answer"
+    assert cache.get(cache.key("what is revenue", "document", [3])) is None
+
+    clock.now = 61.0
+    assert cache.get(cache.key("what is revenue", "document", [1, 2])) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_near_duplicate_needs_the_same_route_and_chunks():
+    cache, _, _ = make_cache()
+    cache.put(cache.key("what is revenue", "document", [1]), "answer")
+
+    assert cache.get(cache.key("how much revenue", "document", [1])) == "answer"
+    assert cache.get(cache.key("how much revenue", "general", [1])) is None
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_question_is_embedded_once_per_miss():
+    cache, embedder, _ = make_cache(similarity_threshold=1.5)
+    cache.put(cache.key("what is revenue", "document", [1]), "first")
+    embedder.texts.clear()
+
+    key = cache.key("how much revenue", "document", [1])
+    assert cache.get(key) is None
+    cache.put(key, "second")
+
+    assert embedder.texts == ["how much revenue"]
+    assert cache.get(key) == "second"
@@ -0,0 +1,47 @@
+from backend.app.llm.context_budget import ContextAssembler, estimate_tokens
+
+
+def paragraph(topic, words=40):
+    return " ".join(f"{topic}{i}" for i in range(words))
+
+
+def test_chunks_are_kept_in_rank_order_within_the_budget():
+    chunks = [(i, paragraph(f"t{i}x")) for i in range(0, 20, 2)]
+    assembler = ContextAssembler(max_tokens=300, min_fragment_tokens=1_000)
+
+    context, ids = assembler.assemble(chunks)
+    assert ids == [chunk_id for chunk_id, _ in chunks[: len(ids)]]
+    assert 0 < len(ids) < len(chunks)
+    assert estimate_tokens(context) <= 300
+
+
+def test_last_chunk_is_cut_on_a_word_boundary_to_fill_the_budget():
+    first, second = paragraph("alpha"), paragraph("beta", 200)
+    assembler = ContextAssembler(max_tokens=200, min_fragment_tokens=16)
+
+    context, ids = assembler.assemble([(0, first), (5, second)])
+    assert ids == [0, 5]
+    assert context.endswith("…")
+    fragment = context.split("\n\n")[1][2:-1]
+    assert second.startswith(fragment) and second[len(fragment)] == " "
+    assert estimate_tokens(context) <= 200
+
+    # Too little room left for a useful fragment: the chunk is skipped
+    assembler = ContextAssembler(max_tokens=200, min_fragment_tokens=150)
+    assert assembler.assemble([(0, first), (5, second)])[1] == [0]
+
+
+def test_near_duplicates_are_dropped_and_overlap_is_trimmed():
+    text = paragraph("rev")
+    overlap = " ".join(text.split()[-10:])
+    follow_on = overlap + " " + paragraph("cash", 10)
+    assembler = ContextAssembler(max_tokens=1_000)
+
+    context, ids = assembler.assemble([
+        (3, text),
+        (9, "  " + text.upper() + "  "),
+        (4, follow_on),
+        (7, "   "),
+    ])
+    assert ids == [3, 4]
+    assert context == f"- {text}\n\n- {paragraph('cash', 10)}"
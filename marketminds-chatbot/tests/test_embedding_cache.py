@@ -0,0 +1,81 @@
+import numpy as np
+
+from backend.app.rag import embedding_cache
+from backend.app.rag.embedding_cache import CachedEmbeddingClient
+from benchmarks.fakes import HashEmbeddingClient
+
+
+class QueryAwareClient(HashEmbeddingClient):
+    """Marks query vectors so callers can tell which method was used."""
+
+    def embed_query(self, text):
+        return -self.embed([text])
+
+
+def test_vectors_are_shared_between_processes(tmp_path):
+    inner = HashEmbeddingClient(8)
+    a = CachedEmbeddingClient(inner, tmp_path, max_memory_entries=1)
+    b = CachedEmbeddingClient(inner, tmp_path, max_memory_entries=1)
+
+    alpha = a.embed(["alpha"])
+    assert np.allclose(b.embed(["alpha", "beta"])[0], alpha[0])
+    assert b.stats()["disk_hits"] == 1
+
+    reader = CachedEmbeddingClient(inner, tmp_path, read_only=True)
+    assert reader.stats()["disk_entries"] == 2
+
+
+def test_store_is_reread_once_per_batch(tmp_path, monkeypatch):
+    inner = HashEmbeddingClient(8)
+    writer = CachedEmbeddingClient(inner, tmp_path)
+    reader = CachedEmbeddingClient(inner, tmp_path)
+    writer.embed(["alpha"])
+
+    calls = []
+    read_new_rows = CachedEmbeddingClient._read_new_rows
+    monkeypatch.setattr(
+        CachedEmbeddingClient,
+        "_read_new_rows",
+        lambda self: calls.append(1) or read_new_rows(self),
+    )
+    reader.embed(["alpha"] + [f"text {i}" for i in range(50)])
+    assert reader.stats()["disk_hits"] == 1
+    # One re-read for the misses, one under the lock before appending
+    assert len(calls) == 2
+
+
+def test_append_drops_a_torn_tail_left_by_another_writer(tmp_path):
+    inner = HashEmbeddingClient(8)
+    a = CachedEmbeddingClient(inner, tmp_path)
+    b = CachedEmbeddingClient(inner, tmp_path)
+    a.embed(["alpha"])
+
+    # A writer crashed after writing half a vector
+    with open(a._vectors_path, "ab") as f:
+        f.write(b"\0" * 12)
+
+    b.embed(["beta"])
+    fresh = CachedEmbeddingClient(inner, tmp_path, max_memory_entries=1)
+    assert np.allclose(fresh.embed(["alpha"]), inner.embed(["alpha"]))
+    assert np.allclose(fresh.embed(["beta"]), inner.embed(["beta"]))
+    assert fresh.stats()["disk_hits"] == 2
+    assert a._vectors_path.stat().st_size == 2 * 8 * 4
+    assert a._keys_path.stat().st_size == 2 * embedding_cache._DIGEST_SIZE
+
+
+def test_query_miss_uses_inner_embed_query_and_stays_in_memory(tmp_path):
+    inner = QueryAwareClient(8)
+    client = CachedEmbeddingClient(inner, tmp_path)
+
+    vector = client.embed_query("what is revenue?")
+    assert vector.shape == (1, 8)
+    assert np.allclose(vector, inner.embed_query("what is revenue?"))
+    assert np.allclose(client.embed_query("what is  revenue?"), vector)
+    assert client.stats() == {
+        "hits": 1,
+        "disk_hits": 0,
+        "misses": 1,
+        "hit_rate": 0.5,
+        "memory_entries": 1,
+        "disk_entries": 0,
+    }
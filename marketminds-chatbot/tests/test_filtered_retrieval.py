@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from backend.app.config import config
+from backend.app.rag.chunk_metadata import ChunkMetadata
+from backend.app.rag.index_factory import index_type_of
+from backend.app.rag.retriever import Retriever
+from benchmarks.fakes import HashEmbeddingClient, synthetic_corpus
+
+DIMENSION = 16
+QUERY = "AAPL revenue growth guidance"
+
+
+# --------------------------------------------------
+# ChunkMetadata.match
+# --------------------------------------------------
+
+ROWS = [
+    {"source": "a.pdf", "ticker": "AAPL", "page": 1, "year": 2023},
+    {"source": "a.pdf", "ticker": "AAPL", "page": 2, "year": 2023},
+    {"source": "m.pdf", "ticker": "MSFT", "page": 1, "year": 2024},
+    None,
+    {"source": "b.pdf", "ticker": "AAPL", "page": 9, "year": 2024},
+    {"source": "m.pdf", "ticker": "MSFT", "year": 2023},
+]
+
+
+@pytest.fixture
+def metadata(tmp_path):
+    table = ChunkMetadata(tmp_path)
+    table.extend(ROWS)
+    return table
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({}, [0, 1, 2, 3, 4, 5]),
+    ({"tickers": ["AAPL"]}, [0, 1, 4]),
+    ({"tickers": ["AAPL", "MSFT"], "years": [2023]}, [0, 1, 5]),
+    ({"sources": ["m.pdf"], "years": [2024]}, [2]),
+    ({"tickers": ["AAPL"], "pages": (1, 2)}, [0, 1]),
+    ({"pages": (1, 1)}, [0, 2]),
+    ({"tickers": ["ZZZZ"]}, []),
+    ({"tickers": ["ZZZZ"], "years": [2023]}, []),
+    ({"years": []}, []),
+])
+def test_match(metadata, filters, expected):
+    ids = metadata.match(**filters)
+    assert ids.dtype == np.int64
+    assert ids.tolist() == expected
+
+
+def test_match_from_saved_partitions(metadata, tmp_path):
+    metadata.save_partitions(tmp_path)
+    reopened = ChunkMetadata(tmp_path, read_only=True)
+    assert reopened.match(tickers=["AAPL"], years=[2024]).tolist() == [4]
+    assert reopened[3] == {"source": None, "ticker": None, "page": None, "year": None}
+
+
+# --------------------------------------------------
+# Retriever.search with filters
+# --------------------------------------------------
+
+@pytest.fixture(scope="module", params=["flat", "ivf_flat", "hnsw", "ivf_pq"])
+def store(request, tmp_path_factory):
+    index_type = request.param
+    size = 11_200 if index_type == "ivf_pq" else 2_400
+    texts, metadata = synthetic_corpus(size)
+    retriever = Retriever(
+        HashEmbeddingClient(DIMENSION),
+        tmp_path_factory.mktemp(index_type),
+        index_type=index_type,
+        retrieval_mode="vector",
+    )
+    # Most of the corpus in the checkpoint, the rest in the delta
+    split = size * 9 // 10
+    retriever.add_documents(texts[:split], metadata[:split])
+    retriever.checkpoint()
+    retriever.add_documents(texts[split:], metadata[split:])
+    assert index_type_of(retriever.index) == index_type
+    assert retriever.delta_index.ntotal == size - split
+    return retriever
+
+
+def check(store, results, **expected):
+    assert results
+    for chunk_id, text in results:
+        assert store.text_chunks[chunk_id] == text
+        meta = store.metadata[chunk_id]
+        for key, values in expected.items():
+            assert meta[key] in values
+
+
+@pytest.mark.parametrize("exact_scan_max", [0, 50_000])
+def test_filters_restrict_results(store, monkeypatch, exact_scan_max):
+    # 0 forces the FAISS selector path; the default scans the subset
+    monkeypatch.setattr(config, "FILTER_EXACT_SCAN_MAX", exact_scan_max)
+    options = dict(top_k=8, nprobe=64, ef_search=256)
+
+    check(store, store.search(QUERY, filters={"ticker": "MSFT"}, **options), ticker={"MSFT"})
+    check(
+        store,
+        store.search(QUERY, filters={"ticker": ["AAPL", "NVDA"], "year": 2024}, **options),
+        ticker={"AAPL", "NVDA"}, year={2024},
+    )
+    # Only chunks in the delta
+    last = store.metadata[len(store.text_chunks) - 1]
+    check(
+        store,
+        store.search(QUERY, filters={"ticker": last["ticker"], "year": last["year"]}, **options),
+        ticker={last["ticker"]}, year={last["year"]},
+    )
+    assert store.search(QUERY, filters={"ticker": "ZZZZ"}, **options) == []
+
+
+def test_exact_scan_matches_brute_force(store):
+    allowed = store._filter_ids({"ticker": "AAPL"})
+    query = store.embedding_client.embed_query(QUERY)[0]
+    distances = ((store._vectors()[allowed] - query) ** 2).sum(axis=1)
+    expected = allowed[np.argsort(distances, kind="stable")[:5]].tolist()
+
+    results = store.search(QUERY, top_k=5, filters={"ticker": "AAPL"})
+    assert [chunk_id for chunk_id, _ in results] == expected
+
+
+def test_removed_chunks_are_filtered_out(store, monkeypatch):
+    monkeypatch.setattr(config, "FILTER_EXACT_SCAN_MAX", 0)
+    filters = {"ticker": "TSLA"}
+    first = [chunk_id for chunk_id, _ in store.search(QUERY, top_k=3, filters=filters, nprobe=64)]
+    store.remove_chunks(first)
+    again = [chunk_id for chunk_id, _ in store.search(QUERY, top_k=3, filters=filters, nprobe=64)]
+    assert again and not set(first) & set(again)
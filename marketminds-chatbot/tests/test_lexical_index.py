@@ -0,0 +1,73 @@
+import json
+import os
+
+import pytest
+
+from backend.app.rag.lexical_index import LexicalIndex
+from benchmarks.fakes import synthetic_corpus
+
+QUERY = "AAPL revenue guidance naïve"
+
+
+@pytest.fixture
+def corpus():
+    texts, _ = synthetic_corpus(1_500)
+    return texts + ["naïve café AAPL"]
+
+
+def test_checkpoint_keeps_rankings(tmp_path, corpus):
+    index = LexicalIndex(tmp_path)
+    index.add(corpus[:1_000])
+    index.checkpoint()
+    index.add(corpus[1_000:])
+    before = index.search(QUERY, 5)
+
+    index.checkpoint()
+    assert index.search(QUERY, 5) == before
+    assert LexicalIndex(tmp_path).search(QUERY, 5) == before
+    assert before[0][0] == len(corpus) - 1
+
+
+def test_read_only_serves_checkpoint_without_writing(tmp_path, corpus):
+    writer = LexicalIndex(tmp_path)
+    writer.add(corpus)
+    writer.checkpoint()
+
+    reader = LexicalIndex(tmp_path, read_only=True)
+    assert reader.search(QUERY, 5) == writer.search(QUERY, 5)
+    assert reader.search("unknownterm", 5) == []
+    reader.sync(corpus)
+    with pytest.raises(PermissionError):
+        reader.add(["more"])
+    with pytest.raises(PermissionError):
+        reader.clear()
+    with pytest.raises(ValueError):
+        reader.sync(corpus[:-1])
+
+
+def test_read_only_never_deletes_a_broken_checkpoint(tmp_path, corpus):
+    writer = LexicalIndex(tmp_path)
+    writer.add(corpus)
+    writer.checkpoint()
+    (tmp_path / "lexical.offsets").write_bytes(b"")
+    files = sorted(os.listdir(tmp_path))
+
+    with pytest.raises(ValueError):
+        LexicalIndex(tmp_path, read_only=True)
+    assert sorted(os.listdir(tmp_path)) == files
+
+    # A writer starts over instead
+    assert len(LexicalIndex(tmp_path)) == 0
+
+
+def test_old_layout_is_rebuilt(tmp_path, corpus):
+    writer = LexicalIndex(tmp_path)
+    writer.add(corpus)
+    writer.checkpoint()
+    meta = json.loads((tmp_path / "lexical.json").read_text())
+    del meta["format"]
+    (tmp_path / "lexical.json").write_text(json.dumps(meta))
+
+    index = LexicalIndex(tmp_path)
+    index.sync(corpus)
+    assert index.search(QUERY, 1)[0][0] == len(corpus) - 1
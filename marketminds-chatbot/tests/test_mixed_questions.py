@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from backend.app.chatbot.response_builder import ResponseBuilder
+from backend.app.chatbot.router import QueryType
+from backend.app.rag.retriever import Retriever
+from benchmarks.fakes import FakeLLMClient, HashEmbeddingClient
+
+QUESTION = "What did Apple's annual report say, and what is the AAPL stock price now?"
+INTENTS = [QueryType.DOCUMENT, QueryType.LIVE_MARKET]
+QUOTE = "AAPL is trading at 190.00 USD"
+
+
+@pytest.fixture
+def builder(monkeypatch):
+    builder = ResponseBuilder(FakeLLMClient(latency=0.0))
+    monkeypatch.setattr(builder, "_handle_live_market_query", lambda question: QUOTE)
+
+    async def quote(question):
+        return QUOTE
+
+    monkeypatch.setattr(builder, "_ahandle_live_market_query", quote)
+    yield builder
+    builder.close()
+
+
+def prepare(builder, mode):
+    if mode == "sync":
+        return builder._prepare_mixed(QUESTION, INTENTS)
+    return asyncio.run(builder._aprepare_mixed(QUESTION, INTENTS))
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_loading_notice_is_not_in_prompt(builder, mode):
+    answer, prompt, cache_key = prepare(builder, mode)
+    assert answer is None and cache_key is None
+    assert QUOTE in prompt
+    assert "still loading" not in prompt
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_documents_and_market_data_share_the_prompt(builder, mode, tmp_path):
+    retriever = Retriever(HashEmbeddingClient(16), tmp_path / "store")
+    retriever.add_documents(
+        ["Apple's annual report highlighted supply chain diversification."],
+        [{"source": "report", "ticker": "AAPL"}],
+    )
+    builder.retriever = retriever
+
+    _, prompt, _ = prepare(builder, mode)
+    assert "supply chain diversification" in prompt
+    assert QUOTE in prompt
+
+
+@pytest.mark.parametrize("mode", ["sync", "async"])
+def test_market_only_question_is_answered_directly(builder, mode):
+    intents = [QueryType.LIVE_MARKET, QueryType.HISTORICAL]
+    builder._handle_historical_query = lambda question: "AAPL closes: ..."
+
+    async def history(question):
+        return "AAPL closes: ..."
+
+    builder._ahandle_historical_query = history
+    if mode == "sync":
+        answer, prompt, _ = builder._prepare_mixed(QUESTION, intents)
+    else:
+        answer, prompt, _ = asyncio.run(builder._aprepare_mixed(QUESTION, intents))
+    assert prompt is None
+    assert answer == f"{QUOTE}\n\nAAPL closes: ..."
@@ -0,0 +1,145 @@
+import json
+
+import numpy as np
+import pytest
+
+from backend.app.config import config
+from backend.app.data_sources.price_store import PriceHistory
+from backend.app.data_sources.providers import (
+    FailoverProvider,
+    MarketDataProvider,
+    ProviderError,
+    RateLimitedError,
+    RateLimiter,
+    RecordingProvider,
+    ReplayProvider,
+    create_market_provider,
+    history_path,
+)
+
+
+class FakeProvider(MarketDataProvider):
+    """Serves fixed prices for `tickers`; fails for anything else."""
+
+    def __init__(self, name, tickers, price=100.0, limiter=None):
+        super().__init__(limiter)
+        self.name = name
+        self.tickers = set(tickers)
+        self.price = price
+        self.calls = []
+
+    def get_quote(self, ticker):
+        self.calls.append(ticker)
+        self._acquire()
+        if ticker not in self.tickers:
+            raise ValueError(f"No data found for ticker {ticker}")
+        return {"ticker": ticker, "price": self.price, "currency": "USD", "timestamp": "t"}
+
+    def get_history(self, ticker, start=None):
+        if ticker not in self.tickers:
+            raise ValueError(f"No history for ticker {ticker}")
+        dates = np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-01-06"))
+        history = PriceHistory(ticker, dates, *([np.arange(5.0) + self.price] * 5))
+        if start is not None:
+            history = history[int(np.searchsorted(dates, np.datetime64(start, "D"))):]
+        return history
+
+
+# --------------------------------------------------
+# Failover
+# --------------------------------------------------
+
+def test_failover_tries_providers_in_order():
+    first = FakeProvider("first", {"AAPL"}, price=1.0)
+    second = FakeProvider("second", {"AAPL", "MSFT"}, price=2.0)
+    chain = FailoverProvider([first, second])
+
+    assert chain.get_quote("AAPL")["price"] == 1.0
+    assert chain.get_quote("MSFT")["price"] == 2.0
+    assert second.calls == ["MSFT"]
+
+
+def test_failover_batch_passes_on_only_missing_tickers():
+    first = FakeProvider("first", {"AAPL"})
+    second = FakeProvider("second", {"MSFT", "NVDA"})
+    quotes = FailoverProvider([first, second]).get_quotes(["AAPL", "MSFT", "ZZZZ"])
+
+    assert list(quotes) == ["AAPL", "MSFT"]
+    assert "AAPL" not in second.calls
+
+
+def test_failover_reports_every_error():
+    chain = FailoverProvider([FakeProvider("first", set()), FakeProvider("second", set())])
+    with pytest.raises(ProviderError, match="first: .*second: "):
+        chain.get_quote("AAPL")
+    with pytest.raises(ProviderError):
+        chain.get_history("AAPL")
+
+
+def test_rate_limited_provider_is_skipped():
+    limited = FakeProvider("limited", {"AAPL"}, price=1.0, limiter=RateLimiter(1, 3600.0))
+    backup = FakeProvider("backup", {"AAPL"}, price=2.0)
+    chain = FailoverProvider([limited, backup])
+
+    assert chain.get_quote("AAPL")["price"] == 1.0
+    assert chain.get_quote("AAPL")["price"] == 2.0
+    with pytest.raises(RateLimitedError):
+        limited.get_quote("AAPL")
+
+
+def test_failover_needs_a_provider():
+    with pytest.raises(ValueError):
+        FailoverProvider([])
+
+
+# --------------------------------------------------
+# Recording and replay
+# --------------------------------------------------
+
+def test_recording_across_failover_keeps_every_quote(tmp_path):
+    path = tmp_path / "quotes.json"
+    chain = RecordingProvider(
+        FailoverProvider([FakeProvider("a", {"AAPL"}), FakeProvider("b", {"MSFT"})]), path
+    )
+    chain.get_quote("AAPL")
+    chain.get_quote("MSFT")
+    chain.get_quotes(["AAPL", "MSFT"])
+
+    with open(path, encoding="utf-8") as f:
+        assert sorted(json.load(f)) == ["AAPL", "MSFT"]
+    assert sorted(ReplayProvider(path).get_quotes(["AAPL", "MSFT", "NVDA"])) == ["AAPL", "MSFT"]
+
+
+def test_create_market_provider_records_through_one_recorder(tmp_path, monkeypatch):
+    replay_path = tmp_path / "replay.json"
+    replay_path.write_text(json.dumps({"AAPL": {"ticker": "AAPL", "price": 1.0}}))
+    monkeypatch.setattr(config, "MARKET_REPLAY_PATH", replay_path)
+    monkeypatch.setattr(config, "MARKET_RECORD_PATH", tmp_path / "recorded.json")
+
+    provider = create_market_provider(["replay"])
+    assert isinstance(provider, RecordingProvider)
+    assert isinstance(provider.inner, FailoverProvider)
+
+
+def test_history_is_recorded_merged_and_replayed(tmp_path):
+    path = tmp_path / "quotes.json"
+    recorder = RecordingProvider(FakeProvider("a", {"AAPL"}), path)
+    recorder.get_history("AAPL", np.datetime64("2024-01-04"))
+    recorder.get_history("AAPL")
+    recorder.get_quote("AAPL")
+    assert history_path(path).exists()
+
+    replay = ReplayProvider(path)
+    history = replay.get_history("AAPL")
+    assert len(history) == 5
+    assert history.dates[0] == np.datetime64("2024-01-01")
+    assert len(replay.get_history("AAPL", np.datetime64("2024-01-04"))) == 2
+    with pytest.raises(ValueError):
+        replay.get_history("MSFT")
+
+
+def test_replay_unknown_ticker(tmp_path):
+    path = tmp_path / "quotes.json"
+    path.write_text("{}")
+    with pytest.raises(ValueError):
+        ReplayProvider(path).get_quote("AAPL")
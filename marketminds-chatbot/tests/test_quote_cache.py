@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from backend.app.data_sources.quote_cache import QuoteCache
+
+TTLS = {"": 10.0, ".NS": 60.0}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFetcher:
+    """Quotes whose price counts the fetches made for that ticker."""
+
+    def __init__(self, gate=None, fail=()):
+        self.calls = []
+        self.gate = gate
+        self.fail = set(fail)
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker):
+        with self._lock:
+            self.calls.append(ticker)
+            count = self.calls.count(ticker)
+        if self.gate is not None:
+            assert self.gate.wait(5)
+        if ticker in self.fail:
+            raise ValueError(f"no data for {ticker}")
+        return {"ticker": ticker, "price": float(count)}
+
+    def many(self, tickers):
+        self.calls.append(tuple(tickers))
+        return {t: {"ticker": t, "price": 1.0} for t in tickers if t not in self.fail}
+
+
+def wait_for(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_fresh_quotes_are_served_until_their_market_ttl():
+    fetch, clock = FakeFetcher(), Clock()
+    cache = QuoteCache(fetch, ttls=TTLS, stale_ttl=0.0, clock=clock)
+
+    assert cache.get("AAPL")["price"] == 1.0
+    assert cache.get("RELIANCE.NS")["price"] == 1.0
+    clock.now = 9.0
+    assert cache.get("AAPL")["price"] == 1.0
+
+    clock.now = 30.0
+    assert cache.get("AAPL")["price"] == 2.0
+    assert cache.get("RELIANCE.NS")["price"] == 1.0
+    assert fetch.calls == ["AAPL", "RELIANCE.NS", "AAPL"]
+    assert cache.stats()["hits"] == 2
+
+
+def test_expired_quote_is_served_stale_while_one_refresh_runs():
+    fetch, clock = FakeFetcher(), Clock()
+    cache = QuoteCache(fetch, ttls=TTLS, stale_ttl=20.0, clock=clock)
+    cache.get("AAPL")
+
+    clock.now = 15.0
+    fetch.gate = threading.Event()
+    assert cache.get("AAPL")["price"] == 1.0
+    assert cache.get("AAPL")["price"] == 1.0
+    fetch.gate.set()
+
+    wait_for(lambda: cache.get("AAPL")["price"] == 2.0)
+    assert fetch.calls == ["AAPL", "AAPL"]
+    assert cache.stats()["stale_hits"] >= 2
+
+    # Past the stale window the caller waits for a fresh fetch
+    clock.now = 100.0
+    assert cache.get("AAPL")["price"] == 3.0
+
+
+def test_concurrent_misses_share_one_fetch():
+    fetch = FakeFetcher(gate=threading.Event())
+    cache = QuoteCache(fetch, ttls=TTLS, stale_ttl=0.0, clock=Clock())
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("AAPL")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: cache.stats()["coalesced"] == 7)
+    fetch.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert fetch.calls == ["AAPL"]
+    assert [quote["price"] for quote in results] == [1.0] * 8
+    assert cache.stats()["misses"] == 1
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    fetch = FakeFetcher(fail={"BAD"})
+    cache = QuoteCache(fetch, ttls=TTLS, stale_ttl=0.0, clock=Clock())
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get("BAD")
+    assert fetch.calls == ["BAD", "BAD"]
+    assert cache.stats()["errors"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_batch_fetches_only_the_misses_in_one_request():
+    fetch, clock = FakeFetcher(fail={"BAD"}), Clock()
+    cache = QuoteCache(fetch, fetch_many=fetch.many, ttls=TTLS, clock=clock)
+    cache.get("AAPL")
+
+    quotes = cache.get_many(["AAPL", "MSFT", "BAD", "MSFT", "TSLA"])
+    assert list(quotes) == ["AAPL", "MSFT", "TSLA"]
+    assert fetch.calls == ["AAPL", ("MSFT", "BAD", "TSLA")]
+
+    # Without a batch endpoint the misses fan out over `fetch`
+    fanout = FakeFetcher()
+    cache = QuoteCache(fanout, ttls=TTLS, clock=clock)
+    assert list(cache.get_many(["MSFT", "TSLA"])) == ["MSFT", "TSLA"]
+    assert sorted(fanout.calls) == ["MSFT", "TSLA"]
@@ -0,0 +1,77 @@
+import pytest
+
+from backend.app.chatbot.router import QueryRouter, QueryType
+
+router = QueryRouter()
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What is the price of AAPL?", QueryType.LIVE_MARKET),
+    ("Where is Tesla stock trading at?", QueryType.LIVE_MARKET),
+    ("How volatile is NVDA?", QueryType.INDICATOR),
+    ("What is the 50-day moving average of MSFT?", QueryType.INDICATOR),
+    ("Show the 20 day SMA for AAPL", QueryType.INDICATOR),
+    ("What were Apple's returns this year?", QueryType.INDICATOR),
+    ("How has the stock performance of Tesla been?", QueryType.INDICATOR),
+    ("Show me AAPL price history", QueryType.HISTORICAL),
+    ("What did the annual report say about risks?", QueryType.DOCUMENT),
+    ("Hello there", QueryType.GENERAL),
+])
+def test_route(question, expected):
+    assert router.route(question) == expected
+
+
+@pytest.mark.parametrize("question", [
+    "Tell me about Apple smartphone sales",
+    "Is Tesla a small company?",
+    "What is Apple return on equity?",
+    "What did Apple say about services performance?",
+])
+def test_fundamentals_are_not_indicators(question):
+    types = [intent.type for intent in router.classify(question)]
+    assert QueryType.INDICATOR not in types
+
+
+def test_volatility_lookback_is_not_history():
+    assert router.route("What was the volatility of AAPL over the last 6 months?") == QueryType.INDICATOR
+
+
+def test_mixed_question_has_several_intents():
+    intents = router.classify(
+        "What did Apple's annual report say, and what is the stock price now?"
+    )
+    types = [intent.type for intent in intents]
+    assert QueryType.DOCUMENT in types
+    assert QueryType.LIVE_MARKET in types
+    assert intents == sorted(intents, key=lambda intent: -intent.confidence)
+
+
+def test_lookback_days():
+    assert router.lookback_days("closes over the last 3 months") == 90
+    assert router.lookback_days("past week") == 7
+    assert router.lookback_days("recently", default=30) == 30
+
+
+def test_moving_average_window():
+    assert router.moving_average_window("200-day moving average") == 200
+    assert router.moving_average_window("moving average", default=20) == 20
+
+
+@pytest.mark.parametrize("question", [
+    "How did Apple revenue grow over the last year?",
+    "What is the trend in Microsoft cloud revenue?",
+    "What were Apple's earnings history and margins?",
+    "Is there a trend in hiring?",
+])
+def test_fundamentals_are_not_price_history(question):
+    types = [intent.type for intent in router.classify(question)]
+    assert QueryType.HISTORICAL not in types
+
+
+@pytest.mark.parametrize("question", [
+    "How did AAPL do over the last 3 months?",
+    "Show me Tesla's daily closes",
+    "What is the price trend of NVDA?",
+])
+def test_price_history(question):
+    assert router.route(question) == QueryType.HISTORICAL
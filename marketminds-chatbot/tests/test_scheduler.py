@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from backend.app.llm.llm_client import LLMClient
+from backend.app.llm.scheduler import LLMOverloadedError, LLMScheduler, set_caller
+
+
+class EchoClient(LLMClient):
+    def __init__(self) -> None:
+        super().__init__("echo")
+
+    def generate(self, prompt, context=None):
+        return prompt
+
+    async def agenerate(self, prompt, context=None):
+        return prompt
+
+
+def scheduler(**kwargs) -> LLMScheduler:
+    options = dict(
+        max_concurrency=1,
+        max_queue=10,
+        max_client_queue=10,
+        deadlines={"interactive": 60.0, "batch": 60.0},
+        service_time=0.001,
+    )
+    options.update(kwargs)
+    return LLMScheduler(EchoClient(), **options)
+
+
+def test_free_slot_runs_at_once():
+    s = scheduler()
+    assert s.generate("hi") == "hi"
+    assert s.stats()["running"] == 0
+
+
+def test_client_queue_limit_is_429():
+    s = scheduler(max_client_queue=2)
+    assert s._admit("a", "interactive") is None  # takes the only slot
+    s._admit("a", "interactive")
+    s._admit("a", "interactive")
+    with pytest.raises(LLMOverloadedError) as e:
+        s._admit("a", "interactive")
+    assert e.value.status == 429
+    # Other clients still get in
+    assert s._admit("b", "interactive") is not None
+
+
+def test_full_queue_is_503():
+    s = scheduler(max_queue=2)
+    s._admit("a", "interactive")
+    s._admit("a", "interactive")
+    s._admit("b", "interactive")
+    with pytest.raises(LLMOverloadedError) as e:
+        s._admit("c", "interactive")
+    assert e.value.status == 503
+
+
+def test_wait_past_deadline_is_rejected_up_front():
+    s = scheduler(service_time=10.0, deadlines={"interactive": 15.0, "batch": 60.0})
+    s._admit("a", "interactive")
+    s._admit("a", "interactive")  # ~10 s wait: admitted
+    with pytest.raises(LLMOverloadedError) as e:
+        s._admit("b", "interactive")  # ~20 s wait
+    assert e.value.status == 503
+    assert e.value.retry_after == 5
+    # Batch has a longer deadline
+    assert s._admit("b", "batch") is not None
+
+
+def test_round_robin_across_clients_and_priority_order():
+    s = scheduler()
+    s._admit("holder", "interactive")
+    waiters = [
+        s._admit(client, priority)
+        for client, priority in [
+            ("batch", "batch"), ("a", "interactive"), ("a", "interactive"),
+            ("a", "interactive"), ("b", "interactive"), ("c", "interactive"),
+        ]
+    ]
+
+    served = []
+    for _ in waiters:
+        s._release(None)
+        granted = [w for w in waiters if w.granted and w not in served]
+        assert len(granted) == 1
+        served.append(granted[0])
+
+    assert [(w.client, w.priority) for w in served] == [
+        ("a", "interactive"), ("b", "interactive"), ("c", "interactive"),
+        ("a", "interactive"), ("a", "interactive"), ("batch", "batch"),
+    ]
+    s._release(None)
+    assert s.stats() == {"running": 0, "queued": {"interactive": 0, "batch": 0},
+                         "service_time_s": 0.001}
+
+
+def test_queued_generation_expires_at_its_deadline():
+    s = scheduler(deadlines={"interactive": 0.05, "batch": 60.0})
+    s._admit("holder", "interactive")
+    with pytest.raises(LLMOverloadedError) as e:
+        s.generate("hi")
+    assert e.value.status == 503
+    assert s.stats()["queued"]["interactive"] == 0
+    assert s.stats()["running"] == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    s = scheduler()
+
+    async def run():
+        s._admit("holder", "interactive")
+        task = asyncio.create_task(s.agenerate("hi"))
+        await asyncio.sleep(0.01)
+        assert s.stats()["queued"]["interactive"] == 1
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert s.stats()["queued"]["interactive"] == 0
+
+        s._release(None)
+        assert s.stats()["running"] == 0
+
+    asyncio.run(run())
+
+
+def test_released_slot_goes_to_async_waiter():
+    s = scheduler()
+
+    async def run():
+        set_caller("client-1", "batch")
+        s._admit("holder", "interactive")
+        task = asyncio.create_task(s.agenerate("hi"))
+        await asyncio.sleep(0.01)
+        assert s.stats()["queued"]["batch"] == 1
+        s._release(None)
+        assert await task == "hi"
+        assert s.stats()["running"] == 0
+
+    asyncio.run(run())
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError):
+        set_caller("client", "urgent")